@@ -26,6 +26,97 @@ const mutuallyExclusiveQuests = {
     // Adicione outros grupos de escolhas aqui
 };
 
+// Arquivos com hash no nome gerados pelo build_assets.py: o index.html do dist/
+// traz o mapeamento em window.ASSET_MANIFEST. Sem o build usa o nome original.
+function assetUrl(name) {
+    const manifest = window.ASSET_MANIFEST;
+    return (manifest && manifest[name]) || name;
+}
+
+// Forma compacta de distribuição (quest_dist.py): quests-database.min.json e
+// quests-details.min.json, reidratadas aqui para o formato original
+function decodeDistUrl(value, prefixes, suffixes) {
+    if (!Array.isArray(value)) return value;
+    return prefixes[value[0]] + value[1] + (value.length > 2 ? suffixes[value[2]] : '');
+}
+
+function rehydrateQuestDatabase(compact) {
+    const { prefixes, suffixes } = compact;
+    const ids = [];
+    compact.npcs.forEach(([, , rows]) => rows.forEach(row => ids.push(row[0])));
+    const idsOf = refs => refs.map(ref => (typeof ref === 'number' ? ids[ref] : ref));
+
+    const data = {};
+    Object.keys(compact).forEach(key => {
+        if (!['format', 'prefixes', 'suffixes', 'npcs'].includes(key)) data[key] = compact[key];
+    });
+    data.npcs = {};
+    compact.npcs.forEach(([npcId, npcFields, rows]) => {
+        data.npcs[npcId] = Object.assign({}, npcFields || {}, {
+            quests: rows.map(row => {
+                const quest = {
+                    id: row[0],
+                    name: row[1],
+                    tier: row[2],
+                    prerequisites: idsOf(row[5]),
+                    prerequisitesExternal: idsOf(row[6]),
+                    wikiUrl: decodeDistUrl(row[3], prefixes, suffixes),
+                    kappaRequired: Boolean(row[4])
+                };
+                // Campos ausentes no original continuam ausentes
+                (row[8] || []).forEach(field => delete quest[field]);
+                return Object.assign(quest, row[7] || {});
+            })
+        });
+    });
+    return data;
+}
+
+function rehydrateQuestDetails(compact) {
+    const { prefixes, suffixes, strings } = compact;
+    const text = value => (typeof value === 'number' ? strings[value] : value);
+
+    const data = {};
+    Object.keys(compact).forEach(key => {
+        if (!['format', 'prefixes', 'suffixes', 'strings', 'details'].includes(key)) data[key] = compact[key];
+    });
+    data.details = {};
+    compact.details.forEach(row => {
+        const entry = {
+            name: text(row[1]),
+            npc: text(row[2]),
+            objectives: row[3].map(text),
+            guide_images: row[4].map(image => decodeDistUrl(image, prefixes, suffixes)),
+            error: row[5]
+        };
+        (row[7] || []).forEach(field => delete entry[field]);
+        data.details[decodeDistUrl(row[0], prefixes, suffixes)] = Object.assign(entry, row[6] || {});
+    });
+    return data;
+}
+
+function rehydrateQuestJson(data) {
+    if (data && data.format === 'tkdb1') return rehydrateQuestDatabase(data);
+    if (data && data.format === 'tkdt1') return rehydrateQuestDetails(data);
+    return data;
+}
+
+// Busca um JSON de dados já no formato original. Com o build (build_assets.py)
+// usa a forma compacta; sem ele, ou se ela falhar, o arquivo original.
+async function fetchQuestJson(name) {
+    const compactName = name.replace(/\.json$/, '.min.json');
+    const manifest = window.ASSET_MANIFEST;
+    const candidates = manifest && manifest[compactName] ? [compactName, name] : [name];
+    let response = null;
+    for (const candidate of candidates) {
+        response = await fetch(assetUrl(candidate));
+        if (response.ok) {
+            return { ok: true, status: response.status, data: rehydrateQuestJson(await response.json()) };
+        }
+    }
+    return { ok: false, status: response.status, data: null };
+}
+
 // Verificar se um NPC está desbloqueado
 function isNPCUnlocked(npcId) {
     // Se não há requisito de desbloqueio, está sempre desbloqueado
@@ -91,6 +182,104 @@ function saveProgress() {
     localStorage.setItem('tarkovQuestProgress', JSON.stringify(progress));
 }
 
+// Progresso compacto (mesmo formato do quest_progress.py):
+// p1.<fingerprint>.<completas>.<em andamento>, cada bitset em base64url com o bit i
+// correspondendo à i-ésima quest do quests-database.json (NPCs e quests na ordem do arquivo)
+const COMPACT_PROGRESS_PREFIX = 'p1';
+
+function questOrderEntries() {
+    const entries = [];
+    Object.keys(questsData.npcs || {}).forEach(npcId => {
+        questsData.npcs[npcId].quests.forEach(quest => {
+            entries.push({ id: quest.id || '', npcId: npcId });
+        });
+    });
+    return entries;
+}
+
+// FNV-1a de 32 bits dos IDs unidos por '\n' (detecta outra versão do banco)
+function questDatabaseFingerprint(entries) {
+    const bytes = new TextEncoder().encode(entries.map(entry => entry.id).join('\n'));
+    let hash = 0x811c9dc5;
+    for (const byte of bytes) {
+        hash = Math.imul(hash ^ byte, 0x01000193) >>> 0;
+    }
+    return hash.toString(16).padStart(8, '0');
+}
+
+function bitsToBase64Url(bytes) {
+    let length = bytes.length;
+    while (length > 0 && bytes[length - 1] === 0) length--;
+    let binary = '';
+    for (let i = 0; i < length; i++) {
+        binary += String.fromCharCode(bytes[i]);
+    }
+    return btoa(binary).replace(/\+/g, '-').replace(/\//g, '_').replace(/=+$/, '');
+}
+
+function base64UrlToBits(text) {
+    if (!text) return new Uint8Array(0);
+    const binary = atob(text.replace(/-/g, '+').replace(/_/g, '/'));
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return bytes;
+}
+
+function encodeProgressCompact(progressData = progress) {
+    const entries = questOrderEntries();
+    // Como no grafo do Python, um ID repetido aponta para a última ocorrência
+    const indexById = new Map();
+    entries.forEach((entry, i) => indexById.set(entry.id, i));
+
+    const completed = new Uint8Array(Math.ceil(entries.length / 8));
+    const current = new Uint8Array(completed.length);
+    const setBit = (bytes, questId) => {
+        const i = indexById.get(questId);
+        if (i !== undefined) bytes[i >> 3] |= 1 << (i & 7);
+    };
+    for (const npcId in progressData) {
+        const npcProgress = progressData[npcId] || { completed: [], current: null };
+        (npcProgress.completed || []).forEach(questId => setBit(completed, questId));
+        if (npcProgress.current) setBit(current, npcProgress.current);
+    }
+    return [
+        COMPACT_PROGRESS_PREFIX,
+        questDatabaseFingerprint(entries),
+        bitsToBase64Url(completed),
+        bitsToBase64Url(current)
+    ].join('.');
+}
+
+// Retorna o progresso no formato do tarkovQuestProgress, ou null se o texto for
+// inválido ou de outra versão do banco
+function decodeProgressCompact(text) {
+    const parts = (text || '').trim().split('.');
+    const entries = questOrderEntries();
+    if (parts.length !== 4 || parts[0] !== COMPACT_PROGRESS_PREFIX) return null;
+    if (parts[1] !== questDatabaseFingerprint(entries)) return null;
+
+    let completed, current;
+    try {
+        completed = base64UrlToBits(parts[2]);
+        current = base64UrlToBits(parts[3]);
+    } catch (error) {
+        return null;
+    }
+    const hasBit = (bytes, i) => (i >> 3) < bytes.length && (bytes[i >> 3] >> (i & 7)) & 1;
+
+    const decoded = {};
+    Object.keys(questsData.npcs).forEach(npcId => {
+        decoded[npcId] = { completed: [], current: null };
+    });
+    entries.forEach((entry, i) => {
+        if (hasBit(completed, i)) decoded[entry.npcId].completed.push(entry.id);
+        if (hasBit(current, i)) decoded[entry.npcId].current = entry.id;
+    });
+    return decoded;
+}
+
 // Salvar ordem personalizada das quests
 function saveQuestOrder() {
     localStorage.setItem('tarkovQuestOrder', JSON.stringify(questOrder));
@@ -100,13 +289,13 @@ function saveQuestOrder() {
 async function loadQuestData() {
     try {
         // Carregar apenas o quests-database.json (novo banco de dados)
-        const response = await fetch('quests-database.json');
+        const response = await fetchQuestJson('quests-database.json');
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const databaseData = await response.json();
+        const databaseData = response.data;
         
         // A estrutura já está no formato correto, apenas precisamos garantir compatibilidade
         // Remover campos auxiliares se existirem
@@ -159,7 +348,7 @@ async function loadQuestData() {
         // Tentar carregar quests-data.json como fallback
         try {
             console.log('Tentando carregar quests-data.json como fallback...');
-            const fallbackResponse = await fetch('quests-data.json');
+            const fallbackResponse = await fetch(assetUrl('quests-data.json'));
             if (fallbackResponse.ok) {
                 const fallbackData = await fallbackResponse.json();
                 questsData = fallbackData;
@@ -268,6 +457,7 @@ function initializeNPCs() {
 // Selecionar NPC
 function selectNPC(npcId, buttonElement) {
     currentNPC = npcId;
+    loadDetailShard(npcId); // Detalhes das quests deste NPC, em segundo plano
     
     // Atualizar botões ativos
     document.querySelectorAll('.npc-btn').forEach(btn => {
@@ -685,8 +875,10 @@ function showQuestDetailsInPanel(quest) {
 
 // ==================== SISTEMA DE CACHE DE DETALHES ====================
 
-// Detalhes pré-processados (carregados do quests-details.json)
+// Detalhes pré-processados (carregados do quests-details.json ou dos shards por NPC)
 let preprocessedQuestDetails = {};
+let detailShardsIndex = null;
+let loadedDetailShards = {}; // npcId -> Promise da busca do shard
 
 // Carregar cache de detalhes das quests (localStorage)
 let questDetailsCache = {};
@@ -746,12 +938,25 @@ function setCachedQuestDetails(wikiUrl, details) {
     saveQuestDetailsCache();
 }
 
-// Carregar detalhes pré-processados do arquivo JSON
+// Carregar detalhes pré-processados. Com os shards por NPC (quest_shards.py)
+// só o índice é lido aqui; cada NPC é buscado quando for usado.
 async function loadPreprocessedQuestDetails() {
     try {
-        const response = await fetch('quests-details.json');
+        const indexResponse = await fetch('quests-details/index.json', { cache: 'no-cache' });
+        if (indexResponse.ok) {
+            detailShardsIndex = await indexResponse.json();
+            console.log('[PREPROCESSED] Índice com', Object.keys(detailShardsIndex.shards || {}).length, 'shards de detalhes');
+            return;
+        }
+    } catch (error) {
+        console.warn('[PREPROCESSED] Índice de shards indisponível, usando quests-details.json:', error);
+    }
+    detailShardsIndex = null;
+
+    try {
+        const response = await fetchQuestJson('quests-details.json');
         if (response.ok) {
-            const data = await response.json();
+            const data = response.data;
             preprocessedQuestDetails = data.details || {};
             console.log('[PREPROCESSED] Carregados', Object.keys(preprocessedQuestDetails).length, 'detalhes pré-processados');
         } else {
@@ -764,6 +969,45 @@ async function loadPreprocessedQuestDetails() {
     }
 }
 
+// Shard (NPC) onde estão os detalhes de uma URL; sem NPC no banco, o "other"
+function detailShardForUrl(normalizedUrl) {
+    if (!detailShardsIndex || !normalizedUrl) return null;
+    for (const [npcId, npcData] of Object.entries(questsData.npcs || {})) {
+        if ((npcData.quests || []).some(quest => normalizeWikiUrl(quest.wikiUrl) === normalizedUrl)) {
+            return detailShardsIndex.shards[npcId] ? npcId : null;
+        }
+    }
+    return detailShardsIndex.shards.other ? 'other' : null;
+}
+
+// Buscar o shard de um NPC uma única vez e mesclar em preprocessedQuestDetails
+function loadDetailShard(npcId) {
+    const entry = detailShardsIndex && detailShardsIndex.shards[npcId];
+    if (!entry) return Promise.resolve();
+    if (!loadedDetailShards[npcId]) {
+        // O hash na URL deixa o navegador guardar o shard até ele mudar
+        loadedDetailShards[npcId] = fetch(`quests-details/${entry.file}?v=${entry.sha256.slice(0, 10)}`)
+            .then(response => {
+                if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+                return response.json();
+            })
+            .then(data => {
+                Object.assign(preprocessedQuestDetails, rehydrateQuestJson(data).details || {});
+                console.log('[PREPROCESSED] Shard', npcId, 'carregado:', entry.count, 'quests');
+            })
+            .catch(error => {
+                console.warn('[PREPROCESSED] Erro ao carregar shard', npcId, error);
+            });
+    }
+    return loadedDetailShards[npcId];
+}
+
+// Verdadeiro enquanto o shard com os detalhes da URL ainda não foi buscado
+function needsDetailShard(wikiUrl) {
+    const npcId = detailShardForUrl(normalizeWikiUrl(wikiUrl));
+    return Boolean(npcId && !loadedDetailShards[npcId]);
+}
+
 // Normalizar URL da wiki para busca
 function normalizeWikiUrl(url) {
     if (!url || typeof url !== 'string') return null;
@@ -812,6 +1056,13 @@ function loadQuestDetailsForPanel(wikiUrl, contentElement) {
         return;
     }
     
+    // Shard do NPC ainda não buscado: busca e tenta de novo
+    if (needsDetailShard(wikiUrl)) {
+        loadDetailShard(detailShardForUrl(normalizeWikiUrl(wikiUrl)))
+            .then(() => loadQuestDetailsForPanel(wikiUrl, contentElement));
+        return;
+    }
+    
     // 1. PRIMEIRO: Verificar dados pré-processados (mais rápido, funciona offline)
     try {
         const normalizedUrl = normalizeWikiUrl(wikiUrl);
@@ -1301,7 +1552,12 @@ function showQuestDetailsScreen(wikiUrl, retryCount = 0) {
     document.getElementById('objectivesSection').style.display = 'none';
     document.getElementById('guideSection').style.display = 'none';
     
-    // 1. PRIMEIRO: Verificar dados pré-processados
+    // 1. PRIMEIRO: Verificar dados pré-processados (buscando o shard do NPC se preciso)
+    if (needsDetailShard(wikiUrl)) {
+        loadDetailShard(detailShardForUrl(normalizeWikiUrl(wikiUrl)))
+            .then(() => showQuestDetailsScreen(wikiUrl, retryCount));
+        return;
+    }
     const normalizedUrl = normalizeWikiUrl(wikiUrl);
     if (normalizedUrl && preprocessedQuestDetails[normalizedUrl]) {
         const preprocessed = preprocessedQuestDetails[normalizedUrl];
@@ -1749,7 +2005,7 @@ function showSettingsSection(sectionId, buttonElement) {
 // Carregar dados brutos das quests
 async function loadRawQuestData() {
     try {
-        const response = await fetch('quests-data.json');
+        const response = await fetch(assetUrl('quests-data.json'));
         rawQuestData = await response.json();
         
         // Popular dropdown de NPCs
@@ -1876,8 +2132,11 @@ function updateRawDataTable() {
 // Carregar dados brutos 2 (arquivo limpo)
 async function loadRawQuestData2() {
     try {
-        const response = await fetch('quests-database.json');
-        rawQuestData2 = await response.json();
+        const response = await fetchQuestJson('quests-database.json');
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        rawQuestData2 = response.data;
         
         // Popular dropdown de NPCs
         populateNPCsDropdown2();
@@ -7,23 +7,20 @@ baseado em referências cruzadas e padrões conhecidos
 import json
 import re
 
+from quest_graph import load_graph
+
 def load_database():
     with open('quests-database.json', 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def build_index(data):
-    quest_by_id = {}
+def build_index(graph):
+    quest_by_id = graph.quest_by_id()
     quest_name_to_id = {}  # Mapeia nome normalizado para ID
     
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            quest_name = quest.get('name', '')
-            if quest_id:
-                quest_by_id[quest_id] = (npc_id, quest)
-                # Normalizar nome para busca
-                normalized = quest_name.lower().strip()
-                quest_name_to_id[normalized] = (npc_id, quest_id, quest)
+    for quest_id, (npc_id, quest) in quest_by_id.items():
+        # Normalizar nome para busca
+        normalized = quest.get('name', '').lower().strip()
+        quest_name_to_id[normalized] = (npc_id, quest_id, quest)
     
     return quest_by_id, quest_name_to_id
 
@@ -186,7 +183,7 @@ def main():
     data = load_database()
     
     print("Construindo indices...")
-    quest_by_id, quest_name_to_id = build_index(data)
+    quest_by_id, quest_name_to_id = build_index(load_graph())
     
     print(f"Total de quests: {len(quest_by_id)}")
     
@@ -222,7 +219,7 @@ def main():
     print("=" * 80)
     
     import subprocess
-    result = subprocess.run(['python', 'validate_prerequisites.py'], 
+    result = subprocess.run(['python', 'validate_prerequisites.py', '--incremental'], 
                           capture_output=True, text=True, encoding='utf-8', errors='ignore')
     print(result.stdout)
     if result.stderr:
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark da detecção de ciclos em bancos de quests sintéticos.
+
+Gera bancos no formato do quests-database.json com 10k a 100k quests
+(pré-requisitos aleatórios, uma cadeia longa por NPC e ciclos injetados,
+inclusive sobrepostos) e mede a compilação do grafo e a passada de Tarjan.
+A DFS recursiva antiga é executada para comparação: em cadeias longas ela
+esbarra no limite de recursão do Python.
+
+Uso:
+    python benchmark_graph.py [--sizes 10000 30000 100000] [--seed 1]
+"""
+import argparse
+import io
+import random
+import sys
+import time
+
+from quest_graph import QuestGraph
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+NPCS = ['prapor', 'therapist', 'skier', 'peacekeeper', 'mechanic', 'ragman', 'jaeger', 'lightkeeper']
+
+
+def synthetic_database(size, seed=1, rings=20, figure_eights=5):
+    """Banco sintético e o número de grupos circulares injetados"""
+    rng = random.Random(seed)
+    per_npc = size // len(NPCS)
+    data = {'version': 'synthetic', 'npcs': {}}
+    all_ids = []
+
+    for npc_id in NPCS:
+        quests = []
+        for i in range(per_npc):
+            quest_id = f'{npc_id}_{i}'
+            internal = []
+            external = []
+            if i < per_npc - 1:
+                # Cadeia longa: cada quest depende da seguinte do mesmo NPC
+                # (a DFS a partir da primeira percorre a cadeia inteira)
+                internal.append(f'{npc_id}_{i + 1}')
+            for _ in range(rng.randint(0, 2)):
+                if all_ids:
+                    external.append(rng.choice(all_ids))
+            quests.append({
+                'id': quest_id,
+                'name': f'{npc_id.title()} Quest {i}',
+                'tier': None,
+                'prerequisites': internal,
+                'prerequisitesExternal': external,
+                'wikiUrl': '',
+                'kappaRequired': rng.random() < 0.5
+            })
+        data['npcs'][npc_id] = {'name': npc_id.title(), 'quests': quests}
+        # Só aponta para NPCs anteriores: o grafo base é acíclico
+        all_ids.extend(q['id'] for q in quests)
+
+    # Anéis a -> b -> c -> a e "oitos" (dois ciclos que compartilham um nó)
+    extra = data['npcs'][NPCS[0]]['quests']
+    for r in range(rings):
+        ids = [f'ring_{r}_{k}' for k in range(3)]
+        for k, quest_id in enumerate(ids):
+            extra.append({'id': quest_id, 'name': quest_id, 'prerequisites': [ids[(k + 1) % 3]],
+                          'prerequisitesExternal': [rng.choice(all_ids)]})
+    for f in range(figure_eights):
+        hub, a, b = f'eight_{f}_hub', f'eight_{f}_a', f'eight_{f}_b'
+        extra.append({'id': hub, 'name': hub, 'prerequisites': [a, b]})
+        extra.append({'id': a, 'name': a, 'prerequisites': [hub]})
+        extra.append({'id': b, 'name': b, 'prerequisites': [hub]})
+    return data, rings + figure_eights
+
+
+def legacy_detect(data):
+    """DFS recursiva original do validate_prerequisites.py (para comparação)"""
+    quest_by_id = {}
+    for npc_id, npc_data in data.get('npcs', {}).items():
+        for quest in npc_data.get('quests', []):
+            quest_by_id[quest['id']] = (npc_id, quest)
+    circular = []
+
+    def has_cycle(quest_id, visited, rec_stack, path):
+        visited.add(quest_id)
+        rec_stack.add(quest_id)
+        path.append(quest_id)
+        _, quest = quest_by_id[quest_id]
+        for prereq_id in quest.get('prerequisites', []) + quest.get('prerequisitesExternal', []):
+            if prereq_id not in quest_by_id:
+                continue
+            if prereq_id not in visited:
+                if has_cycle(prereq_id, visited, rec_stack, path):
+                    return True
+            elif prereq_id in rec_stack:
+                circular.append(path[path.index(prereq_id):] + [prereq_id])
+                return True
+        rec_stack.remove(quest_id)
+        path.pop()
+        return False
+
+    visited = set()
+    for quest_id in quest_by_id:
+        if quest_id not in visited:
+            has_cycle(quest_id, visited, set(), [])
+    return circular
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da detecção de ciclos")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 30000, 100000])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'quests':>8} {'arestas':>9} {'compilar':>10} {'tarjan':>10} {'grupos':>7} {'esperado':>9}  DFS recursiva")
+    failed = False
+    for size in args.sizes:
+        data, expected = synthetic_database(size, seed=args.seed)
+        graph, compile_time = timed(QuestGraph.compile, data)
+        groups, scc_time = timed(graph.cycle_groups)
+        for group in groups:
+            # O ciclo representativo precisa existir dentro do grupo
+            cycle = graph.representative_cycle(group)
+            if cycle[0] != cycle[-1] or not set(cycle) <= set(group):
+                failed = True
+
+        try:
+            legacy, legacy_time = timed(legacy_detect, data)
+            legacy_result = f"{legacy_time * 1000:8.1f}ms, {len(legacy)} ciclos"
+        except RecursionError:
+            legacy_result = "RecursionError"
+
+        if len(groups) != expected:
+            failed = True
+        print(f"{len(graph):8} {graph.edge_count():9} {compile_time * 1000:8.1f}ms {scc_time * 1000:8.1f}ms "
+              f"{len(groups):7} {expected:9}  {legacy_result}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
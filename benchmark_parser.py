@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compara o parser completo (html.parser, implementação original) com o
+parser rápido (recortes + lxml) em páginas salvas da wiki.
+
+Para cada página mede o tempo de CPU médio e o pico de memória alocada
+(tracemalloc) de cada estratégia e confere se a extração é idêntica. Só a
+comparação em páginas reais gravadas (fixture_corpus.py record) vale como
+evidência: as páginas sintéticas seguem o formato que os recortes esperam, e o
+benchmark avisa quando elas estão entre as páginas medidas.
+
+Uso:
+    python benchmark_parser.py [diretório ou arquivos .html/.html.gz] [--rounds N]
+"""
+import argparse
+import gzip
+import os
+import sys
+import io
+import time
+import tracemalloc
+
+import fixture_corpus
+import quest_parser
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+DEFAULT_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+
+def strategies():
+    """(nome, função) de cada combinação estratégia/backend disponível"""
+    result = [
+        ('full/html.parser', lambda c: quest_parser.parse_quest_page_full(c, 'html.parser')),
+        ('fast/html.parser', lambda c: quest_parser.parse_quest_page_fast(c, 'html.parser')),
+    ]
+    if quest_parser.HAS_LXML:
+        result.append(('full/lxml', lambda c: quest_parser.parse_quest_page_full(c, 'lxml')))
+        result.append(('fast/lxml', lambda c: quest_parser.parse_quest_page_fast(c, 'lxml')))
+    return result
+
+
+def load_page(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        return f.read()
+
+
+def find_pages(paths):
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(('.html', '.html.gz')):
+                    pages.append(os.path.join(path, name))
+        else:
+            pages.append(path)
+    return pages
+
+
+def measure(parse, content, rounds):
+    """(segundos de CPU por página, pico de memória em bytes, resultado)"""
+    tracemalloc.start()
+    result = parse(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.process_time()
+    for _ in range(rounds):
+        parse(content)
+    cpu = (time.process_time() - start) / rounds
+    return cpu, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do parser de páginas de quest")
+    parser.add_argument('paths', nargs='*', default=[DEFAULT_PAGES_DIR],
+                        help="Arquivos .html/.html.gz ou diretórios (padrão: fixtures/pages)")
+    parser.add_argument('--rounds', type=int, default=5, help="Repetições por página (padrão: 5)")
+    args = parser.parse_args()
+
+    pages = find_pages(args.paths)
+    if not pages:
+        print("Nenhuma página encontrada. Grave páginas em fixtures/pages/ primeiro.")
+        return 1
+
+    synthetic = fixture_corpus.synthetic_paths() & {os.path.abspath(path) for path in pages}
+    if synthetic:
+        fixture_corpus.warn_synthetic(len(synthetic), len(pages))
+
+    names = [name for name, _ in strategies()]
+    totals = {name: [0.0, 0] for name in names}
+    mismatches = 0
+
+    print(f"{'página':40} " + ' '.join(f"{name:>22}" for name in names))
+    for path in pages:
+        content = load_page(path)
+        baseline = None
+        cells = []
+        for name, parse in strategies():
+            cpu, peak, result = measure(parse, content, max(args.rounds, 1))
+            totals[name][0] += cpu
+            totals[name][1] = max(totals[name][1], peak)
+            if baseline is None:
+                baseline = result
+            elif result != baseline:
+                mismatches += 1
+                print(f"  [DIFERENTE] {os.path.basename(path)}: {name} difere de {names[0]}")
+            cells.append(f"{cpu * 1000:8.2f}ms {peak / 1024:8.0f}KB")
+        print(f"{os.path.basename(path)[:40]:40} " + ' '.join(f"{cell:>22}" for cell in cells))
+
+    print()
+    base_cpu = totals[names[0]][0]
+    for name in names:
+        cpu, peak = totals[name]
+        speedup = base_cpu / cpu if cpu else 0.0
+        print(f"{name:18} CPU total {cpu * 1000:9.2f}ms  pico {peak / 1024:8.0f}KB  {speedup:5.2f}x")
+    print(f"\n{len(pages)} páginas, {mismatches} extrações diferentes")
+    if synthetic:
+        print(f"({len(synthetic)} páginas sintéticas: a comparação não vale como evidência)")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmark do scraper sobre o corpus offline (fixtures/).
+
+Para cada página de quest mede, no estilo do pytest-benchmark, o tempo de
+parse (mín/média/desvio em N rodadas), o pico de memória e o número de
+blocos alocados (tracemalloc). Nas páginas reais gravadas (source "recorded")
+a extração também é conferida contra o resultado do parser original gravado no
+manifest. Com --http o scraping completo (scrape_quest_info, requisição
+condicional e API em lote) é exercitado contra o fixture_server.py local.
+
+Os resultados podem ser salvos (--save) e comparados com uma execução
+anterior (--compare), falhando se alguma página ficar mais lenta que o
+limite (--max-regression).
+
+As páginas sintéticas (fixture_corpus.py synthetic, source "synthetic") são
+geradas a partir do próprio quests-details.json e são bem menores que as
+páginas reais do fandom. Elas só servem para exercitar o código: a extração
+delas não é conferida (o esperado sairia do mesmo modelo que gerou a página),
+os tempos não representam as páginas reais e elas ficam fora do --save e do
+--compare. Para uma base de comparação, grave páginas reais com
+python fixture_corpus.py record.
+
+Uso:
+    python fixture_corpus.py synthetic      # gera o corpus, se ainda não existe
+    python benchmark_scraper.py [--rounds 10] [--http] [--save out.json] [--compare base.json]
+"""
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+import fixture_corpus
+import quest_parser
+import wiki_api
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+
+def benchmark(fn, rounds):
+    """Estatísticas de tempo (segundos) e alocação de fn()"""
+    tracemalloc.start()
+    result = fn()
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics('filename'))
+
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return result, {
+        'min': min(times),
+        'mean': statistics.mean(times),
+        'stddev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'rounds': rounds,
+        'peak_bytes': peak,
+        'live_blocks': blocks
+    }
+
+
+def expected_for(entry, key='expected'):
+    """Resultado esperado da página, só para as páginas reais gravadas"""
+    if entry.get('source') == 'synthetic':
+        return None
+    return entry.get(key)
+
+
+def check(name, result, expected, failures):
+    if expected is not None and result != expected:
+        failures.append(name)
+        print(f"  [FALHA] {name}")
+        for key in ('name', 'npc', 'objectives', 'guide_images'):
+            if result.get(key) != expected.get(key):
+                print(f"    {key}: esperado {expected.get(key)!r}")
+                print(f"    {' ' * len(key)}  obtido   {result.get(key)!r}")
+
+
+def run_parsers(pages, rounds, failures):
+    results = {}
+    print(f"{'página':38} {'mín':>9} {'média':>9} {'desvio':>8} {'pico':>9} {'blocos':>7}")
+    for entry in pages:
+        content = fixture_corpus.load_page(entry)
+        result, stats = benchmark(lambda: quest_parser.parse_quest_page(content), rounds)
+        check(f"html:{entry['slug']}", result, expected_for(entry), failures)
+
+        wikitext = fixture_corpus.load_wikitext(entry)
+        if wikitext is not None:
+            api_result = wiki_api.parse_quest_wikitext(entry['title'], wikitext)
+            check(f"api:{entry['slug']}", api_result, expected_for(entry, 'expected_api'), failures)
+
+        results[entry['slug']] = stats
+        print(f"{entry['slug'][:38]:38} {stats['min'] * 1000:8.2f}ms {stats['mean'] * 1000:8.2f}ms "
+              f"{stats['stddev'] * 1000:7.2f}ms {stats['peak_bytes'] / 1024:8.0f}KB {stats['live_blocks']:7}")
+    return results
+
+
+def run_http(pages, failures):
+    """Scraping completo contra o servidor local"""
+    from fixture_server import start_fixture_server
+    from quest_scrape import scrape_quest_info, scrape_quest_info_conditional
+
+    server = start_fixture_server(pages=pages)
+    try:
+        start = time.perf_counter()
+        validators = {}
+        for entry in pages:
+            url = server.page_url(entry)
+            result = scrape_quest_info_conditional(url)
+            validators[url] = result.get('validators')
+            result = {key: result.get(key) for key in ('name', 'npc', 'objectives', 'guide_images')}
+            check(f"http:{entry['slug']}", result, expected_for(entry), failures)
+        elapsed = time.perf_counter() - start
+
+        # Segunda passada condicional: nada mudou, tudo deve voltar 304
+        unchanged = sum(
+            1 for url, v in validators.items()
+            if scrape_quest_info_conditional(url, v).get('not_modified')
+        )
+        if unchanged != len(pages):
+            failures.append('http:conditional')
+            print(f"  [FALHA] requisições condicionais: {unchanged}/{len(pages)} sem alteração")
+
+        # API em lote
+        api_url = f'{server.base_url}/api.php'
+        start_api = time.perf_counter()
+        infos, fallback = wiki_api.fetch_quest_infos([server.page_url(e) for e in pages], api_url=api_url)
+        elapsed_api = time.perf_counter() - start_api
+        for entry in pages:
+            info = infos.get(server.page_url(entry))
+            if info is not None:
+                info = {key: info.get(key) for key in ('name', 'npc', 'objectives', 'guide_images')}
+                check(f"http-api:{entry['slug']}", info, expected_for(entry, 'expected_api'), failures)
+
+        print(f"\nHTTP: {len(pages)} páginas em {elapsed:.2f}s ({len(pages) / elapsed:.1f} páginas/s), "
+              f"{unchanged} sem alteração na segunda passada")
+        print(f"API:  {len(infos)} páginas em {elapsed_api:.2f}s, {len(fallback)} para scraping de HTML")
+        # Garante que o scrape_quest_info simples continua funcionando
+        if pages and scrape_quest_info(server.page_url(pages[0])).get('error'):
+            failures.append('http:scrape_quest_info')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def compare(results, baseline_path, max_regression):
+    """Páginas cuja média piorou mais que max_regression em relação à base"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['pages']
+    regressions = []
+    for slug, stats in results.items():
+        base = baseline.get(slug)
+        if not base or not base['mean']:
+            continue
+        change = stats['mean'] / base['mean'] - 1
+        if change > max_regression:
+            regressions.append(slug)
+            print(f"  [REGRESSÃO] {slug}: {base['mean'] * 1000:.2f}ms -> {stats['mean'] * 1000:.2f}ms (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do scraper sobre o corpus offline")
+    parser.add_argument('--rounds', type=int, default=10, help="Rodadas por página (padrão: 10)")
+    parser.add_argument('--http', action='store_true', help="Também testa o scraping via servidor local")
+    parser.add_argument('--save', help="Grava os resultados neste arquivo JSON")
+    parser.add_argument('--compare', help="Compara com resultados gravados com --save")
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help="Piora máxima aceita na comparação (padrão: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    pages = [entry for entry in fixture_corpus.load_manifest() if entry['kind'] == 'quest']
+    if not pages:
+        print("Corpus vazio. Gere com: python fixture_corpus.py synthetic (ou record)")
+        return 1
+
+    synthetic = {entry['slug'] for entry in pages if entry.get('source') == 'synthetic'}
+    if synthetic:
+        fixture_corpus.warn_synthetic(len(synthetic), len(pages),
+                                      ["Essas páginas ficam fora do --save/--compare."])
+
+    failures = []
+    print(f"Parser: {quest_parser.active_parser()} | {len(pages)} páginas | {args.rounds} rodadas\n")
+    results = run_parsers(pages, max(args.rounds, 1), failures)
+    if args.http:
+        run_http(pages, failures)
+
+    means = [stats['mean'] for stats in results.values()]
+    print(f"\nMédia geral: {statistics.mean(means) * 1000:.2f}ms por página")
+
+    # Só as páginas reais servem de base de comparação
+    recorded = {slug: stats for slug, stats in results.items() if slug not in synthetic}
+    if args.save:
+        if recorded:
+            with open(args.save, 'w', encoding='utf-8') as f:
+                json.dump({'parser': quest_parser.active_parser(), 'pages': recorded}, f, indent=2)
+            print(f"Resultados de {len(recorded)} páginas reais gravados em {args.save}")
+        else:
+            print(f"Nada gravado em {args.save}: o corpus só tem páginas sintéticas")
+
+    regressions = compare(recorded, args.compare, args.max_regression) if args.compare else []
+    if args.compare and not recorded:
+        print("Comparação ignorada: o corpus só tem páginas sintéticas")
+
+    checked = len(pages) - len(synthetic)
+    if checked:
+        print(f"\nExtração conferida em {checked} páginas gravadas: {len(failures)} falhas, "
+              f"{len(regressions)} regressões")
+    else:
+        print(f"\nExtração não conferida (nenhuma página gravada): {len(failures)} falhas de "
+              f"execução, {len(regressions)} regressões")
+    return 1 if failures or regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
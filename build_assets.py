@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Build dos arquivos estáticos do site (app.js, styles.css, JSONs de dados).
+
+Gera em dist/:
+
+- uma cópia de cada arquivo com o hash do conteúdo no nome
+  (app.js -> app.3f2a1b4c9d.js), que pode ser cacheada para sempre pelo
+  navegador: qualquer mudança gera outro nome
+- as variantes pré-comprimidas de cada um: .gz sempre e .br se o pacote
+  brotli estiver instalado (pip install brotli, opcional)
+- index.html e quest-details.html apontando para os nomes com hash, com o
+  mapeamento nome -> arquivo em window.ASSET_MANIFEST (usado pelo assetUrl()
+  do app.js para buscar os JSONs)
+- as formas compactas dos JSONs (quest_dist.py) e os shards por NPC do
+  quests-details.json (quest_shards.py), exportados de novo a cada build para
+  nunca ficarem atrás dos originais
+- manifest.json com o hash, tamanhos e variantes de cada arquivo e o "build"
+  (hash de todos os arquivos), que o update_version.py usa para incrementar a
+  versão quando algo mudou
+
+A rota serve_static do scraper.py lê o manifest (AssetManifest), escolhe a
+variante pelo Accept-Encoding e responde os arquivos com hash com
+Cache-Control immutable. Sem o build, tudo continua sendo servido da raiz como
+antes.
+
+Configuração via variável de ambiente:
+    TARKOV_DIST_DIR  diretório de saída do build (padrão dist/)
+
+Uso:
+    python build_assets.py              # build completo + versão
+    python build_assets.py --no-version # não mexe no version.json
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+
+from quest_dist import export_database, export_details
+from quest_shards import write_shards
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    brotli = None
+    HAS_BROTLI = False
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32' and __name__ == '__main__':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.environ.get('TARKOV_DIST_DIR', os.path.join(BASE_DIR, 'dist'))
+MANIFEST_NAME = 'manifest.json'
+
+# Arquivos com hash no nome (os que não existirem são ignorados)
+ASSETS = ('app.js', 'styles.css', 'version.js', 'quests-database.json', 'quests-details.json',
+          'quests-data.json', 'quests-database.min.json', 'quests-details.min.json')
+# Páginas reescritas para os nomes com hash (servidas sem cache longo)
+PAGES = ('index.html', 'quest-details.html')
+
+# Variantes na ordem de preferência quando o cliente aceita mais de uma
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def hashed_name(name, digest):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest[:10]}{ext}"
+
+
+def compress_variants(data):
+    """{'gzip': bytes, 'br': bytes} (br só com o pacote brotli)"""
+    # mtime=0: o mesmo conteúdo gera sempre o mesmo .gz
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if HAS_BROTLI:
+        variants['br'] = brotli.compress(data, quality=11)
+    return variants
+
+
+def _write(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_with_variants(dist, file_name, data):
+    """Grava o arquivo e as variantes; retorna {encoding: tamanho}"""
+    _write(os.path.join(dist, file_name), data)
+    variants = compress_variants(data)
+    sizes = {}
+    for encoding, suffix in ENCODINGS:
+        compressed = variants.get(encoding)
+        path = os.path.join(dist, file_name + suffix)
+        if compressed is None or len(compressed) >= len(data):
+            # Não vale a pena (ou brotli indisponível): remove sobra de builds antigos
+            if os.path.exists(path):
+                os.remove(path)
+            sizes[encoding] = None
+            continue
+        _write(path, compressed)
+        sizes[encoding] = len(compressed)
+    return sizes
+
+
+def rewrite_page(html, mapping):
+    """Troca src/href dos arquivos pelos nomes com hash e injeta o ASSET_MANIFEST"""
+    for name, file_name in mapping.items():
+        html = re.sub(r'((?:src|href)=["\'])' + re.escape(name) + r'(["\'])',
+                      lambda m: m.group(1) + file_name + m.group(2), html)
+    script = f"<script>window.ASSET_MANIFEST = {json.dumps(mapping, sort_keys=True)};</script>"
+    match = re.search(r'^([ \t]*)<script\b', html, re.MULTILINE)
+    if match:
+        return html[:match.start()] + match.group(1) + script + '\n' + html[match.start():]
+    return html.replace('</body>', script + '\n</body>')
+
+
+def build(root=BASE_DIR, dist=DIST_DIR):
+    """Gera o dist/ e retorna o manifest"""
+    os.makedirs(dist, exist_ok=True)
+    for name, export in (('quests-database.json', export_database), ('quests-details.json', export_details)):
+        source = os.path.join(root, name)
+        if os.path.exists(source):
+            with open(source, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            export(data, source)
+            if export is export_details:
+                write_shards(data, database_path=os.path.join(root, 'quests-database.json'))
+
+    assets = {}
+    for name in ASSETS:
+        source = os.path.join(root, name)
+        if not os.path.exists(source):
+            continue
+        with open(source, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        file_name = hashed_name(name, digest)
+        sizes = _write_with_variants(dist, file_name, data)
+        assets[name] = {'file': file_name, 'sha256': digest, 'size': len(data), **sizes}
+
+    mapping = {name: entry['file'] for name, entry in assets.items()}
+    pages = {}
+    for name in PAGES:
+        source = os.path.join(root, name)
+        if not os.path.exists(source):
+            continue
+        with open(source, 'r', encoding='utf-8') as f:
+            html = rewrite_page(f.read(), mapping).encode('utf-8')
+        sizes = _write_with_variants(dist, name, html)
+        pages[name] = {'file': name, 'sha256': hashlib.sha256(html).hexdigest(), 'size': len(html), **sizes}
+
+    build_hash = hashlib.sha256(''.join(entry['sha256'] for entry in assets.values()).encode('ascii')).hexdigest()
+    manifest = {
+        'build': build_hash[:12],
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'assets': assets,
+        'pages': pages
+    }
+    _write(os.path.join(dist, MANIFEST_NAME), json.dumps(manifest, indent=2).encode('utf-8'))
+
+    # Remove arquivos com hash de builds anteriores
+    keep = {MANIFEST_NAME}
+    for entry in list(assets.values()) + list(pages.values()):
+        keep.add(entry['file'])
+        keep.update(entry['file'] + suffix for _, suffix in ENCODINGS)
+    for entry in os.scandir(dist):
+        if entry.is_file() and entry.name not in keep and not entry.name.endswith('.tmp'):
+            os.remove(entry.path)
+    return manifest
+
+
+class AssetManifest:
+    """manifest.json do dist/ (recarregado quando o build muda) para o Flask"""
+
+    def __init__(self, dist=DIST_DIR):
+        self.dist = dist
+        self.path = os.path.join(dist, MANIFEST_NAME)
+        self._mtime = None
+        self._files = {}
+        self._pages = {}
+        self.build = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            files, pages, build_hash = {}, {}, None
+            if mtime is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        manifest = json.load(f)
+                    files = {entry['file']: dict(entry, name=name) for name, entry in manifest['assets'].items()}
+                    pages = {name: dict(entry, name=name) for name, entry in manifest['pages'].items()}
+                    build_hash = manifest.get('build')
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"[ASSETS] Manifest inválido em {self.path}: {e}")
+            self._files, self._pages, self.build = files, pages, build_hash
+            self._mtime = mtime
+
+    def asset(self, file_name):
+        """Entrada do manifest para um arquivo com hash (ou None)"""
+        self._refresh()
+        return self._files.get(file_name)
+
+    def page(self, name):
+        """Entrada do manifest para uma página reescrita (ou None)"""
+        self._refresh()
+        return self._pages.get(name)
+
+    def variant(self, entry, accept_encodings):
+        """(caminho, Content-Encoding ou None) da melhor variante aceita pelo cliente.
+
+        accept_encodings é o request.accept_encodings do Flask.
+        """
+        for encoding, suffix in ENCODINGS:
+            if entry.get(encoding) and accept_encodings.quality(encoding) > 0:
+                return os.path.join(self.dist, entry['file'] + suffix), encoding
+        return os.path.join(self.dist, entry['file']), None
+
+    def stats(self):
+        self._refresh()
+        return {'build': self.build, 'assets': len(self._files), 'pages': len(self._pages)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera os arquivos estáticos com hash e pré-comprimidos")
+    parser.add_argument('--dist', default=DIST_DIR, help="Diretório de saída (padrão dist/)")
+    parser.add_argument('--no-version', action='store_true', help="Não atualiza o version.json")
+    args = parser.parse_args()
+
+    manifest = build(dist=args.dist)
+    print(f"[BUILD] Build {manifest['build']} em {args.dist}")
+    if not HAS_BROTLI:
+        print("[BUILD] brotli não instalado: só variantes .gz (pip install brotli)")
+    for name, entry in list(manifest['assets'].items()) + list(manifest['pages'].items()):
+        gz = f"{entry['gzip'] / 1024:.1f} KB" if entry['gzip'] else '-'
+        br = f"{entry['br'] / 1024:.1f} KB" if entry['br'] else '-'
+        print(f"  {name:26} -> {entry['file']:36} {entry['size'] / 1024:7.1f} KB  gzip {gz:>9}  br {br:>9}")
+
+    if not args.no_version:
+        from update_version import update_from_manifest
+        update_from_manifest(manifest)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
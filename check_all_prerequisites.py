@@ -5,104 +5,65 @@ Script para verificar TODOS os pré-requisitos e identificar problemas específi
 
 import json
 
-def load_database():
-    with open('quests-database.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+from quest_graph import load_graph
 
-def build_index(data):
-    """Cria índice completo de quests"""
-    quest_by_id = {}
-    quest_by_npc = {}
-    
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        quest_by_npc[npc_id] = {}
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            if quest_id:
-                quest_by_id[quest_id] = (npc_id, quest)
-                quest_by_npc[npc_id][quest_id] = quest
-    
-    return quest_by_id, quest_by_npc
+def load_database():
+    return load_graph()
 
-def check_all_quests(data, quest_by_id, quest_by_npc):
+def check_all_quests(graph):
     """Verifica todas as quests e seus pré-requisitos"""
     problems = []
     
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        npc_name = npc_data.get('name', npc_id)
+    for quest in range(len(graph)):
+        npc_of = graph.npc_of[quest]
+        npc_name = graph.npc_name(quest)
+        quest_id = graph.ids[quest]
+        quest_name = graph.names[quest]
         
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            quest_name = quest.get('name', 'Unknown')
-            prerequisites = quest.get('prerequisites', [])
-            prerequisites_external = quest.get('prerequisitesExternal', [])
-            
-            # Verificar cada pré-requisito interno
-            for prereq_id in prerequisites:
-                if prereq_id not in quest_by_id:
-                    problems.append({
-                        'type': 'missing_id',
-                        'npc': npc_name,
-                        'quest_id': quest_id,
-                        'quest_name': quest_name,
-                        'prerequisite_id': prereq_id,
-                        'location': 'prerequisites',
-                        'issue': f'ID nao existe no banco de dados'
-                    })
-                else:
-                    prereq_npc, _ = quest_by_id[prereq_id]
-                    if prereq_npc != npc_id:
-                        problems.append({
-                            'type': 'wrong_location',
-                            'npc': npc_name,
-                            'quest_id': quest_id,
-                            'quest_name': quest_name,
-                            'prerequisite_id': prereq_id,
-                            'prerequisite_npc': prereq_npc,
-                            'location': 'prerequisites',
-                            'issue': f'Pre-requisito esta em {prereq_npc}, mas esta em prerequisites (deveria estar em prerequisitesExternal)'
-                        })
+        # Pré-requisitos internos primeiro, depois os externos
+        for target, is_external in graph.prerequisite_entries(quest):
+            location = 'prerequisitesExternal' if is_external else 'prerequisites'
+            if target < 0:
+                problems.append({
+                    'type': 'missing_id',
+                    'npc': npc_name,
+                    'quest_id': quest_id,
+                    'quest_name': quest_name,
+                    'prerequisite_id': graph.missing_ids[~target],
+                    'location': location,
+                    'issue': f'ID nao existe no banco de dados'
+                })
+                continue
             
-            # Verificar cada pré-requisito externo
-            for prereq_id in prerequisites_external:
-                if prereq_id not in quest_by_id:
-                    problems.append({
-                        'type': 'missing_id',
-                        'npc': npc_name,
-                        'quest_id': quest_id,
-                        'quest_name': quest_name,
-                        'prerequisite_id': prereq_id,
-                        'location': 'prerequisitesExternal',
-                        'issue': f'ID nao existe no banco de dados'
-                    })
-                else:
-                    prereq_npc, _ = quest_by_id[prereq_id]
-                    if prereq_npc == npc_id:
-                        problems.append({
-                            'type': 'wrong_location',
-                            'npc': npc_name,
-                            'quest_id': quest_id,
-                            'quest_name': quest_name,
-                            'prerequisite_id': prereq_id,
-                            'prerequisite_npc': prereq_npc,
-                            'location': 'prerequisitesExternal',
-                            'issue': f'Pre-requisito esta no mesmo NPC ({prereq_npc}), mas esta em prerequisitesExternal (deveria estar em prerequisites)'
-                        })
+            prereq_npc = graph.npc_id(target)
+            if not is_external and graph.npc_of[target] != npc_of:
+                issue = f'Pre-requisito esta em {prereq_npc}, mas esta em prerequisites (deveria estar em prerequisitesExternal)'
+            elif is_external and graph.npc_of[target] == npc_of:
+                issue = f'Pre-requisito esta no mesmo NPC ({prereq_npc}), mas esta em prerequisitesExternal (deveria estar em prerequisites)'
+            else:
+                continue
+            problems.append({
+                'type': 'wrong_location',
+                'npc': npc_name,
+                'quest_id': quest_id,
+                'quest_name': quest_name,
+                'prerequisite_id': graph.ids[target],
+                'prerequisite_npc': prereq_npc,
+                'location': location,
+                'issue': issue
+            })
     
     return problems
 
 def main():
     print("Carregando banco de dados...")
-    data = load_database()
-    
-    print("Construindo indices...")
-    quest_by_id, quest_by_npc = build_index(data)
+    graph = load_database()
     
-    print(f"Total de quests: {len(quest_by_id)}")
-    print(f"Total de NPCs: {len(quest_by_npc)}")
+    print(f"Total de quests: {len(graph.index)}")
+    print(f"Total de NPCs: {len(graph.npcs)}")
     
     print("\nVerificando todos os pre-requisitos...")
-    problems = check_all_quests(data, quest_by_id, quest_by_npc)
+    problems = check_all_quests(graph)
     
     if problems:
         print(f"\n[ERRO] Encontrados {len(problems)} problemas:\n")
@@ -4,20 +4,10 @@ Script para verificar quais quests do Therapist deveriam estar disponíveis
 baseado nas quests que o usuário tem ativas no jogo
 """
 
-import json
+from quest_graph import load_graph
 
 def load_database():
-    with open('quests-database.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def build_index(data):
-    quest_by_id = {}
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            if quest_id:
-                quest_by_id[quest_id] = (npc_id, quest)
-    return quest_by_id
+    return load_graph()
 
 def check_availability(quest, completed_quests, quest_by_id):
     """Verifica se uma quest está disponível baseado nas quests completadas"""
@@ -39,8 +29,8 @@ def check_availability(quest, completed_quests, quest_by_id):
     return len(missing) == 0, missing
 
 def main():
-    data = load_database()
-    quest_by_id = build_index(data)
+    graph = load_database()
+    quest_by_id = graph.quest_by_id()
     
     # Quests que o usuário tem ATIVAS no jogo (baseado na imagem)
     active_quests = [
@@ -77,7 +67,7 @@ def main():
     print("Quests que aparecem como COMPLETADAS no site:")
     print("-" * 80)
     
-    therapist_quests = data['npcs']['therapist']['quests']
+    therapist_quests = [graph.quest_dict(i) for i in graph.npc_quests('therapist')]
     
     for quest in therapist_quests:
         quest_id = quest.get('id')
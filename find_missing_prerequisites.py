@@ -4,121 +4,141 @@ Script para encontrar quests que podem ter pré-requisitos faltando
 baseado em referências cruzadas e padrões comuns
 """
 
+import argparse
 import json
 import re
+import time
+
+from quest_graph import load_graph
+
+PART_RE = re.compile(r'part\s+\d+', re.IGNORECASE)
 
 def load_database():
-    with open('quests-database.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return load_graph()
 
-def build_index(data):
-    quest_by_id = {}
-    quest_by_name = {}
-    
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            quest_name = quest.get('name', '').lower()
-            if quest_id:
-                quest_by_id[quest_id] = (npc_id, quest)
-                quest_by_name[quest_name] = (npc_id, quest)
-    
-    return quest_by_id, quest_by_name
+PART_ONE_RE = re.compile(r'\s*-?\s*part\s+(?:1|i)\b.*', re.IGNORECASE)
+PART_TWO_RE = re.compile(r'\s*-?\s*part\s+(?:2|ii)\b.*', re.IGNORECASE)
+
+def build_part_one_index(graph):
+    """{nome base em minúsculas: [quests "Part 1"]}, montado uma vez.
+
+    O nome base é o nome sem o " - Part 1"; cada "Part 2" encontra a sua
+    Part 1 com uma consulta ao dict, em vez de varrer todas as Part 1.
+    """
+    part_one = {}
+    for quest in range(len(graph)):
+        name = graph.names[quest]
+        base_name = PART_ONE_RE.sub('', name)
+        if base_name != name:
+            part_one.setdefault(base_name.lower(), []).append(quest)
+    return part_one
+
+def referenced_by(graph, quest):
+    """(NPC, nome) das quests que têm esta como pré-requisito.
+
+    Usa o índice reverso do grafo (dependentes), montado em O(E).
+    """
+    result = []
+    previous = None
+    for other in graph.dependents(quest):
+        # Um ID repetido na lista de pré-requisitos conta uma vez só
+        if other != previous:
+            result.append((graph.npc_name(other), graph.names[other]))
+        previous = other
+    return result
 
-def find_quests_with_no_prerequisites(data, quest_by_id):
+def find_quests_with_no_prerequisites(graph):
     """Encontra quests sem pré-requisitos que podem ter pré-requisitos faltando"""
     suspicious = []
     
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            quest_name = quest.get('name', '')
-            prerequisites = quest.get('prerequisites', [])
-            prerequisites_external = quest.get('prerequisitesExternal', [])
-            
-            # Quests sem pré-requisitos que podem ter pré-requisitos faltando
-            if not prerequisites and not prerequisites_external:
-                # Verificar se há outras quests que referenciam esta
-                referenced_by = []
-                for other_npc_id, other_npc_data in data.get('npcs', {}).items():
-                    for other_quest in other_npc_data.get('quests', []):
-                        other_prereqs = (other_quest.get('prerequisites', []) + 
-                                        other_quest.get('prerequisitesExternal', []))
-                        if quest_id in other_prereqs:
-                            referenced_by.append((other_npc_data.get('name'), other_quest.get('name')))
-                
-                # Se é uma quest "Part 2", "Part 3", etc, provavelmente tem pré-requisito
-                if re.search(r'part\s+\d+', quest_name, re.IGNORECASE):
-                    suspicious.append({
-                        'npc': npc_data.get('name'),
-                        'quest_id': quest_id,
-                        'quest_name': quest_name,
-                        'reason': 'Quest com "Part" mas sem pre-requisitos',
-                        'referenced_by': referenced_by
-                    })
-                # Se outras quests referenciam esta, pode ter pré-requisito faltando
-                elif referenced_by:
-                    suspicious.append({
-                        'npc': npc_data.get('name'),
-                        'quest_id': quest_id,
-                        'quest_name': quest_name,
-                        'reason': 'Referenciada por outras quests mas sem pre-requisitos',
-                        'referenced_by': referenced_by
-                    })
+    for quest in range(len(graph)):
+        # Quests sem pré-requisitos que podem ter pré-requisitos faltando
+        if graph.has_prerequisites(quest):
+            continue
+        
+        quest_name = graph.names[quest]
+        references = referenced_by(graph, quest)
+        
+        # Se é uma quest "Part 2", "Part 3", etc, provavelmente tem pré-requisito
+        if PART_RE.search(quest_name):
+            reason = 'Quest com "Part" mas sem pre-requisitos'
+        # Se outras quests referenciam esta, pode ter pré-requisito faltando
+        elif references:
+            reason = 'Referenciada por outras quests mas sem pre-requisitos'
+        else:
+            continue
+        
+        suspicious.append({
+            'npc': graph.npc_name(quest),
+            'quest_id': graph.ids[quest],
+            'quest_name': quest_name,
+            'reason': reason,
+            'referenced_by': references
+        })
     
     return suspicious
 
-def find_quests_referencing_others(data, quest_by_id):
+def find_quests_referencing_others(graph, part_one=None):
     """Encontra quests que referenciam outras mas não têm pré-requisitos"""
+    if part_one is None:
+        part_one = build_part_one_index(graph)
     issues = []
     
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            quest_name = quest.get('name', '')
-            prerequisites = quest.get('prerequisites', [])
-            prerequisites_external = quest.get('prerequisitesExternal', [])
-            
-            # Verificar se há referências a outras quests no nome ou contexto
-            # que não estão nos pré-requisitos
-            all_prereqs = prerequisites + prerequisites_external
-            
-            # Buscar por padrões comuns
-            if 'part 2' in quest_name.lower() or 'part ii' in quest_name.lower():
-                # Deveria ter Part 1 como pré-requisito
-                base_name = re.sub(r'\s*-\s*part\s+2.*', '', quest_name, flags=re.IGNORECASE)
-                base_name = re.sub(r'\s*-\s*part\s+ii.*', '', base_name, flags=re.IGNORECASE)
-                
-                # Procurar Part 1 correspondente
-                for other_npc_id, other_npc_data in data.get('npcs', {}).items():
-                    for other_quest in other_npc_data.get('quests', []):
-                        other_name = other_quest.get('name', '')
-                        if (base_name.lower() in other_name.lower() and 
-                            ('part 1' in other_name.lower() or 'part i' in other_name.lower()) and
-                            other_quest.get('id') not in all_prereqs):
-                            issues.append({
-                                'npc': npc_data.get('name'),
-                                'quest_id': quest_id,
-                                'quest_name': quest_name,
-                                'issue': f'Pode precisar de "{other_quest.get("name")}" ({other_quest.get("id")}) como pre-requisito',
-                                'suggested_prerequisite': other_quest.get('id'),
-                                'suggested_npc': other_npc_data.get('name')
-                            })
+    for quest in range(len(graph)):
+        quest_name = graph.names[quest]
+        
+        # Buscar por padrões comuns ("Part 2" / "Part II", não "Part 20")
+        base_name = PART_TWO_RE.sub('', quest_name)
+        if base_name == quest_name:
+            continue
+        
+        # Deveria ter Part 1 como pré-requisito
+        all_prereqs = set(graph.prerequisite_ids(quest))
+        
+        # Part 1 correspondente (consulta ao índice)
+        for other in part_one.get(base_name.lower(), []):
+            if graph.ids[other] not in all_prereqs:
+                issues.append({
+                    'npc': graph.npc_name(quest),
+                    'quest_id': graph.ids[quest],
+                    'quest_name': quest_name,
+                    'issue': f'Pode precisar de "{graph.names[other]}" ({graph.ids[other]}) como pre-requisito',
+                    'suggested_prerequisite': graph.ids[other],
+                    'suggested_npc': graph.npc_name(other)
+                })
     
     return issues
 
+def print_profile(timings, graph):
+    """Tempo de cada etapa (--profile)"""
+    print("\n" + "=" * 80)
+    print(f"PERFIL ({len(graph)} quests, {graph.edge_count()} arestas)")
+    print("=" * 80)
+    for step, seconds in timings:
+        print(f"  {step:45} {seconds * 1000:9.3f} ms")
+    print(f"  {'Total':45} {sum(s for _, s in timings) * 1000:9.3f} ms")
+
 def main():
-    print("Carregando banco de dados...")
-    data = load_database()
+    parser = argparse.ArgumentParser(description="Procura quests com pré-requisitos faltando")
+    parser.add_argument('--profile', action='store_true', help="Mostra o tempo de cada heurística")
+    args = parser.parse_args()
+    timings = []
     
-    print("Construindo indices...")
-    quest_by_id, quest_by_name = build_index(data)
+    def timed(step, fn, *fn_args):
+        start = time.perf_counter()
+        result = fn(*fn_args)
+        timings.append((step, time.perf_counter() - start))
+        return result
+    
+    print("Carregando banco de dados...")
+    graph = timed('Carregar grafo', load_database)
+    part_one = timed('Indice de nomes "Part 1"', build_part_one_index, graph)
     
     print("\nProcurando quests suspeitas sem pre-requisitos...")
-    suspicious = find_quests_with_no_prerequisites(data, quest_by_id)
+    suspicious = timed('Quests sem pre-requisitos', find_quests_with_no_prerequisites, graph)
     
     print("\nProcurando quests que podem ter pre-requisitos faltando...")
-    issues = find_quests_referencing_others(data, quest_by_id)
+    issues = timed('Part 2 sem a Part 1', find_quests_referencing_others, graph, part_one)
     
     print("\n" + "=" * 80)
     print("QUESTS SUSPEITAS (sem pre-requisitos mas podem ter)")
@@ -158,6 +178,9 @@ def main():
         json.dump(report, f, indent=2, ensure_ascii=False)
     
     print(f"\n\nRelatorio salvo em: missing_prerequisites_report.json")
+    
+    if args.profile:
+        print_profile(timings, graph)
 
 if __name__ == '__main__':
     main()
@@ -1,5 +1,5 @@
 import json
-import re
+from link_health import url_issues
 
 # Carregar JSON
 with open('quests-data.json', 'r', encoding='utf-8') as f:
@@ -16,22 +16,7 @@ for npc_id, npc_data in data['npcs'].items():
         name = quest['name']
         
         # Verificar padrões que podem causar problemas
-        issues = []
-        
-        # Verificar se tem caracteres especiais não codificados
-        if "'" in name and "%27" not in url:
-            issues.append("Apostrofo nao codificado")
-        
-        if "?" in name and "%3F" not in url:
-            issues.append("Interrogacao nao codificada")
-        
-        # Verificar formato de "Part X"
-        if " - Part " in name and "_-_Part_" not in url:
-            issues.append("Formato de 'Part' pode estar incorreto")
-        
-        # Verificar espaços
-        if " " in name and name.count(" ") > name.count("_"):
-            issues.append("Pode ter espacos nao convertidos")
+        issues = url_issues(name, url)
         
         if issues:
             problematic.append((npc_data['name'], name, url, issues))
@@ -7,21 +7,18 @@ baseado em padrões e referências cruzadas
 import json
 import re
 
+from quest_graph import load_graph
+
 def load_database():
     with open('quests-database.json', 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def build_index(data):
-    quest_by_id = {}
+def build_index(graph):
+    quest_by_id = graph.quest_by_id()
     quest_by_name = {}
     
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            quest_name = quest.get('name', '').lower()
-            if quest_id:
-                quest_by_id[quest_id] = (npc_id, quest)
-                quest_by_name[quest_name] = (npc_id, quest)
+    for quest_id, (npc_id, quest) in quest_by_id.items():
+        quest_by_name[quest.get('name', '').lower()] = (npc_id, quest)
     
     return quest_by_id, quest_by_name
 
@@ -142,7 +139,7 @@ def main():
     data = load_database()
     
     print("Construindo indices...")
-    quest_by_id, quest_by_name = build_index(data)
+    quest_by_id, quest_by_name = build_index(load_graph())
     
     print("\nProcurando quests Part que faltam pre-requisitos...")
     fixes = find_part_quests_missing_prereqs(data, quest_by_id)
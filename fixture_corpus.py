@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Corpus offline de páginas da wiki para medir o scraper sem rede.
+
+As páginas ficam comprimidas em fixtures/pages/<slug>.html.gz (e o wikitext
+da API em fixtures/wikitext/<slug>.txt.gz). fixtures/manifest.json lista cada
+página com a URL original, o tipo (quest ou npc), a origem e o resultado
+esperado da extração. Só o esperado das páginas gravadas detecta regressões
+nos parsers.
+
+Dois modos de gerar o corpus:
+    record     baixa as páginas reais da wiki uma única vez; o resultado
+               esperado é o do parser original (árvore completa, html.parser)
+    synthetic  gera páginas de quest no formato do fandom a partir do
+               quests-details.json, sem rede; o esperado é o próprio conteúdo
+               usado para gerar a página, então os benchmarks não o conferem.
+               Não gera páginas de NPC.
+
+Uso:
+    python fixture_corpus.py record [--limit N] [URLs...]
+    python fixture_corpus.py synthetic [--limit N]
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+from html import escape
+from urllib.parse import unquote
+
+from quest_cache import normalize_wiki_url
+import quest_parser
+import wiki_api
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BASE_DIR, 'fixtures')
+PAGES_DIR = os.path.join(FIXTURES_DIR, 'pages')
+WIKITEXT_DIR = os.path.join(FIXTURES_DIR, 'wikitext')
+MANIFEST_FILE = os.path.join(FIXTURES_DIR, 'manifest.json')
+
+DEFAULT_LIMIT = 25
+NPC_PAGES = ['Prapor', 'Therapist', 'Skier', 'Peacekeeper', 'Mechanic', 'Ragman', 'Jaeger', 'Lightkeeper']
+
+
+def slug_for(wiki_url):
+    """Nome de arquivo da página ('.../wiki/A_B' -> 'A_B')"""
+    return wiki_api.title_from_url(wiki_url).replace(' ', '_').replace('/', '%2F')
+
+
+def write_gz(path, data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # mtime=0 deixa o arquivo idêntico entre gerações (diffs limpos no git)
+    with open(path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+            f.write(data)
+
+
+def read_gz(path):
+    with gzip.open(path, 'rb') as f:
+        return f.read()
+
+
+def load_manifest(path=MANIFEST_FILE):
+    """Lista de páginas do corpus (vazia se ainda não foi gerado)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['pages']
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def save_manifest(pages, path=MANIFEST_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'pages': pages}, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def page_path(entry):
+    return os.path.join(FIXTURES_DIR, entry['page'])
+
+
+def synthetic_paths(path=MANIFEST_FILE):
+    """Caminhos absolutos das páginas sintéticas do corpus"""
+    return {os.path.abspath(page_path(entry)) for entry in load_manifest(path)
+            if entry.get('source') == 'synthetic'}
+
+
+def warn_synthetic(count, total, notes=()):
+    """Aviso impresso pelos benchmarks quando o corpus tem páginas sintéticas"""
+    print("=" * 72)
+    print(f"AVISO: {count} de {total} páginas são do corpus SINTÉTICO.")
+    print("Elas foram geradas a partir do quests-details.json no mesmo formato que")
+    print("os recortes do quest_parser esperam: os tempos não representam as páginas")
+    print("reais do fandom e uma extração idêntica não prova nada.")
+    for note in notes:
+        print(note)
+    print("Grave páginas reais com:")
+    print("    python fixture_corpus.py record")
+    print("=" * 72 + "\n")
+
+
+def load_page(entry):
+    """HTML da página (bytes)"""
+    return read_gz(page_path(entry))
+
+
+def load_wikitext(entry):
+    """Wikitext da página (str) ou None"""
+    if not entry.get('wikitext'):
+        return None
+    return read_gz(os.path.join(FIXTURES_DIR, entry['wikitext'])).decode('utf-8')
+
+
+def quest_urls(limit=DEFAULT_LIMIT):
+    """URLs de quests do quests-database.json, espalhadas entre os NPCs"""
+    with open(os.path.join(BASE_DIR, 'quests-database.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    per_npc = [[q['wikiUrl'] for q in npc['quests'] if q.get('wikiUrl')] for npc in data['npcs'].values()]
+    urls = []
+    index = 0
+    while len(urls) < limit and any(index < len(q) for q in per_npc):
+        for quests in per_npc:
+            if index < len(quests) and len(urls) < limit:
+                urls.append(quests[index])
+        index += 1
+    return urls
+
+
+# ---------------------------------------------------------------------------
+# Gravação das páginas reais
+# ---------------------------------------------------------------------------
+
+def record(urls, npc_pages=NPC_PAGES):
+    """Baixa as páginas (uma vez) e grava o corpus com o resultado esperado"""
+    import http_pool
+    from quest_scrape import extract_revision_id
+
+    entries = []
+    targets = [(url, 'quest') for url in urls]
+    targets += [(f'https://escapefromtarkov.fandom.com/wiki/{name}', 'npc') for name in npc_pages]
+
+    titles = [wiki_api.title_from_url(url) for url, _ in targets]
+    try:
+        wikitexts = wiki_api.fetch_pages(titles)
+    except Exception as e:
+        print(f"[FIXTURES] Falha ao buscar wikitext pela API: {e}")
+        wikitexts = {}
+
+    for i, (url, kind) in enumerate(targets, 1):
+        slug = slug_for(url)
+        print(f"[{i}/{len(targets)}] {url}")
+        try:
+            response = http_pool.get(url)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"  [ERRO] {e}")
+            continue
+
+        entry = {
+            'slug': slug,
+            'title': wiki_api.title_from_url(url),
+            'url': normalize_wiki_url(url),
+            'kind': kind,
+            'source': 'recorded',
+            'revision_id': extract_revision_id(response.content),
+            'page': f'pages/{slug}.html.gz',
+            'wikitext': None,
+            'expected': None,
+            'expected_api': None
+        }
+        write_gz(page_path(entry), response.content)
+
+        if kind == 'quest':
+            # Referência: o parser original, com a árvore completa
+            entry['expected'] = quest_parser.parse_quest_page_full(response.content, 'html.parser')
+
+        page = wikitexts.get(entry['title'])
+        if page and page.get('wikitext'):
+            entry['wikitext'] = f'wikitext/{slug}.txt.gz'
+            write_gz(os.path.join(FIXTURES_DIR, entry['wikitext']), page['wikitext'])
+            if kind == 'quest':
+                entry['expected_api'] = wiki_api.parse_quest_wikitext(page['title'], page['wikitext'])
+        entries.append(entry)
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# Páginas sintéticas (formato do fandom, sem rede)
+# ---------------------------------------------------------------------------
+
+def _chrome(rng, count):
+    """Navegação, scripts e anúncios que cercam o conteúdo nas páginas reais"""
+    parts = []
+    for i in range(count):
+        parts.append(
+            f'<li class="wds-dropdown__item"><a href="/wiki/Page_{rng.randint(1, 99999)}" '
+            f'data-tracking="nav-{i}">Item {i}</a></li>'
+        )
+        if i % 10 == 0:
+            parts.append(f'<script>window.ads = window.ads || []; ads.push({{slot: "slot-{i}"}});</script>')
+    return '<ul class="wds-list">' + ''.join(parts) + '</ul>'
+
+
+def _image_name(image_url):
+    """Nome do arquivo na wiki a partir da URL da imagem"""
+    path = image_url.split('/revision/')[0]
+    return unquote(path.rsplit('/', 1)[-1])
+
+
+def _figure(image_url, rng):
+    name = escape(_image_name(image_url))
+    scaled = f"{image_url}/scale-to-width-down/{rng.choice([300, 450, 640])}?cb={rng.randint(10**13, 10**14)}"
+    return (
+        '<figure class="thumb tright show-info-icon">'
+        f'<a href="{escape(image_url)}" class="image">'
+        '<img src="data:image/gif;base64,R0lGODlhAQABAIABAAAAAP///yH5BAEAAAEALAAAAAABAAEAQAICTAEAOw%3D%3D" '
+        f'alt="{name}" class="thumbimage lazyload" data-src="{escape(scaled)}" width="450" height="253">'
+        '</a>'
+        f'<figcaption class="thumbcaption">{name}</figcaption></figure>'
+    )
+
+
+def synthetic_page(title, npc, objectives, guide_images, revision_id, rng):
+    """HTML no formato das páginas de quest do fandom"""
+    objectives_html = ''.join(f'<li>{escape(obj)}</li>' for obj in objectives)
+    guide_html = ''.join(_figure(url, rng) for url in guide_images)
+    # Ícone e imagem pequena: devem ser ignorados pelo parser
+    guide_html += (
+        '<p><img class="item-icon" src="https://static.wikia.nocookie.net/icon.png" width="64">'
+        '<img src="https://static.wikia.nocookie.net/small.png" width="32"></p>'
+    )
+    npc_html = escape(npc)
+    return f'''<!DOCTYPE html>
+<html lang="en" dir="ltr"><head><meta charset="UTF-8"><title>{escape(title)} | Escape from Tarkov Wiki | Fandom</title>
+<script>var mw_config = {{"wgPageName":"{escape(title.replace(' ', '_'))}","wgCurRevisionId":{revision_id},"wgRevisionId":{revision_id}}};</script>
+<style>{'.wds-global-navigation{display:flex}' * 50}</style>
+</head><body class="skin-fandomdesktop">
+<nav class="global-navigation">{_chrome(rng, 400)}</nav>
+<main class="page__main">
+<div class="page-header"><h1 class="page-header__title" id="firstHeading">
+  {escape(title)}
+</h1></div>
+<div id="content" class="page-content"><div id="mw-content-text" class="mw-body-content">
+<div class="mw-parser-output">
+<aside class="portable-infobox pi-background pi-border-color pi-theme-wikia pi-layout-default">
+<h2 class="pi-item pi-title" data-source="title">{escape(title)}</h2>
+<div class="pi-item pi-data" data-source="location"><h3 class="pi-data-label">Location</h3><div class="pi-data-value">Any</div></div>
+<div class="pi-item pi-data" data-source="trader"><h3 class="pi-data-label">Given by</h3><div class="pi-data-value"><a href="/wiki/{npc_html}" title="{npc_html}">{npc_html}</a></div></div>
+</aside>
+<p><b>{escape(title)}</b> is a quest in Escape from Tarkov.</p>
+<div id="toc" class="toc"><ul><li><a href="#Objectives">Objectives</a></li><li><a href="#Rewards">Rewards</a></li><li><a href="#Guide">Guide</a></li></ul></div>
+<h2><span class="mw-headline" id="Description">Description</span></h2>
+<p>Synthetic fixture page generated from quests-details.json.</p>
+<h2><span class="mw-headline" id="Objectives">Objectives</span><span class="mw-editsection"></span></h2>
+<ul>{objectives_html}</ul>
+<h2><span class="mw-headline" id="Rewards">Rewards</span></h2>
+<ul><li>+{rng.randint(1000, 30000)} EXP</li><li>{npc_html} Rep +0.0{rng.randint(1, 9)}</li></ul>
+<h2><span class="mw-headline" id="Guide">Guide</span></h2>
+{guide_html}
+<h2><span class="mw-headline" id="Trivia">Trivia</span></h2>
+<p><img src="https://static.wikia.nocookie.net/trivia.png" width="300"></p>
+</div></div></div>
+</main>
+<footer class="global-footer">{_chrome(rng, 200)}</footer>
+</body></html>
+'''
+
+
+def synthetic_wikitext(title, npc, objectives, guide_images):
+    """Wikitext equivalente, para a API (action=query)"""
+    lines = ['{{Infobox quest', f'|given by = [[{npc}]]', '|location = Any', '}}', '',
+             f"'''{title}''' is a quest in Escape from Tarkov.", '', '== Objectives ==']
+    lines += [f'* {obj}' for obj in objectives]
+    lines += ['', '== Rewards ==', '* EXP', '', '== Guide ==', '<gallery>']
+    lines += [f'File:{_image_name(url)}|caption' for url in guide_images]
+    lines += ['</gallery>', '[[File:Item_icon.png|64px]]', '', '== Trivia ==', '[[File:Trivia.png]]']
+    return '\n'.join(lines) + '\n'
+
+
+def synthesize(limit=DEFAULT_LIMIT):
+    """Gera o corpus sintético a partir do quests-details.json"""
+    with open(os.path.join(BASE_DIR, 'quests-details.json'), 'r', encoding='utf-8') as f:
+        details = json.load(f).get('details', {})
+    with open(os.path.join(BASE_DIR, 'quests-database.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    npc_by_url = {}
+    for npc in data['npcs'].values():
+        for quest in npc['quests']:
+            if quest.get('wikiUrl'):
+                npc_by_url[normalize_wiki_url(quest['wikiUrl'])] = npc['name']
+
+    entries = []
+    for url in quest_urls(limit):
+        key = normalize_wiki_url(url)
+        detail = details.get(key)
+        if not detail or detail.get('error') or not detail.get('name'):
+            continue
+        # Semente fixa por página: o corpus gerado é sempre o mesmo
+        rng = random.Random(hashlib.sha1(key.encode('utf-8')).hexdigest())
+        title = detail['name']
+        npc = npc_by_url.get(key, '')
+        objectives = detail.get('objectives', [])
+        guide_images = [image.split('?')[0] for image in detail.get('guide_images', [])]
+        revision_id = rng.randint(100000, 999999)
+        slug = slug_for(key)
+
+        entry = {
+            'slug': slug,
+            'title': title,
+            'url': key,
+            'kind': 'quest',
+            'source': 'synthetic',
+            'revision_id': revision_id,
+            'page': f'pages/{slug}.html.gz',
+            'wikitext': f'wikitext/{slug}.txt.gz',
+            'expected': {
+                'name': title,
+                'npc': npc,
+                'objectives': objectives,
+                'guide_images': guide_images
+            }
+        }
+        write_gz(page_path(entry), synthetic_page(title, npc, objectives, guide_images, revision_id, rng))
+        wikitext = synthetic_wikitext(title, npc, objectives, guide_images)
+        write_gz(os.path.join(FIXTURES_DIR, entry['wikitext']), wikitext)
+        entry['expected_api'] = wiki_api.parse_quest_wikitext(title, wikitext)
+        entries.append(entry)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o corpus offline de páginas da wiki")
+    parser.add_argument('mode', choices=['record', 'synthetic'])
+    parser.add_argument('urls', nargs='*', help="URLs de quests a gravar (padrão: amostra do quests-database.json)")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f"Quantidade de quests na amostra (padrão: {DEFAULT_LIMIT})")
+    args = parser.parse_args()
+
+    if args.mode == 'record':
+        entries = record(args.urls or quest_urls(args.limit))
+    else:
+        entries = synthesize(args.limit)
+
+    # Mantém as páginas de outra origem que já estavam no corpus
+    slugs = {entry['slug'] for entry in entries}
+    kept = [entry for entry in load_manifest() if entry['slug'] not in slugs]
+    save_manifest(kept + entries)
+    print(f"\n[FIXTURES] {len(entries)} páginas gravadas em {FIXTURES_DIR} ({len(kept) + len(entries)} no corpus)")
+
+
+if __name__ == '__main__':
+    main()
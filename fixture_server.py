@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP local que imita a wiki a partir do corpus em fixtures/.
+
+Atende /wiki/<Título> com o HTML gravado (gzip quando o cliente aceita,
+ETag pelo ID de revisão e 304 para If-None-Match) e /api.php com o mesmo
+formato de action=query&prop=revisions da MediaWiki, então scrape_quest_info,
+o modo --refresh e o modo --api podem ser exercitados sem rede.
+
+Uso:
+    python fixture_server.py [--port 8089] [--latency 50]
+    TARKOV_WIKI_API_URL=http://127.0.0.1:8089/api.php python preprocess_quest_details.py --api
+"""
+import argparse
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import fixture_corpus
+import wiki_api
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body=b'', content_type='text/html; charset=UTF-8', headers=None):
+        self.send_response(status)
+        if status != 304:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        parsed = urlparse(self.path)
+        if parsed.path.startswith('/wiki/'):
+            self.serve_page(unquote(parsed.path[len('/wiki/'):]))
+        elif parsed.path.endswith('/api.php'):
+            self.serve_api(parse_qs(parsed.query))
+        else:
+            self._send(404, b'Not found', 'text/plain')
+
+    def serve_page(self, name):
+        entry = self.server.by_title.get(name.replace('_', ' ').strip())
+        if entry is None:
+            self._send(404, b'<html><body>There is currently no text in this page.</body></html>')
+            return
+
+        etag = f'"rev-{entry.get("revision_id")}"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, headers={'ETag': etag})
+            return
+
+        compressed = self.server.compressed_page(entry)
+        headers = {'ETag': etag, 'Cache-Control': 'private, max-age=0'}
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            headers['Content-Encoding'] = 'gzip'
+            self._send(200, compressed, headers=headers)
+        else:
+            self._send(200, gzip.decompress(compressed), headers=headers)
+
+    def serve_api(self, params):
+        titles = params.get('titles', [''])[0].split('|') if params.get('titles') else []
+        with_content = 'content' in params.get('rvprop', [''])[0]
+        query = {'normalized': [], 'pages': []}
+        for title in titles:
+            normalized = title.replace('_', ' ').strip()
+            if normalized != title:
+                query['normalized'].append({'from': title, 'to': normalized})
+            entry = self.server.by_title.get(normalized)
+            if entry is None:
+                query['pages'].append({'ns': 0, 'title': normalized, 'missing': True})
+                continue
+            revision = {'revid': entry.get('revision_id')}
+            if with_content:
+                wikitext = fixture_corpus.load_wikitext(entry)
+                if wikitext is None:
+                    query['pages'].append({'ns': 0, 'title': entry['title'], 'missing': True})
+                    continue
+                revision['slots'] = {'main': {'contentmodel': 'wikitext', 'content': wikitext}}
+            query['pages'].append({'ns': 0, 'title': entry['title'], 'revisions': [revision]})
+        body = json.dumps({'batchcomplete': True, 'query': query}).encode('utf-8')
+        self._send(200, body, 'application/json; charset=utf-8')
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pages=None, latency=0.0, verbose=False):
+        super().__init__(address, FixtureHandler)
+        pages = fixture_corpus.load_manifest() if pages is None else pages
+        self.by_title = {entry['title']: entry for entry in pages}
+        for entry in pages:
+            # A URL original pode ter título diferente do exibido na página
+            self.by_title.setdefault(wiki_api.title_from_url(entry['url']), entry)
+        self.latency = latency
+        self.verbose = verbose
+        self._compressed = {}
+
+    def compressed_page(self, entry):
+        page = self._compressed.get(entry['slug'])
+        if page is None:
+            with open(fixture_corpus.page_path(entry), 'rb') as f:
+                page = self._compressed[entry['slug']] = f.read()
+        return page
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def page_url(self, entry):
+        return f"{self.base_url}/wiki/{entry['slug']}"
+
+
+def start_fixture_server(port=0, pages=None, latency=0.0):
+    """Inicia o servidor numa thread daemon e o retorna (use .shutdown() ao final)"""
+    server = FixtureServer(('127.0.0.1', port), pages=pages, latency=latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local com as páginas de fixtures/")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.0, help="Atraso simulado por requisição (ms)")
+    args = parser.parse_args()
+
+    server = FixtureServer(('127.0.0.1', args.port), latency=args.latency / 1000.0, verbose=True)
+    print(f"[FIXTURES] {len(server.by_title)} títulos em {server.base_url}/wiki/<Título>")
+    print(f"[FIXTURES] API: {server.base_url}/api.php")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
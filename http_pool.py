@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Pool de conexões HTTP compartilhado para todas as requisições à wiki.
+
+Mantém uma única requests.Session por processo (com keep-alive), limitando o
+número de conexões por host, repetindo requisições com backoff exponencial e
+aplicando timeouts configuráveis. Assim cada worker do gunicorn reaproveita as
+conexões TCP/TLS com fandom.com e static.wikia.nocookie.net em vez de abrir
+uma nova a cada requisição.
+
+Configuração via variáveis de ambiente:
+    TARKOV_HTTP_POOL_HOSTS      número de hosts mantidos no pool (padrão 10)
+    TARKOV_HTTP_POOL_MAXSIZE    conexões simultâneas por host (padrão 10)
+    TARKOV_HTTP_RETRIES         tentativas extras em caso de falha (padrão 3)
+    TARKOV_HTTP_BACKOFF         fator de backoff em segundos (padrão 0.5)
+    TARKOV_HTTP_CONNECT_TIMEOUT timeout de conexão em segundos (padrão 5)
+    TARKOV_HTTP_READ_TIMEOUT    timeout de leitura de páginas (padrão 10)
+    TARKOV_HTTP_IMAGE_TIMEOUT   timeout de leitura de imagens (padrão 15)
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_HOSTS = int(os.environ.get('TARKOV_HTTP_POOL_HOSTS', 10))
+POOL_MAXSIZE = int(os.environ.get('TARKOV_HTTP_POOL_MAXSIZE', 10))
+RETRIES = int(os.environ.get('TARKOV_HTTP_RETRIES', 3))
+BACKOFF = float(os.environ.get('TARKOV_HTTP_BACKOFF', 0.5))
+CONNECT_TIMEOUT = float(os.environ.get('TARKOV_HTTP_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.environ.get('TARKOV_HTTP_READ_TIMEOUT', 10))
+IMAGE_TIMEOUT = float(os.environ.get('TARKOV_HTTP_IMAGE_TIMEOUT', 15))
+
+PAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+IMAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Referer': 'https://escapefromtarkov.fandom.com/',
+    'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9'
+}
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+
+
+def _build_session():
+    """Cria a Session com o adapter de pool e política de retry"""
+    retry = Retry(
+        total=RETRIES,
+        connect=RETRIES,
+        read=RETRIES,
+        backoff_factor=BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_HOSTS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=True,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """Retorna a Session compartilhada do processo atual.
+
+    A Session é recriada após um fork (workers do gunicorn) para que processos
+    diferentes nunca compartilhem o mesmo socket.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+def get(url, kind='page', timeout=None, headers=None, **kwargs):
+    """Faz um GET usando o pool compartilhado.
+
+    kind='page' usa os headers e timeout de páginas da wiki, kind='image'
+    os de imagens. Headers extras são mesclados aos padrões.
+    """
+    base_headers = IMAGE_HEADERS if kind == 'image' else PAGE_HEADERS
+    merged = dict(base_headers)
+    if headers:
+        merged.update(headers)
+    if timeout is None:
+        read_timeout = IMAGE_TIMEOUT if kind == 'image' else READ_TIMEOUT
+        timeout = (CONNECT_TIMEOUT, read_timeout)
+    return get_session().get(url, headers=merged, timeout=timeout, **kwargs)
+
+
+def pool_stats():
+    """Estatísticas de reaproveitamento de conexões por host.
+
+    Cada requisição que não precisou abrir uma conexão nova conta como hit;
+    cada conexão aberta conta como miss.
+    """
+    hosts = {}
+    total_requests = 0
+    total_connections = 0
+
+    session = _session if _session_pid == os.getpid() else None
+    if session is not None:
+        seen = set()
+        for adapter in session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_made = pool.num_requests
+                connections = pool.num_connections
+                hosts[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+                    'requests': requests_made,
+                    'hits': max(requests_made - connections, 0),
+                    'misses': connections,
+                    'idle_connections': sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0,
+                    'maxsize': pool.pool.maxsize if pool.pool else POOL_MAXSIZE
+                }
+                total_requests += requests_made
+                total_connections += connections
+
+    hits = max(total_requests - total_connections, 0)
+    return {
+        'requests': total_requests,
+        'hits': hits,
+        'misses': total_connections,
+        'hit_ratio': round(hits / total_requests, 4) if total_requests else 0.0,
+        'hosts': hosts
+    }
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Cache em disco, endereçado por conteúdo, para o /api/image-proxy.
+
+Cada imagem baixada da wiki é gravada uma única vez em blobs/<sha256> (o hash
+do conteúdo também serve de ETag) e a URL de origem aponta para o blob através
+de urls/<sha1 da url>.json. O download é feito em blocos direto para o disco,
+então nem o download nem a resposta precisam manter a imagem inteira em
+memória. Quando o cache passa do limite de tamanho, os blobs acessados há mais
+tempo são removidos (LRU pelo mtime, atualizado a cada acesso).
+
+O tamanho total é lido do disco uma vez na inicialização e depois mantido em
+memória (somado a cada blob novo, subtraído a cada remoção). O diretório só é
+varrido de novo quando esse total passa do limite; a varredura também corrige o
+que outros workers gravaram ou removeram.
+
+Só são baixadas imagens dos hosts da wiki (IMAGE_HOSTS e seus subdomínios),
+com Content-Type image/* e até IMAGE_MAX_BYTES cada: o tamanho é conferido
+pelo Content-Length antes do download e pelos bytes lidos durante ele, que é
+interrompido assim que passa do limite.
+
+Configuração via variáveis de ambiente:
+    TARKOV_IMAGE_CACHE_DIR        diretório do cache (padrão .image_cache/)
+    TARKOV_IMAGE_CACHE_MAX_BYTES  tamanho máximo do cache (padrão 512 MB)
+    TARKOV_IMAGE_MAX_BYTES        tamanho máximo de uma imagem (padrão 10 MB)
+    TARKOV_IMAGE_HOSTS            hosts permitidos, separados por vírgula
+                                  (padrão static.wikia.nocookie.net,fandom.com)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import http_pool
+
+IMAGE_CACHE_DIR = os.environ.get(
+    'TARKOV_IMAGE_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.image_cache')
+)
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('TARKOV_IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+IMAGE_MAX_BYTES = int(os.environ.get('TARKOV_IMAGE_MAX_BYTES', 10 * 1024 * 1024))
+IMAGE_HOSTS = tuple(
+    host.strip().lower()
+    for host in os.environ.get('TARKOV_IMAGE_HOSTS', 'static.wikia.nocookie.net,fandom.com').split(',')
+    if host.strip()
+)
+CHUNK_SIZE = 64 * 1024
+
+
+class ImageRejected(ValueError):
+    """Imagem recusada pelo proxy (host, tipo ou tamanho)"""
+
+
+def allowed_url(url, hosts=IMAGE_HOSTS):
+    """True se a URL é http(s) de um dos hosts permitidos (ou subdomínio)"""
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+    except ValueError:
+        return False
+    if parts.scheme not in ('http', 'https') or not host:
+        return False
+    return any(host == allowed or host.endswith('.' + allowed) for allowed in hosts)
+
+
+class ImageCache:
+    """Cache de imagens em disco com limite de tamanho e remoção LRU"""
+
+    def __init__(self, root=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES, max_object=IMAGE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_object = max_object
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.url_dir = os.path.join(root, 'urls')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.url_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.downloads = 0
+        self.bytes_downloaded = 0
+        self.evictions = 0
+        self.rejected = 0
+        self._total = sum(size for _, size, _, _ in self._blobs())
+
+    def _meta_path(self, url):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.url_dir, digest + '.json')
+
+    def blob_path(self, content_hash):
+        return os.path.join(self.blob_dir, content_hash)
+
+    def lookup(self, url, count=True):
+        """Retorna os metadados da imagem em cache (com 'path') ou None.
+
+        count=False não conta acerto/falha (segunda consulta da mesma requisição).
+        """
+        meta_path = self._meta_path(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            if count:
+                self.misses += 1
+            return None
+
+        path = self.blob_path(meta['sha256'])
+        try:
+            # Marca o acesso para a política LRU
+            os.utime(path, None)
+        except OSError:
+            # Blob removido pela limpeza: a entrada da URL ficou órfã
+            try:
+                os.remove(meta_path)
+            except OSError:
+                pass
+            if count:
+                self.misses += 1
+            return None
+
+        if count:
+            self.hits += 1
+        meta['path'] = path
+        return meta
+
+    def _reject(self, message):
+        self.rejected += 1
+        raise ImageRejected(message)
+
+    def _check_response(self, url, response):
+        """Recusa redirecionamento para outro host, tipo que não é imagem e
+        Content-Length acima do limite"""
+        if not allowed_url(response.url):
+            self._reject(f"redirecionado para host não permitido: {response.url}")
+        content_type = response.headers.get('Content-Type', '')
+        if not content_type.split(';')[0].strip().lower().startswith('image/'):
+            self._reject(f"{url} não é uma imagem ({content_type or 'sem Content-Type'})")
+        try:
+            length = int(response.headers.get('Content-Length', 0))
+        except ValueError:
+            length = 0
+        if length > self.max_object:
+            self._reject(f"{url} tem {length} bytes (limite {self.max_object})")
+        return content_type
+
+    def fetch(self, url):
+        """Baixa a imagem para o cache (em blocos) e retorna os metadados"""
+        if not allowed_url(url):
+            self._reject(f"host não permitido: {url}")
+        response = http_pool.get(url, kind='image', stream=True, allow_redirects=True)
+        try:
+            response.raise_for_status()
+            content_type = self._check_response(url, response)
+
+            hasher = hashlib.sha256()
+            size = 0
+            tmp_path = os.path.join(
+                self.blob_dir, f".download-{os.getpid()}-{threading.get_ident()}.tmp"
+            )
+            try:
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        if chunk:
+                            size += len(chunk)
+                            if size > self.max_object:
+                                # Content-Length ausente ou errado: para no limite
+                                self._reject(f"{url} passou de {self.max_object} bytes")
+                            hasher.update(chunk)
+                            f.write(chunk)
+                content_hash = hasher.hexdigest()
+                is_new = not os.path.exists(self.blob_path(content_hash))
+                os.replace(tmp_path, self.blob_path(content_hash))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        finally:
+            response.close()
+
+        meta = {
+            'url': url,
+            'sha256': content_hash,
+            'content_type': content_type,
+            'size': size,
+            'fetched_at': time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+        meta_path = self._meta_path(url)
+        tmp_meta = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+
+        self.downloads += 1
+        self.bytes_downloaded += size
+        if is_new:
+            with self._lock:
+                self._total += size
+        print(f"[IMAGE CACHE] Baixado {url} ({size} bytes, {content_type})")
+
+        self.enforce_limit(keep=content_hash)
+        meta['path'] = self.blob_path(content_hash)
+        return meta
+
+    def _blobs(self):
+        blobs = []
+        for entry in os.scandir(self.blob_dir):
+            if entry.is_file() and not entry.name.startswith('.'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                blobs.append((stat.st_mtime, stat.st_size, entry.path, entry.name))
+        return blobs
+
+    def size_bytes(self):
+        """Tamanho total dos blobs em disco (contador em memória)"""
+        return self._total
+
+    def enforce_limit(self, keep=None):
+        """Remove os blobs menos usados até o cache caber no limite"""
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            # Só aqui o diretório é varrido (o total real inclui outros workers)
+            blobs = self._blobs()
+            total = sum(size for _, size, _, _ in blobs)
+            self._total = total
+            if total <= self.max_bytes:
+                return
+            for _, size, path, name in sorted(blobs):
+                if total <= self.max_bytes:
+                    break
+                if name == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                    self.evictions += 1
+                except OSError:
+                    pass
+            self._total = total
+
+    def stats(self):
+        """Estatísticas do cache de imagens"""
+        lookups = self.hits + self.misses
+        return {
+            'size_bytes': self.size_bytes(),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'downloads': self.downloads,
+            'bytes_downloaded': self.bytes_downloaded,
+            'evictions': self.evictions,
+            'rejected': self.rejected
+        }
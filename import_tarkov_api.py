@@ -10,6 +10,7 @@ import sys
 import io
 from pathlib import Path
 from datetime import datetime
+from quest_dist import export_database
 
 # Corrigir encoding no Windows
 if sys.platform == 'win32':
@@ -416,6 +417,10 @@ def save_to_database(database_data):
             json.dump(database_data, f, indent=2, ensure_ascii=False)
         print(f"\n[OK] Dados salvos em {filepath}")
         
+        # Forma compacta para o site (quests-database.min.json)
+        for compact_file in export_database(database_data, str(filepath)):
+            print(f"[OK] Forma compacta salva em {compact_file}")
+        
         # Mostrar resumo por NPC
         print(f"\n[INFO] Resumo por NPC:")
         for npc_id, npc_data in database_data['npcs'].items():
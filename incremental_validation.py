@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Validação incremental dos pré-requisitos (validate_prerequisites.py --incremental).
+
+Depois de cada validação é gravado um snapshot com a assinatura de cada quest
+(NPC, nome e listas de pré-requisitos) e os resultados de cada verificação por
+quest. Na validação seguinte o banco novo é comparado com o snapshot e só são
+verificadas de novo:
+
+- as quests novas ou alteradas
+- as quests que apontam para IDs removidos
+- todos os dependentes transitivos dessas quests
+
+As demais reaproveitam os resultados gravados. As dependências circulares
+também: um ciclo que passa por uma quest alterada fica inteiro dentro dos seus
+dependentes transitivos, então Tarjan roda só nesse subgrafo e os grupos
+antigos sem nenhuma quest afetada são mantidos. O relatório final é idêntico
+ao da validação completa.
+
+Configuração via variável de ambiente:
+    TARKOV_VALIDATION_SNAPSHOT  arquivo do snapshot (padrão .validation_snapshot)
+"""
+import os
+import pickle
+
+from quest_graph import BASE_DIR
+from validate_prerequisites import (
+    analyze_quest_availability,
+    detect_circular_dependencies,
+    find_blocked_quests,
+    find_orphan_quests,
+    validate_prerequisite_ids
+)
+
+SNAPSHOT_FILE = os.environ.get('TARKOV_VALIDATION_SNAPSHOT', os.path.join(BASE_DIR, '.validation_snapshot'))
+SNAPSHOT_FORMAT = 1
+
+# Verificações por quest, na ordem do relatório
+CHECKS = ('errors', 'warnings', 'orphans', 'blocked', 'available', 'blocked_by_missing')
+
+
+def quest_signatures(graph):
+    """{quest_id: (NPC, nome, pré-requisitos, flags externos)}: o que as verificações leem"""
+    ids = graph.ids
+    missing_ids = graph.missing_ids
+    offsets = graph.prereq_offsets
+    edge_ids = [ids[target] if target >= 0 else missing_ids[~target] for target in graph.prereq_targets]
+    external = bytes(graph.prereq_external)
+    npc_keys = list(zip(graph.npcs, graph.npc_names))
+    bounds = list(zip(offsets, offsets[1:]))
+    return dict(zip(ids, zip(
+        [npc_keys[n] for n in graph.npc_of],
+        graph.names,
+        [tuple(edge_ids[start:end]) for start, end in bounds],
+        [external[start:end] for start, end in bounds]
+    )))
+
+
+def run_checks(graph, quests=None, groups=None):
+    """Todas as verificações (só nas quests informadas, se houver)"""
+    errors, warnings = validate_prerequisite_ids(graph, quests)
+    available, blocked_by_missing = analyze_quest_availability(graph, quests)
+    return {
+        'errors': errors,
+        'warnings': warnings,
+        'circular': detect_circular_dependencies(graph, groups),
+        'orphans': find_orphan_quests(graph, quests),
+        'blocked': find_blocked_quests(graph, quests),
+        'available': available,
+        'blocked_by_missing': blocked_by_missing
+    }
+
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT:
+        return None
+    return snapshot
+
+
+def save_snapshot(graph, results, path=SNAPSHOT_FILE, signatures=None):
+    """Grava o snapshot da validação (results no formato de run_checks)"""
+    if not path:
+        return
+    snapshot = {
+        'format': SNAPSHOT_FORMAT,
+        'source_hash': graph.source_hash,
+        'signatures': quest_signatures(graph) if signatures is None else signatures,
+        'results': results
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[VALIDACAO] Não foi possível gravar o snapshot: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def affected_quests(graph, signatures, old_signatures):
+    """(quests a verificar de novo, alteradas, removidas) comparando com o snapshot"""
+    seeds = [graph.index[quest_id] for quest_id, signature in signatures.items()
+             if old_signatures.get(quest_id) != signature]
+    changed = len(seeds)
+
+    removed = old_signatures.keys() - signatures.keys()
+    if removed and removed & set(graph.missing_ids):
+        # Quests que apontavam para uma quest removida agora têm um ID inexistente
+        for quest in range(len(graph)):
+            if any(prereq_id in removed for prereq_id in graph.missing_prerequisites(quest)):
+                seeds.append(quest)
+
+    affected = set(seeds)
+    stack = list(seeds)
+    while stack:
+        for dependent in graph.dependents(stack.pop()):
+            if dependent not in affected:
+                affected.add(dependent)
+                stack.append(dependent)
+    return affected, changed, len(removed)
+
+
+def run_incremental(graph, path=SNAPSHOT_FILE):
+    """Resultados no formato de run_checks, um resumo do que foi verificado e as
+    assinaturas (para save_snapshot).
+
+    Sem snapshot válido (ou com IDs repetidos no banco) faz a validação completa.
+    """
+    snapshot = load_snapshot(path) if path else None
+    if snapshot is not None and graph.source_hash and snapshot['source_hash'] == graph.source_hash:
+        # Banco idêntico ao da última validação
+        return snapshot['results'], {'mode': 'incremental', 'changed': 0, 'removed': 0, 'rechecked': 0}, \
+            snapshot['signatures']
+
+    signatures = quest_signatures(graph)
+    if snapshot is None or len(graph.index) != len(graph):
+        info = {'mode': 'full', 'changed': len(graph), 'removed': 0, 'rechecked': len(graph)}
+        return run_checks(graph), info, signatures
+
+    affected, changed, removed = affected_quests(graph, signatures, snapshot['signatures'])
+    rechecked = sorted(affected)
+    affected_ids = {graph.ids[quest] for quest in rechecked}
+    old = snapshot['results']
+
+    # Ciclos: grupos antigos intactos + Tarjan só no subgrafo afetado
+    groups = graph.cycle_groups(rechecked) if rechecked else []
+    for group in old['circular']:
+        quest_ids = group['quests']
+        if any(quest_id in affected_ids or quest_id not in graph.index for quest_id in quest_ids):
+            continue
+        groups.append(sorted(graph.index[quest_id] for quest_id in quest_ids))
+    groups.sort()
+
+    # Resultados antigos das quests intactas + novos das afetadas, na ordem do banco
+    fresh = run_checks(graph, rechecked, groups=[])
+    results = {}
+    index = graph.index
+    for check in CHECKS:
+        kept = [entry for entry in old[check]
+                if entry['quest_id'] not in affected_ids and entry['quest_id'] in index]
+        results[check] = sorted(kept + fresh[check], key=lambda entry: index[entry['quest_id']])
+    results['circular'] = detect_circular_dependencies(graph, groups)
+
+    info = {'mode': 'incremental', 'changed': changed, 'removed': removed, 'rechecked': len(rechecked)}
+    return results, info, signatures
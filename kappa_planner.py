@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Planejador do caminho até o Kappa sobre o grafo de quests.
+
+A partir de um progresso qualquer (bitset de quests completas) calcula o fecho
+mínimo de pré-requisitos das quests kappaRequired (QuestSimulator.kappa_plan) e,
+com programação dinâmica sobre a ordem topológica desse fecho:
+
+- caminho crítico: a maior cadeia de dependências ainda por fazer, que limita
+  o número mínimo de "rodadas" até o Kappa
+- gargalos por trader: quantas quests faltam em cada um, a cadeia mais longa
+  que termina nele e as quests que destravam mais trabalho restante
+- ordem sugerida: Kahn com prioridade para as quests com a cadeia restante mais
+  longa (e, no empate, as que destravam mais quests)
+
+Os planos ficam memoizados por progresso (LRU), então a rota /api/kappa-plan
+responde o mesmo progresso sem recalcular.
+
+Uso:
+    python kappa_planner.py [--completed id1,id2] [--progress progresso.json|p1...]
+                            [--choice grupo=quest_id] [--top 3] [--json plano.json]
+"""
+import argparse
+import heapq
+import io
+import json
+import sys
+import time
+from collections import OrderedDict
+
+from quest_graph import load_graph
+from quest_simulation import QuestSimulator, parse_completed
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32' and __name__ == '__main__':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+PLAN_MEMO_SIZE = 256
+
+
+class KappaPlanner:
+    """Plano até o Kappa para um progresso (ver docstring do módulo)"""
+
+    def __init__(self, graph, simulator=None, memo_size=PLAN_MEMO_SIZE):
+        self.graph = graph
+        self.simulator = simulator or QuestSimulator(graph)
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def plan(self, completed=0, choices=None, top=3):
+        """Plano em índices do grafo (memoizado por progresso e escolhas)"""
+        key = (completed, tuple(sorted((choices or {}).items())), top)
+        plan = self._memo.get(key)
+        if plan is not None:
+            self._memo.move_to_end(key)
+            self.hits += 1
+            return plan
+        self.misses += 1
+        plan = self._compute(completed, choices, top)
+        self._memo[key] = plan
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        return plan
+
+    def _compute(self, completed, choices, top):
+        graph = self.graph
+        requirements = self.simulator.requirements
+        unlocked_by = self.simulator.unlocked_by
+        base = self.simulator.kappa_plan(completed, choices)
+        order = base['quests']  # ordem topológica do fecho alcançável
+        needed = set(order)
+
+        # depth: maior cadeia que termina na quest; parent reconstrói o caminho
+        depth = {}
+        parent = {}
+        for quest in order:
+            best, best_parent = 0, None
+            for requirement in requirements[quest]:
+                if requirement in needed and depth[requirement] > best:
+                    best, best_parent = depth[requirement], requirement
+            depth[quest] = best + 1
+            parent[quest] = best_parent
+
+        # height: maior cadeia que começa na quest; below: bitset dos dependentes no fecho
+        height = {}
+        below = {}
+        for quest in reversed(order):
+            best = 0
+            bits = 0
+            for dependent in unlocked_by[quest]:
+                if dependent in needed:
+                    best = max(best, height[dependent])
+                    bits |= below[dependent] | 1 << dependent
+            height[quest] = best + 1
+            below[quest] = bits
+        unlocks = {quest: below[quest].bit_count() for quest in order}
+
+        critical = []
+        if order:
+            quest = max(order, key=lambda q: (depth[q], -q))
+            while quest is not None:
+                critical.append(quest)
+                quest = parent[quest]
+            critical.reverse()
+
+        # Ordem sugerida: Kahn priorizando a cadeia restante mais longa
+        pending = {quest: sum(1 for r in requirements[quest] if r in needed) for quest in order}
+        heap = [(-height[q], -unlocks[q], q) for q in order if not pending[q]]
+        heapq.heapify(heap)
+        suggested = []
+        while heap:
+            _, _, quest = heapq.heappop(heap)
+            suggested.append(quest)
+            for dependent in unlocked_by[quest]:
+                if dependent in needed:
+                    pending[dependent] -= 1
+                    if not pending[dependent]:
+                        heapq.heappush(heap, (-height[dependent], -unlocks[dependent], dependent))
+
+        traders = {}
+        for npc_id in graph.npcs:
+            quests = [quest for quest in order if graph.npc_id(quest) == npc_id]
+            if not quests:
+                continue
+            ranked = sorted(quests, key=lambda q: (-unlocks[q], -height[q], q))[:top]
+            traders[npc_id] = {
+                'remaining': len(quests),
+                'deepest_chain': max(depth[q] for q in quests),
+                'bottlenecks': [(quest, unlocks[quest]) for quest in ranked if unlocks[quest]]
+            }
+
+        return {
+            'count': base['count'],
+            'order': suggested,
+            'critical_path': critical,
+            'traders': traders,
+            'conflicts': base['conflicts'],
+            'unreachable': base['unreachable']
+        }
+
+    def plan_ids(self, completed=0, choices=None, top=3):
+        """Mesmo plano com IDs (formato da rota /api/kappa-plan)"""
+        graph = self.graph
+        plan = self.plan(completed, choices, top)
+        return {
+            'count': plan['count'],
+            'critical_path': [graph.ids[q] for q in plan['critical_path']],
+            'critical_length': len(plan['critical_path']),
+            'order': [graph.ids[q] for q in plan['order']],
+            'traders': {
+                npc_id: {
+                    'remaining': trader['remaining'],
+                    'deepest_chain': trader['deepest_chain'],
+                    'bottlenecks': [{'id': graph.ids[q], 'unlocks': n} for q, n in trader['bottlenecks']]
+                }
+                for npc_id, trader in plan['traders'].items()
+            },
+            'conflicts': [{'group': group_id, 'quests': [graph.ids[q] for q in quests]}
+                          for group_id, quests in plan['conflicts']],
+            'unreachable': [graph.ids[q] for q in plan['unreachable']]
+        }
+
+    def stats(self):
+        return {'memo_entries': len(self._memo), 'hits': self.hits, 'misses': self.misses}
+
+
+def load_progress_argument(graph, value):
+    """Bitset a partir de um arquivo com o tarkovQuestProgress ou da forma compacta"""
+    from quest_progress import ProgressModel
+
+    model = ProgressModel(graph)
+    if value.startswith('p1.'):
+        return model.decode(value)[0]
+    with open(value, 'r', encoding='utf-8') as f:
+        completed, _, unknown = model.from_tarkov(json.load(f))
+    for quest_id in unknown:
+        print(f"[AVISO] Quest desconhecida ignorada: {quest_id}")
+    return completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caminho mínimo até o Kappa")
+    parser.add_argument('--completed', default='', help="Quests já completas, separadas por vírgula")
+    parser.add_argument('--progress', help="Arquivo JSON com o tarkovQuestProgress ou a forma compacta p1...")
+    parser.add_argument('--choice', action='append', default=[],
+                        help="Escolha de grupo exclusivo: grupo=quest_id (pode repetir)")
+    parser.add_argument('--top', type=int, default=3, help="Gargalos listados por trader (padrão: 3)")
+    parser.add_argument('--json', help="Grava o plano neste arquivo JSON")
+    args = parser.parse_args()
+
+    graph = load_graph()
+    planner = KappaPlanner(graph)
+    completed = parse_completed(graph, args.completed)
+    if args.progress:
+        completed |= load_progress_argument(graph, args.progress)
+    choices = dict(choice.split('=', 1) for choice in args.choice if '=' in choice)
+
+    start = time.perf_counter()
+    plan = planner.plan_ids(completed, choices, args.top)
+    elapsed = time.perf_counter() - start
+
+    def name(quest_id):
+        quest = graph.get(quest_id)
+        return f"{graph.names[quest]} ({graph.npc_name(quest)})"
+
+    print("=" * 80)
+    print("PLANO ATE O KAPPA")
+    print("=" * 80)
+    print(f"  Quests restantes: {plan['count']}")
+    print(f"  Caminho crítico: {plan['critical_length']} quests em sequência")
+    print(f"  Calculado em {elapsed * 1000:.1f}ms")
+    for conflict in plan['conflicts']:
+        print(f"[AVISO] Grupo exclusivo {conflict['group']} exige: {', '.join(conflict['quests'])}")
+    if plan['unreachable']:
+        print(f"[AVISO] {len(plan['unreachable'])} quests do caminho nunca ficam disponíveis: "
+              f"{', '.join(plan['unreachable'])}")
+
+    print("\n" + "-" * 80)
+    print("CAMINHO CRITICO:")
+    print("-" * 80)
+    for position, quest_id in enumerate(plan['critical_path'], 1):
+        print(f"  {position:3}. {name(quest_id)}")
+
+    print("\n" + "-" * 80)
+    print("GARGALOS POR TRADER:")
+    print("-" * 80)
+    for npc_id, trader in sorted(plan['traders'].items(), key=lambda item: -item[1]['remaining']):
+        print(f"\n  {graph.npc_names[graph.npc_index[npc_id]]}: {trader['remaining']} quests, "
+              f"cadeia mais longa {trader['deepest_chain']}")
+        for bottleneck in trader['bottlenecks']:
+            print(f"    - {name(bottleneck['id'])} destrava {bottleneck['unlocks']} quests")
+
+    print("\n" + "-" * 80)
+    print("ORDEM SUGERIDA:")
+    print("-" * 80)
+    for position, quest_id in enumerate(plan['order'], 1):
+        print(f"  {position:3}. {name(quest_id)}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, indent=2, ensure_ascii=False)
+        print(f"\nPlano salvo em: {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
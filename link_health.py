@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Verificação dos links da wiki (wikiUrl das quests) com cache persistente.
+
+Junta a lógica que estava repetida em validate_links.py, test_all_links.py,
+quick_test_links.py e find_problematic_links.py:
+
+1. os títulos são confirmados em lote pela API da MediaWiki (wiki_api.py,
+   até 50 por consulta), sem baixar página nenhuma
+2. o que sobrar é testado com HEAD; se o servidor não aceitar HEAD, com um GET
+   parcial (Range: só os primeiros KB, que bastam para reconhecer a página de
+   erro/busca da wiki) em vez da página inteira
+3. os testes rodam em paralelo pelo pool de conexões compartilhado
+   (http_pool.py), com limite de taxa por host (scrape_engine.py)
+
+Cada resultado vai para um cache em disco com TTL: numa nova auditoria só são
+testados os links novos, alterados ou com o resultado expirado. Falhas de rede
+não entram no cache (são testadas de novo na próxima execução).
+
+Configuração via variáveis de ambiente:
+    TARKOV_LINK_CACHE       arquivo do cache (padrão .link_health.json)
+    TARKOV_LINK_TTL         segundos que um link válido fica em cache (padrão 7 dias)
+    TARKOV_LINK_BROKEN_TTL  segundos que um link quebrado fica em cache (padrão 1 dia)
+
+Uso:
+    python link_health.py                      # auditoria incremental de todas as quests
+    python link_health.py --npc prapor --force # ignora o cache
+    python link_health.py --json links.json    # relatório em JSON
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import http_pool
+from quest_graph import BASE_DIR
+from scrape_engine import DEFAULT_BURST, DEFAULT_CONCURRENCY, DEFAULT_RATE, HostRateLimiter, Progress, run_concurrent
+from wiki_api import check_titles_exist, title_from_url
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32' and __name__ == '__main__':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+LINK_CACHE_FILE = os.environ.get('TARKOV_LINK_CACHE', os.path.join(BASE_DIR, '.link_health.json'))
+LINK_TTL = float(os.environ.get('TARKOV_LINK_TTL', 7 * 24 * 60 * 60))
+LINK_BROKEN_TTL = float(os.environ.get('TARKOV_LINK_BROKEN_TTL', 24 * 60 * 60))
+
+WIKI_HOST = 'escapefromtarkov.fandom.com'
+WIKI_BASE_URL = f'https://{WIKI_HOST}/wiki/'
+PROBE_BYTES = 16 * 1024  # início da página lido no GET parcial
+ERROR_MARKERS = ('page not found', 'search results', 'there is currently no text in this page')
+
+
+def url_issues(name, url):
+    """Problemas de formato da URL em relação ao nome da quest (sem rede)"""
+    issues = []
+    if "'" in name and "%27" not in url:
+        issues.append("Apostrofo nao codificado")
+    if "?" in name and "%3F" not in url:
+        issues.append("Interrogacao nao codificada")
+    if " - Part " in name and "_-_Part_" not in url:
+        issues.append("Formato de 'Part' pode estar incorreto")
+    if " " in url:
+        issues.append("Espacos nao convertidos")
+    if not url.startswith(WIKI_BASE_URL):
+        issues.append("URL fora da wiki")
+    return issues
+
+
+def probe_url(url):
+    """Testa uma URL: HEAD e, se preciso, GET parcial. Retorna o resultado.
+
+    {'ok', 'status', 'method', 'final_url', 'reason'}; falhas de rede viram
+    {'error': ...} (repetidas pelo run_concurrent e não gravadas no cache).
+    """
+    session = http_pool.get_session()
+    timeout = (http_pool.CONNECT_TIMEOUT, http_pool.READ_TIMEOUT)
+    try:
+        response = session.head(url, headers=http_pool.PAGE_HEADERS, timeout=timeout, allow_redirects=True)
+        response.close()
+        method = 'HEAD'
+        reason = None
+        if response.status_code in (403, 405, 501) or response.status_code >= 500:
+            # HEAD recusado: lê só o começo da página
+            headers = dict(http_pool.PAGE_HEADERS, Range=f'bytes=0-{PROBE_BYTES - 1}')
+            response = session.get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=True)
+            try:
+                head = response.raw.read(PROBE_BYTES, decode_content=True) if response.status_code < 400 else b''
+            finally:
+                response.close()
+            method = 'GET'
+            text = head.decode('utf-8', errors='replace').lower()
+            reason = next((marker for marker in ERROR_MARKERS if marker in text), None)
+    except Exception as e:
+        return {'error': str(e)}
+
+    status = response.status_code
+    if status >= 500 or status == 429:
+        return {'error': f'HTTP {status}'}
+    final_url = response.url
+    if 'Special:Search' in final_url:
+        reason = 'redireciona para a busca'
+    ok = status in (200, 206) and reason is None
+    if not ok and reason is None:
+        reason = f'HTTP {status}'
+    return {'ok': ok, 'status': status, 'method': method, 'final_url': final_url, 'reason': reason}
+
+
+class LinkHealth:
+    """Auditoria de links com cache persistente (ver docstring do módulo)"""
+
+    def __init__(self, cache_path=LINK_CACHE_FILE, ttl=LINK_TTL, broken_ttl=LINK_BROKEN_TTL,
+                 concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST, use_api=True):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.broken_ttl = broken_ttl
+        self.concurrency = concurrency
+        self.limiter = HostRateLimiter(rate, burst)
+        self.use_api = use_api
+        self._lock = threading.Lock()
+        self.entries = self._load()
+        self.counts = {'cached': 0, 'api': 0, 'probed': 0, 'errors': 0}
+
+    def _load(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def save(self):
+        if not self.cache_path:
+            return
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"[LINKS] Não foi possível gravar o cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def cached(self, url, now=None):
+        """Resultado em cache ainda válido (ou None)"""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        ttl = self.ttl if entry['ok'] else self.broken_ttl
+        if (now or time.time()) - entry['checked_at'] > ttl:
+            return None
+        return entry
+
+    def _store(self, url, result):
+        result = dict(result, checked_at=time.time())
+        with self._lock:
+            self.entries[url] = result
+        return result
+
+    def check(self, urls, force=False, on_result=None):
+        """{url: resultado} para todas as URLs, testando só o que não está em cache.
+
+        on_result(url, resultado) é chamado para cada link testado de novo.
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        results = {}
+        pending = []
+        now = time.time()
+        for url in urls:
+            entry = None if force else self.cached(url, now)
+            if entry is not None:
+                results[url] = entry
+                self.counts['cached'] += 1
+            else:
+                pending.append(url)
+
+        if pending and self.use_api:
+            wiki_urls = [url for url in pending if urlparse(url).netloc == WIKI_HOST]
+            titles = {url: title_from_url(url) for url in wiki_urls}
+            try:
+                exists = check_titles_exist(list(dict.fromkeys(titles.values())), limiter=self.limiter)
+            except Exception as e:
+                print(f"[LINKS] API da wiki indisponível ({e}), testando cada link")
+                exists = {}
+            confirmed = set()
+            for url, title in titles.items():
+                if exists.get(title):
+                    results[url] = self._store(url, {'ok': True, 'status': 200, 'method': 'API',
+                                                     'final_url': url, 'reason': None})
+                    confirmed.add(url)
+                    self.counts['api'] += 1
+                    if on_result:
+                        on_result(url, results[url])
+            pending = [url for url in pending if url not in confirmed]
+
+        def done(url, result, attempts, index, total):
+            if 'error' in result:
+                self.counts['errors'] += 1
+                result = {'ok': False, 'status': None, 'method': None, 'final_url': url,
+                          'reason': result['error'], 'error': True}
+                results[url] = result
+            else:
+                self.counts['probed'] += 1
+                results[url] = self._store(url, result)
+            if on_result:
+                on_result(url, results[url])
+
+        if pending:
+            run_concurrent(pending, probe_url, concurrency=self.concurrency, limiter=self.limiter,
+                           is_error=lambda result: 'error' in result, on_result=done)
+        self.save()
+        return {url: results[url] for url in urls}
+
+    def is_ok(self, url, force=False):
+        return self.check([url], force=force)[url]['ok']
+
+    def first_ok(self, candidates):
+        """Primeira URL válida entre as candidatas (testadas juntas) ou None"""
+        results = self.check(candidates)
+        return next((url for url in dict.fromkeys(candidates) if results[url]['ok']), None)
+
+
+def wiki_url_candidates(quest_name):
+    """Variações de URL da wiki para o nome de uma quest"""
+    normalized = quest_name.replace(" - ", "_").replace("-", "_").replace(" ", "_").replace("__", "_").rstrip("_")
+    names = [
+        quest_name.replace(" - ", "_-_").replace(" ", "_"),
+        quest_name.replace(" ", "_"),
+        quest_name.replace(" - ", "_").replace(" ", "_"),
+        normalized,
+        quest_name.replace("'", "").replace(" ", "_"),
+        quest_name,
+    ]
+    return [WIKI_BASE_URL + name for name in dict.fromkeys(names)]
+
+
+def main():
+    from quest_graph import load_graph
+
+    parser = argparse.ArgumentParser(description="Auditoria dos links da wiki das quests")
+    parser.add_argument('--npc', action='append', help="Só as quests deste NPC (pode repetir)")
+    parser.add_argument('--force', action='store_true', help="Ignora o cache e testa tudo de novo")
+    parser.add_argument('--no-api', action='store_true', help="Não usa a API da wiki para confirmar em lote")
+    parser.add_argument('--concurrency', type=int, default=8, help="Links testados em paralelo (padrão: 8)")
+    parser.add_argument('--rate', type=float, default=5.0, help="Requisições por segundo por host (padrão: 5)")
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST * 2, help="Rajada máxima por host")
+    parser.add_argument('--json', help="Grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    graph = load_graph()
+    quests = [quest for quest in range(len(graph)) if not args.npc or graph.npc_id(quest) in args.npc]
+    checker = LinkHealth(concurrency=args.concurrency, rate=args.rate, burst=args.burst, use_api=not args.no_api)
+
+    print(f"Auditando {len(quests)} links...")
+    start = time.monotonic()
+    progress = Progress(len(quests))
+    tested = [0]
+
+    def report(url, result):
+        tested[0] += 1
+        if tested[0] % 50 == 0:
+            print(f"  {progress.line(tested[0])}")
+
+    results = checker.check([graph.wiki_urls[quest] for quest in quests], force=args.force, on_result=report)
+    elapsed = time.monotonic() - start
+
+    broken = []
+    unreachable = []
+    formatting = []
+    for quest in quests:
+        url = graph.wiki_urls[quest]
+        result = results.get(url) if url else {'ok': False, 'reason': 'sem wikiUrl'}
+        entry = {'npc': graph.npc_name(quest), 'quest_id': graph.ids[quest],
+                 'quest_name': graph.names[quest], 'url': url}
+        if result.get('error'):
+            unreachable.append(dict(entry, reason=result['reason']))
+        elif not result['ok']:
+            broken.append(dict(entry, reason=result['reason']))
+        issues = url_issues(graph.names[quest], url) if url else []
+        if issues:
+            formatting.append(dict(entry, issues=issues))
+
+    counts = checker.counts
+    print("\n" + "=" * 60)
+    print("Resumo:")
+    print(f"  Links auditados: {len(quests)} em {elapsed:.1f}s")
+    print(f"  Do cache: {counts['cached']}  API da wiki: {counts['api']}  "
+          f"Testados: {counts['probed']}  Falhas de rede: {counts['errors']}")
+    print(f"  Links quebrados: {len(broken)}")
+    for entry in broken:
+        print(f"  - {entry['npc']}: {entry['quest_name']}")
+        print(f"    URL: {entry['url']}")
+        print(f"    Motivo: {entry['reason']}")
+    if unreachable:
+        print(f"\n  Não testados por falha de rede (ficam fora do cache): {len(unreachable)}")
+        print(f"    ex.: {unreachable[0]['reason']}")
+    if formatting:
+        print(f"\n  Links com formato suspeito: {len(formatting)}")
+        for entry in formatting:
+            print(f"  - {entry['npc']}: {entry['quest_name']} ({', '.join(entry['issues'])})")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'checked': len(quests), 'elapsed_seconds': round(elapsed, 2), 'counts': counts,
+                       'broken': broken, 'unreachable': unreachable,
+                       'formatting': formatting}, f, indent=2, ensure_ascii=False)
+        print(f"\nRelatório salvo em: {args.json}")
+    return 1 if broken else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
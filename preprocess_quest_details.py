@@ -3,37 +3,18 @@
 Script para pré-processar os detalhes de todas as quests e salvar em JSON local.
 Isso permite que a aplicação funcione sem depender de serviços externos.
 """
+import argparse
 import json
 import sys
-from scraper import scrape_quest_info
+import http_pool
+from quest_cache import normalize_wiki_url
+from quest_dist import export_details
+from quest_shards import write_shards
+from quest_scrape import scrape_quest_info_conditional
+from scrape_engine import (run_concurrent, HostRateLimiter, Progress, DEFAULT_CONCURRENCY,
+                           DEFAULT_RATE, DEFAULT_BURST, DEFAULT_RETRIES)
+from wiki_api import fetch_pages, fetch_quest_infos, title_from_url, BATCH_SIZE
 import time
-from urllib.parse import urlparse
-
-def normalize_wiki_url(url):
-    """Normaliza a URL da wiki para usar como chave"""
-    if not url:
-        return None
-    
-    # Se não começar com http, adicionar
-    if not url.startswith('http'):
-        url = 'https://' + url
-    
-    # Parsear e normalizar
-    parsed = urlparse(url)
-    path = parsed.path
-    
-    # Garantir que começa com /wiki/
-    if not path.startswith('/wiki/'):
-        if path.startswith('wiki/'):
-            path = '/' + path
-        else:
-            path = '/wiki/' + path
-    
-    # Reconstruir URL normalizada
-    normalized = f"{parsed.scheme}://{parsed.netloc}{path}"
-    
-    # Remover query params e fragmentos para normalizar
-    return normalized.split('?')[0].split('#')[0]
 
 def load_quests_database():
     """Carrega o banco de dados de quests"""
@@ -63,9 +44,74 @@ def save_details(details):
     with open('quests-details.json', 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
     
-    print(f"\n✓ Salvo {len(details)} detalhes de quests em quests-details.json")
+    # Forma compacta para o site (quests-details.min.json)
+    export_details(output, 'quests-details.json')
+    # Um arquivo por NPC para o carregamento sob demanda (quests-details/)
+    index = write_shards(output)
+    
+    print(f"\n✓ Salvo {len(details)} detalhes de quests em quests-details.json "
+          f"(+ quests-details.min.json e {len(index['shards'])} shards em quests-details/)")
+
+def fetch_via_api(urls, details, limiter, on_result, refresh):
+    """Busca as quests em lotes pela API da MediaWiki.
+
+    No modo refresh, primeiro compara só os IDs de revisão (sem conteúdo) e
+    descarta as páginas que não mudaram. Retorna as URLs que precisam do
+    scraping de HTML.
+    """
+    to_fetch = list(urls)
+    
+    if refresh:
+        known_revisions = {}
+        for url in to_fetch:
+            existing = details.get(url) or {}
+            revision_id = (existing.get('validators') or {}).get('revision_id')
+            if revision_id and existing.get('name') and not existing.get('error'):
+                known_revisions[url] = revision_id
+        
+        if known_revisions:
+            print(f"🔎 Comparando revisões de {len(known_revisions)} páginas pela API...")
+            try:
+                titles = {url: title_from_url(url) for url in known_revisions}
+                pages = fetch_pages(list(titles.values()), content=False, limiter=limiter)
+                for url, title in titles.items():
+                    page = pages.get(title)
+                    if page and not page['missing'] and page['revision_id'] == known_revisions[url]:
+                        on_result(url, {'not_modified': True, 'validators': {'revision_id': page['revision_id']}})
+                        to_fetch.remove(url)
+            except Exception as e:
+                print(f"    ⚠️  Falha ao comparar revisões ({e}), baixando todas")
+    
+    if not to_fetch:
+        return []
+    
+    print(f"📦 Buscando {len(to_fetch)} páginas pela API em lotes de {BATCH_SIZE}...")
+    results, fallback = fetch_quest_infos(to_fetch, limiter=limiter)
+    for url, quest_info in results.items():
+        on_result(url, quest_info)
+    if fallback:
+        print(f"↩️  {len(fallback)} páginas sem dados na API, usando scraping de HTML")
+    return fallback
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Pré-processa os detalhes das quests em quests-details.json')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'páginas buscadas em paralelo (padrão {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'requisições por segundo por host (padrão {DEFAULT_RATE})')
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST,
+                        help=f'rajada máxima de requisições por host (padrão {DEFAULT_BURST})')
+    parser.add_argument('--refresh', action='store_true',
+                        help='revalida também as quests já processadas, usando requisições condicionais')
+    parser.add_argument('--api', action='store_true',
+                        help='busca as páginas em lotes pela API da MediaWiki (api.php), com fallback para HTML')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f'tentativas extras por página com erro (padrão {DEFAULT_RETRIES})')
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    
     print("=" * 60)
     print("🔄 Pré-processando detalhes das quests")
     print("=" * 60)
@@ -97,31 +143,66 @@ def main():
     print(f"📊 {len(all_urls)} URLs únicas para processar")
     print()
     
-    # Processar cada URL
+    # Separar URLs já processadas das que precisam de scraping
     details = existing_details_data.copy()
     processed = 0
     skipped = 0
     errors = 0
+    pending = []
     
-    for i, wiki_url in enumerate(sorted(all_urls), 1):
-        # Verificar se já existe e não tem erro
-        if wiki_url in details:
-            existing = details[wiki_url]
-            # Se já tem dados válidos (não é erro), pular
-            if existing.get('name') and not existing.get('error'):
-                skipped += 1
-                print(f"[{i}/{len(all_urls)}] ⏭️  Já processado: {wiki_url}")
-                continue
+    unchanged = 0
+    
+    for wiki_url in sorted(all_urls):
+        existing = details.get(wiki_url)
+        # Se já tem dados válidos (não é erro), pular - a não ser no modo --refresh,
+        # que revalida as páginas com requisições condicionais
+        if existing and existing.get('name') and not existing.get('error') and not args.refresh:
+            skipped += 1
+            continue
+        pending.append(wiki_url)
+    
+    if args.refresh:
+        print(f"🔁 Modo refresh: revalidando {len(pending)} páginas (ETag/Last-Modified/revisão)")
+    else:
+        print(f"⏭️  {skipped} já processadas, {len(pending)} para buscar")
+    print(f"⚙️  Concorrência: {args.concurrency} | Taxa: {args.rate} req/s por host | Tentativas extras: {args.retries}")
+    print()
+    
+    progress = Progress(len(pending))
+    
+    def fetch(wiki_url):
+        existing = details.get(wiki_url) or {}
+        # Só reaproveitar validadores de entradas válidas
+        validators = existing.get('validators') if existing.get('name') and not existing.get('error') else None
+        return scrape_quest_info_conditional(wiki_url, validators)
+    
+    done = 0
+    
+    def on_result(wiki_url, quest_info, attempts=1, *_):
+        nonlocal processed, errors, unchanged, done
+        done += 1
+        i, total = done, len(pending)
+        retry_note = f" (após {attempts} tentativas)" if attempts > 1 else ""
         
-        print(f"[{i}/{len(all_urls)}] 🔍 Processando: {wiki_url}")
+        # Página não mudou desde a última busca: só atualizar os validadores
+        if quest_info.get('not_modified'):
+            unchanged += 1
+            details[wiki_url]['validators'] = {
+                **(details[wiki_url].get('validators') or {}),
+                **(quest_info.get('validators') or {})
+            }
+            details[wiki_url]['updated_at'] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            print(f"[{i}/{total}] = Sem alterações: {details[wiki_url].get('name')}")
         
-        try:
-            quest_info = scrape_quest_info(wiki_url)
-            
-            # Verificar se houve erro
-            if quest_info.get('error'):
-                print(f"    ❌ Erro: {quest_info.get('error')}")
-                errors += 1
+        # Verificar se houve erro
+        elif quest_info.get('error'):
+            errors += 1
+            existing = details.get(wiki_url) or {}
+            if existing.get('name') and not existing.get('error'):
+                # Manter os dados anteriores se a revalidação falhar
+                print(f"[{i}/{total}] ❌ Erro{retry_note} (mantendo dados anteriores): {wiki_url} - {quest_info.get('error')}")
+            else:
+                print(f"[{i}/{total}] ❌ Erro{retry_note}: {wiki_url} - {quest_info.get('error')}")
                 # Salvar erro para não tentar novamente
                 details[wiki_url] = {
                     'error': quest_info.get('error'),
@@ -129,35 +210,39 @@ def main():
                     'objectives': [],
                     'guide_images': []
                 }
-            else:
-                # Salvar detalhes
-                details[wiki_url] = {
-                    'name': quest_info.get('name', ''),
-                    'npc': quest_info.get('npc', ''),
-                    'objectives': quest_info.get('objectives', []),
-                    'guide_images': quest_info.get('guide_images', [])
-                }
-                processed += 1
-                print(f"    ✓ Sucesso: {quest_info.get('name', 'N/A')} ({len(quest_info.get('objectives', []))} objetivos, {len(quest_info.get('guide_images', []))} imagens)")
-            
-            # Salvar progresso a cada 10 quests
-            if i % 10 == 0:
-                save_details(details)
-                print(f"    💾 Progresso salvo...")
-            
-            # Pequeno delay para não sobrecarregar a wiki
-            time.sleep(0.5)
-            
-        except Exception as e:
-            print(f"    ❌ Exceção: {str(e)}")
-            errors += 1
+        else:
+            # Salvar detalhes
             details[wiki_url] = {
-                'error': str(e),
-                'name': None,
-                'objectives': [],
-                'guide_images': []
+                'name': quest_info.get('name', ''),
+                'npc': quest_info.get('npc', ''),
+                'objectives': quest_info.get('objectives', []),
+                'guide_images': quest_info.get('guide_images', []),
+                'updated_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                'validators': quest_info.get('validators')
             }
-            time.sleep(1)  # Delay maior em caso de erro
+            processed += 1
+            print(f"[{i}/{total}] ✓ {quest_info.get('name', 'N/A')}{retry_note} ({len(quest_info.get('objectives', []))} objetivos, {len(quest_info.get('guide_images', []))} imagens)")
+        
+        # Salvar progresso a cada 10 quests
+        if i % 10 == 0:
+            save_details(details)
+            print(f"    💾 Progresso salvo: {progress.line(i)}")
+    
+    limiter = HostRateLimiter(rate=args.rate, burst=args.burst)
+    html_pending = pending
+    if args.api and pending:
+        html_pending = fetch_via_api(pending, details, limiter, on_result, args.refresh)
+    
+    run_concurrent(
+        html_pending,
+        fetch,
+        concurrency=args.concurrency,
+        limiter=limiter,
+        retries=args.retries,
+        on_result=on_result
+    )
+    if pending:
+        print(f"\n⏱️  {progress.line(len(pending))}")
     
     # Salvar resultado final
     save_details(details)
@@ -168,8 +253,11 @@ def main():
     print("=" * 60)
     print(f"📊 Processadas: {processed}")
     print(f"⏭️  Já existentes: {skipped}")
+    print(f"= Sem alterações (revalidadas): {unchanged}")
     print(f"❌ Erros: {errors}")
     print(f"📁 Total salvo: {len(details)}")
+    stats = http_pool.pool_stats()
+    print(f"🔌 Conexões HTTP: {stats['hits']} reaproveitadas, {stats['misses']} novas")
     print()
     print("💡 Agora você pode usar quests-details.json no app.js!")
 
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Disponibilidade de quests calculada no servidor para a rota /api/availability.
+
+O cliente envia o progresso (o tarkovQuestProgress do localStorage ou a forma
+compacta de encodeProgressCompact) e recebe, por NPC, as quests completas,
+disponíveis, bloqueadas por pré-requisitos e bloqueadas por exclusão mútua,
+com as mesmas regras do updateQuestList do app.js. O grafo é compilado uma vez
+por processo (quest_graph.py) e recarregado se o quests-database.json mudar.
+
+As respostas ficam em cache já serializadas, indexadas pelo hash da forma
+compacta do progresso: o mesmo progresso, enviado em qualquer formato, reutiliza
+o mesmo resultado. A rota /api/kappa-plan usa o mesmo grafo com o
+kappa_planner.py (planos memoizados por progresso).
+
+Configuração via variáveis de ambiente:
+    TARKOV_AVAILABILITY_CACHE_TTL        segundos até uma resposta expirar (padrão 3600)
+    TARKOV_AVAILABILITY_CACHE_MAX_BYTES  tamanho máximo do cache (padrão 4 MB)
+"""
+import hashlib
+import json
+import os
+import threading
+
+from kappa_planner import KappaPlanner
+from quest_cache import TTLCache
+from quest_graph import DATABASE_FILE, load_graph
+from quest_progress import HAS_NUMPY, ProgressModel
+from quest_simulation import iter_bits
+
+AVAILABILITY_CACHE_TTL = float(os.environ.get('TARKOV_AVAILABILITY_CACHE_TTL', 60 * 60))
+AVAILABILITY_CACHE_MAX_BYTES = int(os.environ.get('TARKOV_AVAILABILITY_CACHE_MAX_BYTES', 4 * 1024 * 1024))
+
+
+class AvailabilityService:
+    """Grafo em memória + cache das respostas por hash do progresso"""
+
+    def __init__(self, path=DATABASE_FILE, ttl=AVAILABILITY_CACHE_TTL, max_bytes=AVAILABILITY_CACHE_MAX_BYTES):
+        self.path = path
+        self.cache = TTLCache(ttl=ttl, max_bytes=max_bytes)
+        # (ProgressModel, KappaPlanner) do mesmo carregamento, trocados juntos
+        self._loaded = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.reloads = 0
+
+    def loaded(self):
+        """(ProgressModel, KappaPlanner) atuais (recompila se o arquivo do banco mudou)"""
+        mtime = os.path.getmtime(self.path)
+        loaded = self._loaded
+        if loaded is None or mtime != self._mtime:
+            with self._lock:
+                if self._loaded is None or mtime != self._mtime:
+                    model = ProgressModel(load_graph(self.path))
+                    self._loaded = (model, KappaPlanner(model.graph))
+                    self._mtime = mtime
+                    self.reloads += 1
+                    self.cache.clear()
+                    print(f"[AVAILABILITY] Grafo carregado: {model.size} quests "
+                          f"(fingerprint {model.fingerprint})")
+                loaded = self._loaded
+        return loaded
+
+    def model(self):
+        """ProgressModel atual"""
+        return self.loaded()[0]
+
+    def decode_payload(self, payload):
+        """JSON enviado como text/plain (evita o preflight de CORS) -> dict"""
+        if isinstance(payload, str) and payload.lstrip().startswith('{'):
+            try:
+                return json.loads(payload)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON inválido: {e}")
+        return payload
+
+    def parse(self, model, payload):
+        """(completas, em andamento, IDs desconhecidos) a partir do corpo da requisição.
+
+        Aceita {"compact": "p1..."}, {"progress": {...}}, o próprio
+        tarkovQuestProgress ou a string compacta. ValueError se inválido.
+        """
+        payload = self.decode_payload(payload)
+        if isinstance(payload, str):
+            return model.decode(payload) + ([],)
+        if not isinstance(payload, dict):
+            raise ValueError("Progresso deve ser um objeto JSON ou a forma compacta")
+        if 'compact' in payload:
+            return model.decode(str(payload['compact'])) + ([],)
+        progress = payload.get('progress', payload)
+        if not isinstance(progress, dict):
+            raise ValueError("progress deve ser um objeto {npcId: {completed, current}}")
+        return model.from_tarkov(progress)
+
+    def compute(self, model, completed, current):
+        """Resposta por NPC (listas de IDs na ordem do banco)"""
+        graph = model.graph
+        status = model.availability(completed)
+        unlocked = model.npc_unlocked(completed)
+        npcs = {}
+        for npc_id in graph.npcs:
+            quests = graph.npc_quests(npc_id)
+            if not quests:
+                continue
+            # Recorta os bits do NPC (as quests de cada NPC são contíguas no grafo)
+            mask = ((1 << len(quests)) - 1) << quests.start
+
+            def ids(bits):
+                return [graph.ids[quest] for quest in iter_bits(bits & mask)]
+
+            current_ids = ids(current)
+            entry = {
+                'name': graph.npc_names[graph.npc_index[npc_id]],
+                'unlocked': unlocked[npc_id],
+                'current': current_ids[-1] if current_ids else None,
+                'completed': ids(completed),
+                'available': ids(status['available']),
+                'locked': ids(status['locked']),
+                'blocked': ids(status['blocked'])
+            }
+            entry['counts'] = {key: len(entry[key]) for key in ('completed', 'available', 'locked', 'blocked')}
+            entry['counts']['total'] = len(quests)
+            npcs[npc_id] = entry
+        return {
+            'fingerprint': model.fingerprint,
+            'progress': model.encode(completed, current),
+            'invalid_completed': [graph.ids[quest] for quest in iter_bits(model.invalid_completed(completed))],
+            'npcs': npcs
+        }
+
+    def availability(self, payload):
+        """Resposta serializada (bytes) para o progresso enviado e os IDs ignorados"""
+        model = self.model()
+        completed, current, unknown = self.parse(model, payload)
+        compact = model.encode(completed, current)
+        key = hashlib.sha1(compact.encode('ascii')).hexdigest()
+        body = self.cache.get(key)
+        if body is None:
+            body = json.dumps(self.compute(model, completed, current), ensure_ascii=False).encode('utf-8')
+            self.cache.set(key, body)
+            self.computed += 1
+        return body, unknown
+
+    def kappa_plan(self, payload, top=3):
+        """Plano até o Kappa (dict com IDs) para o progresso enviado e os IDs ignorados.
+
+        O corpo aceita os mesmos formatos de availability e, opcionalmente,
+        "choices": {grupo: quest_id} para os grupos mutuamente exclusivos.
+        """
+        model, planner = self.loaded()
+        payload = self.decode_payload(payload)
+        completed, _, unknown = self.parse(model, payload)
+        choices = payload.get('choices') if isinstance(payload, dict) else None
+        if choices is not None and (not isinstance(choices, dict)
+                                    or not all(isinstance(v, str) for v in choices.values())):
+            raise ValueError("choices deve ser um objeto {grupo: quest_id}")
+        return planner.plan_ids(completed, choices, top), unknown
+
+    def stats(self):
+        model, planner = self._loaded or (None, None)
+        return {
+            'quests': model.size if model else 0,
+            'fingerprint': model.fingerprint if model else None,
+            'numpy': bool(model.use_numpy) if model else HAS_NUMPY,
+            'computed': self.computed,
+            'reloads': self.reloads,
+            'cache': self.cache.stats(),
+            'kappa_planner': planner.stats() if planner else None
+        }
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Cache em memória (TTL + LRU) para as respostas de /api/quest.
+
+As entradas são as respostas JSON já serializadas, então um acerto no cache
+devolve os bytes prontos sem refazer o download nem o parse da página da wiki.
+O limite de tamanho é contado em bytes e as entradas expiram após o TTL.
+
+Configuração via variáveis de ambiente:
+    TARKOV_QUEST_CACHE_TTL        segundos até uma entrada expirar (padrão 21600)
+    TARKOV_QUEST_CACHE_MAX_BYTES  tamanho máximo do cache (padrão 16 MB)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+QUEST_CACHE_TTL = float(os.environ.get('TARKOV_QUEST_CACHE_TTL', 6 * 60 * 60))
+QUEST_CACHE_MAX_BYTES = int(os.environ.get('TARKOV_QUEST_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+
+
+def normalize_wiki_url(url):
+    """Normaliza a URL da wiki para usar como chave"""
+    if not url:
+        return None
+
+    # Se não começar com http, adicionar
+    if not url.startswith('http'):
+        url = 'https://' + url
+
+    # Parsear e normalizar
+    parsed = urlparse(url)
+    path = parsed.path
+
+    # Garantir que começa com /wiki/
+    if not path.startswith('/wiki/'):
+        if path.startswith('wiki/'):
+            path = '/' + path
+        else:
+            path = '/wiki/' + path
+
+    # Reconstruir URL normalizada
+    normalized = f"{parsed.scheme}://{parsed.netloc}{path}"
+
+    # Remover query params e fragmentos para normalizar
+    return normalized.split('?')[0].split('#')[0]
+
+
+class TTLCache:
+    """Cache LRU limitado em bytes, com expiração por TTL e seguro entre threads"""
+
+    def __init__(self, ttl=QUEST_CACHE_TTL, max_bytes=QUEST_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # {key: (expires_at, value)}
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Retorna o valor em cache ou None se ausente/expirado"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Armazena bytes no cache, removendo as entradas menos usadas se necessário"""
+        size = len(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, key):
+        """Remove uma entrada do cache"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        """Esvazia o cache (mantém os contadores)"""
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def _remove(self, key):
+        _, value = self._entries.pop(key)
+        self.size_bytes -= len(value)
+
+    def stats(self):
+        """Estatísticas para dimensionar o cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self.size_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+# Cache compartilhado pelas threads do worker
+quest_cache = TTLCache()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Índice em memória do quests-details.json usado pelo servidor Flask.
+
+O arquivo gerado por preprocess_quest_details.py é carregado uma única vez por
+processo e indexado pela URL normalizada da wiki. A rota /api/quest responde a
+partir deste índice e só faz scraping quando a quest não existe ou está
+desatualizada; o resultado novo é gravado de volta no índice e no arquivo.
+
+A gravação no arquivo não acontece na requisição: as entradas novas entram
+numa fila e uma thread as grava em lote. Ela segura um lock de arquivo (fcntl,
+exceto no Windows) e relê o quests-details.json antes de mesclar, para não
+perder o que outros workers do gunicorn gravaram.
+
+As chaves são a URL normalizada e sem percent-encoding: o arquivo tem URLs nas
+duas formas (%2C, %E2%80%99...) e a rota /api/quest procura pela decodificada.
+
+Configuração via variáveis de ambiente:
+    TARKOV_DETAILS_MAX_AGE_DAYS  idade máxima de uma entrada em dias
+                                 (padrão 0 = sem limite; só entradas com erro
+                                 ou sem nome são consideradas desatualizadas)
+    TARKOV_DETAILS_WRITEBACK     '0' desativa a gravação no arquivo
+"""
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from urllib.parse import unquote
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
+
+from quest_cache import normalize_wiki_url
+from quest_dist import export_details
+from quest_shards import SHARDS_DIR, npc_by_url, update_shards
+
+DETAILS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'quests-details.json')
+DETAILS_MAX_AGE = float(os.environ.get('TARKOV_DETAILS_MAX_AGE_DAYS', 0)) * 24 * 60 * 60
+DETAILS_WRITEBACK = os.environ.get('TARKOV_DETAILS_WRITEBACK', '1') != '0'
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Campos devolvidos pela API (o resto é metadado interno do arquivo)
+RESPONSE_FIELDS = ('name', 'npc', 'objectives', 'guide_images')
+
+
+def parse_timestamp(value):
+    """Converte o timestamp do arquivo em epoch (None se inválido)"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def index_key(url):
+    """Chave do índice: URL normalizada, sem percent-encoding"""
+    if not url:
+        return None
+    return normalize_wiki_url(unquote(url))
+
+
+def to_response(entry):
+    """Monta a resposta da API a partir de uma entrada do arquivo"""
+    return {field: entry.get(field, [] if field in ('objectives', 'guide_images') else '')
+            for field in RESPONSE_FIELDS}
+
+
+class QuestDetailsIndex:
+    """Índice {url normalizada: detalhes} carregado do quests-details.json"""
+
+    def __init__(self, path=DETAILS_FILE, max_age=DETAILS_MAX_AGE, writeback=DETAILS_WRITEBACK,
+                 shards_dir=SHARDS_DIR):
+        self.path = path
+        self.shards_dir = shards_dir
+        self.max_age = max_age
+        self.writeback = writeback
+        self.entries = {}
+        self.file_updated_at = None
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+        self.writes = 0
+        self.write_errors = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending = {}
+        self._wake = threading.Event()
+        self._writer = None
+        self._npc_of_url = None
+        self.load()
+
+    def _read_file(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            print(f"[DETAILS INDEX] quests-details.json inválido: {e}")
+            return {}
+
+    def load(self):
+        """(Re)carrega o arquivo para a memória"""
+        data = self._read_file()
+        entries = {}
+        for url, entry in data.get('details', {}).items():
+            key = index_key(url)
+            if key:
+                entries[key] = entry
+        with self._lock:
+            self.entries = entries
+            self.file_updated_at = parse_timestamp(data.get('last_updated'))
+        print(f"[DETAILS INDEX] {len(entries)} quests carregadas de {os.path.basename(self.path)}")
+
+    def _entry_age(self, entry):
+        updated_at = parse_timestamp(entry.get('updated_at')) or self.file_updated_at
+        if updated_at is None:
+            return None
+        return time.time() - updated_at
+
+    def is_fresh(self, entry):
+        """Entrada válida (sem erro, com nome) e dentro da idade máxima"""
+        if not entry or entry.get('error') or not entry.get('name'):
+            return False
+        if not self.max_age:
+            return True
+        age = self._entry_age(entry)
+        return age is None or age <= self.max_age
+
+    def lookup(self, key):
+        """Retorna (entrada, fresca?) para a URL normalizada, ou (None, False)"""
+        entry = self.entries.get(index_key(key))
+        if entry is None:
+            self.misses += 1
+            return None, False
+        if self.is_fresh(entry):
+            self.hits += 1
+            return entry, True
+        self.stale += 1
+        return entry, False
+
+    def update(self, key, quest_info):
+        """Grava o resultado de um scraping novo no índice (e agenda a gravação no arquivo)"""
+        key = index_key(key)
+        entry = dict(self.entries.get(key) or {})
+        entry.pop('error', None)
+        # Validadores antigos não correspondem mais ao conteúdo novo
+        entry.pop('validators', None)
+        if quest_info.get('validators'):
+            entry['validators'] = quest_info['validators']
+        entry.update(to_response(quest_info))
+        entry['updated_at'] = time.strftime(TIMESTAMP_FORMAT)
+        with self._lock:
+            self.entries[key] = entry
+            if self.writeback:
+                self._pending[key] = entry
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run_writer, name='details-writer', daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+        if self.writeback:
+            self._wake.set()
+        return entry
+
+    def _run_writer(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Grava no arquivo as entradas pendentes"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending:
+            self._persist(pending)
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Lock exclusivo entre processos enquanto o arquivo é relido e regravado"""
+        lock_file = None
+        if fcntl is not None:
+            try:
+                lock_file = open(f"{self.path}.lock", 'a+b')
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            except OSError:
+                lock_file = None
+        try:
+            yield
+        finally:
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    def _persist(self, pending):
+        """Regrava o arquivo de forma atômica, mesclando com o conteúdo atual.
+
+        Outros workers podem ter gravado entradas desde que este processo
+        carregou o arquivo, por isso ele é relido (com o lock) antes de ser
+        substituído. Cada entrada substitui a que tem a mesma chave, esteja a
+        URL do arquivo codificada ou não.
+        """
+        with self._write_lock, self._file_lock():
+            try:
+                data = self._read_file()
+                details = data.get('details', {})
+                file_keys = {index_key(url): url for url in details}
+                for key, entry in pending.items():
+                    details[file_keys.get(key, key)] = entry
+                output = {
+                    "version": data.get('version', "1.0.0"),
+                    "last_updated": data.get('last_updated') or time.strftime(TIMESTAMP_FORMAT),
+                    "details": details
+                }
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(output, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                self.writes += 1
+            except (OSError, ValueError, TypeError) as e:
+                self.write_errors += 1
+                print(f"[DETAILS INDEX] Erro ao gravar quests-details.json: {e}")
+                return
+            try:
+                export_details(output, self.path)
+                # Só os shards dos NPCs destas quests mudam de conteúdo (e de ETag);
+                # o mapa URL -> NPC é montado uma vez por processo
+                if self._npc_of_url is None:
+                    self._npc_of_url = npc_by_url()
+                update_shards(output, [file_keys.get(key, key) for key in pending],
+                              self._npc_of_url, self.shards_dir)
+            except (OSError, ValueError, TypeError) as e:
+                self.write_errors += 1
+                print(f"[DETAILS INDEX] Erro ao exportar a forma compacta/shards: {e}")
+
+    def stats(self):
+        """Estatísticas do índice"""
+        lookups = self.hits + self.stale + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'stale': self.stale,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'writes': self.writes,
+            'write_errors': self.write_errors,
+            'pending_writes': len(self._pending),
+            'max_age_seconds': self.max_age
+        }
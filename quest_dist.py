@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Formato compacto de distribuição do quests-database.json e do quests-details.json.
+
+Os arquivos originais são gravados com indent=2 e repetem em cada quest as
+chaves longas (prerequisitesExternal, guide_images...) e os prefixos completos
+das URLs da wiki e das imagens. A exportação grava ao lado de cada um uma
+versão compacta (quests-database.min.json / quests-details.min.json):
+
+- JSON minificado, com as quests em listas posicionais em vez de objetos
+- pré-requisitos como índices inteiros das quests (posição na ordem do banco);
+  IDs que não existem no banco ficam como string
+- URLs divididas em [prefixo, resto, sufixo], com os prefixos/sufixos numa
+  tabela única (https://escapefromtarkov.fandom.com/wiki/, .../revision/latest)
+- objetivos, nomes e NPCs dos detalhes internados numa tabela de strings
+- campos que não fazem parte do formato fixo (validators, updated_at...) são
+  preservados num dict extra por entrada
+- campos do formato fixo que faltam numa entrada (quest sem tier, detalhe sem
+  error...) são listados nela e continuam ausentes na reidratação
+
+rehydrate_database()/rehydrate_details() (e rehydrateQuestDatabase()/
+rehydrateQuestDetails() no app.js) devolvem exatamente o formato atual, então
+quem lê os arquivos não muda nada. Com o pacote msgpack instalado
+(pip install msgpack, opcional) a exportação também pode gravar .msgpack, lido
+só pelas ferramentas Python.
+
+Uso:
+    python quest_dist.py             # exporta os dois arquivos
+    python quest_dist.py --msgpack   # + variantes .msgpack
+    python quest_dist.py --check     # confere que a reidratação é idêntica
+"""
+import argparse
+import io
+import json
+import os
+import sys
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    msgpack = None
+    HAS_MSGPACK = False
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32' and __name__ == '__main__':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_FILE = os.path.join(BASE_DIR, 'quests-database.json')
+DETAILS_FILE = os.path.join(BASE_DIR, 'quests-details.json')
+
+DATABASE_FORMAT = 'tkdb1'
+DETAILS_FORMAT = 'tkdt1'
+
+# Prefixos/sufixos conhecidos (índice 0 = nenhum)
+URL_PREFIXES = (
+    '',
+    'https://escapefromtarkov.fandom.com/wiki/',
+    'https://static.wikia.nocookie.net/escapefromtarkov_gamepedia/images/',
+)
+URL_SUFFIXES = ('', '/revision/latest')
+
+QUEST_FIELDS = ('id', 'name', 'tier', 'wikiUrl', 'kappaRequired', 'prerequisites', 'prerequisitesExternal')
+DETAIL_FIELDS = ('name', 'npc', 'objectives', 'guide_images', 'error')
+
+
+def compact_path(path, ext='.min.json'):
+    """quests-database.json -> quests-database.min.json"""
+    return os.path.splitext(path)[0] + ext
+
+
+def encode_url(url):
+    """URL -> [prefixo, resto, sufixo] (ou a própria string se não couber)"""
+    if not isinstance(url, str):
+        return url
+    prefix = max((i for i, p in enumerate(URL_PREFIXES) if url.startswith(p)), key=lambda i: len(URL_PREFIXES[i]))
+    rest = url[len(URL_PREFIXES[prefix]):]
+    suffix = max((i for i, s in enumerate(URL_SUFFIXES) if rest.endswith(s)), key=lambda i: len(URL_SUFFIXES[i]))
+    if suffix:
+        rest = rest[:-len(URL_SUFFIXES[suffix])]
+    if not prefix and not suffix:
+        return url
+    return [prefix, rest, suffix] if suffix else [prefix, rest]
+
+
+def decode_url(value, prefixes=URL_PREFIXES, suffixes=URL_SUFFIXES):
+    if not isinstance(value, list):
+        return value
+    return prefixes[value[0]] + value[1] + (suffixes[value[2]] if len(value) > 2 else '')
+
+
+class StringTable:
+    """Internação de strings: cada string distinta vira um índice"""
+
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return value
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+
+def _extra(entry, fields):
+    extra = {key: value for key, value in entry.items() if key not in fields}
+    return extra or None
+
+
+def compact_database(data):
+    """dict do quests-database.json -> forma compacta"""
+    index = {}
+    position = 0
+    for npc_data in data.get('npcs', {}).values():
+        for quest in npc_data.get('quests', []):
+            # Como no quest_graph, um ID repetido aponta para a última ocorrência
+            index[quest.get('id')] = position
+            position += 1
+
+    def refs(prereq_ids):
+        return [index.get(prereq_id, prereq_id) for prereq_id in prereq_ids]
+
+    npcs = []
+    for npc_id, npc_data in data.get('npcs', {}).items():
+        rows = []
+        for quest in npc_data.get('quests', []):
+            row = [
+                quest.get('id'),
+                quest.get('name'),
+                quest.get('tier'),
+                encode_url(quest.get('wikiUrl')),
+                1 if quest.get('kappaRequired') else 0,
+                refs(quest.get('prerequisites', [])),
+                refs(quest.get('prerequisitesExternal', []))
+            ]
+            extra = _extra(quest, QUEST_FIELDS)
+            # Campos ausentes no original continuam ausentes na reidratação
+            missing = [field for field in QUEST_FIELDS if field not in quest]
+            if extra or missing:
+                row.append(extra or {})
+            if missing:
+                row.append(missing)
+            rows.append(row)
+        npcs.append([npc_id, _extra(npc_data, ('quests',)), rows])
+
+    compact = {key: value for key, value in data.items() if key != 'npcs'}
+    compact.update({
+        'format': DATABASE_FORMAT,
+        'prefixes': list(URL_PREFIXES),
+        'suffixes': list(URL_SUFFIXES),
+        'npcs': npcs
+    })
+    return compact
+
+
+def rehydrate_database(compact):
+    """Forma compacta -> dict no formato do quests-database.json"""
+    prefixes, suffixes = compact['prefixes'], compact['suffixes']
+    ids = [row[0] for _, _, rows in compact['npcs'] for row in rows]
+
+    def ids_of(refs):
+        return [ids[ref] if isinstance(ref, int) else ref for ref in refs]
+
+    npcs = {}
+    for npc_id, npc_fields, rows in compact['npcs']:
+        quests = []
+        for row in rows:
+            quest = {
+                'id': row[0],
+                'name': row[1],
+                'tier': row[2],
+                'prerequisites': ids_of(row[5]),
+                'prerequisitesExternal': ids_of(row[6]),
+                'wikiUrl': decode_url(row[3], prefixes, suffixes),
+                'kappaRequired': bool(row[4])
+            }
+            if len(row) > 8:
+                for field in row[8]:
+                    del quest[field]
+            if len(row) > 7:
+                quest.update(row[7])
+            quests.append(quest)
+        npcs[npc_id] = dict(npc_fields or {}, quests=quests)
+
+    data = {key: value for key, value in compact.items()
+            if key not in ('format', 'prefixes', 'suffixes', 'npcs')}
+    data['npcs'] = npcs
+    return data
+
+
+def compact_details(data):
+    """dict do quests-details.json -> forma compacta"""
+    strings = StringTable()
+    rows = []
+    for url, entry in data.get('details', {}).items():
+        row = [
+            encode_url(url),
+            strings(entry.get('name')),
+            strings(entry.get('npc')),
+            [strings(objective) for objective in entry.get('objectives') or []],
+            [encode_url(image) for image in entry.get('guide_images') or []],
+            entry.get('error')
+        ]
+        extra = _extra(entry, DETAIL_FIELDS)
+        # Campos ausentes no original continuam ausentes na reidratação
+        missing = [field for field in DETAIL_FIELDS if field not in entry]
+        if extra or missing:
+            row.append(extra or {})
+        if missing:
+            row.append(missing)
+        rows.append(row)
+
+    compact = {key: value for key, value in data.items() if key != 'details'}
+    compact.update({
+        'format': DETAILS_FORMAT,
+        'prefixes': list(URL_PREFIXES),
+        'suffixes': list(URL_SUFFIXES),
+        'strings': strings.strings,
+        'details': rows
+    })
+    return compact
+
+
+def rehydrate_details(compact):
+    """Forma compacta -> dict no formato do quests-details.json"""
+    prefixes, suffixes, strings = compact['prefixes'], compact['suffixes'], compact['strings']
+
+    def text(value):
+        return strings[value] if isinstance(value, int) else value
+
+    details = {}
+    for row in compact['details']:
+        entry = {
+            'name': text(row[1]),
+            'npc': text(row[2]),
+            'objectives': [text(objective) for objective in row[3]],
+            'guide_images': [decode_url(image, prefixes, suffixes) for image in row[4]],
+            'error': row[5]
+        }
+        if len(row) > 7:
+            for field in row[7]:
+                del entry[field]
+        if len(row) > 6:
+            entry.update(row[6])
+        details[decode_url(row[0], prefixes, suffixes)] = entry
+
+    data = {key: value for key, value in compact.items()
+            if key not in ('format', 'prefixes', 'suffixes', 'strings', 'details')}
+    data['details'] = details
+    return data
+
+
+def rehydrate(data):
+    """Qualquer um dos formatos (compacto ou original) -> formato original"""
+    if isinstance(data, dict):
+        if data.get('format') == DATABASE_FORMAT:
+            return rehydrate_database(data)
+        if data.get('format') == DETAILS_FORMAT:
+            return rehydrate_details(data)
+    return data
+
+
+def load_json(path):
+    """Lê o original, o .min.json ou o .msgpack e devolve o formato original"""
+    if path.endswith('.msgpack'):
+        if not HAS_MSGPACK:
+            raise RuntimeError("msgpack não instalado (pip install msgpack)")
+        with open(path, 'rb') as f:
+            return rehydrate(msgpack.unpackb(f.read(), raw=False, strict_map_key=False))
+    with open(path, 'r', encoding='utf-8') as f:
+        return rehydrate(json.load(f))
+
+
+def write_compact(compact, path, use_msgpack=False):
+    """Grava o .min.json (e o .msgpack, se pedido); retorna os caminhos gravados"""
+    targets = [(compact_path(path), json.dumps(compact, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))]
+    if use_msgpack:
+        if not HAS_MSGPACK:
+            print("[DIST] msgpack não instalado: só o .min.json (pip install msgpack)")
+        else:
+            targets.append((compact_path(path, '.msgpack'), msgpack.packb(compact, use_bin_type=True)))
+    written = []
+    for target, payload in targets:
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, target)
+        written.append(target)
+    return written
+
+
+def export_database(data, path=DATABASE_FILE, use_msgpack=False):
+    """Exporta a forma compacta do banco (chamado pelo save_to_database)"""
+    return write_compact(compact_database(data), path, use_msgpack)
+
+
+def export_details(data, path=DETAILS_FILE, use_msgpack=False):
+    """Exporta a forma compacta dos detalhes (chamado pelo save_details)"""
+    return write_compact(compact_details(data), path, use_msgpack)
+
+
+def main():
+    import gzip
+
+    parser = argparse.ArgumentParser(description="Exporta a forma compacta dos JSONs de quests")
+    parser.add_argument('--msgpack', action='store_true', help="Grava também .msgpack (precisa do pacote msgpack)")
+    parser.add_argument('--check', action='store_true', help="Confere que a reidratação devolve o original")
+    args = parser.parse_args()
+
+    failed = False
+    for path, export in ((DATABASE_FILE, export_database), (DETAILS_FILE, export_details)):
+        if not os.path.exists(path):
+            print(f"[AVISO] {os.path.basename(path)} não encontrado")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        written = export(data, path, args.msgpack)
+        original_size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            original_gzip = len(gzip.compress(f.read(), mtime=0))
+        print(f"{os.path.basename(path)}: {original_size / 1024:.1f} KB (gzip {original_gzip / 1024:.1f} KB)")
+        for target in written:
+            with open(target, 'rb') as f:
+                payload = f.read()
+            print(f"  -> {os.path.basename(target)}: {len(payload) / 1024:.1f} KB "
+                  f"(gzip {len(gzip.compress(payload, mtime=0)) / 1024:.1f} KB)")
+            if args.check:
+                ok = load_json(target) == data
+                failed |= not ok
+                print(f"     reidratação {'idêntica' if ok else 'DIFERENTE do original'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Grafo de pré-requisitos compilado a partir do quests-database.json.
+
+Os scripts de validação e simulação percorriam o aninhamento NPC -> quests
+e montavam cada um o seu quest_by_id. Aqui o banco é compilado uma única vez
+numa estrutura compacta indexada por inteiros:
+
+- tabelas de internação: ids, names, npcs (cada quest guarda o índice do NPC)
+- pré-requisitos em CSR: os pré-requisitos da quest i são
+  prereq_targets[prereq_offsets[i]:prereq_offsets[i + 1]], na ordem original
+  (prerequisites seguido de prerequisitesExternal); valores negativos (~k)
+  apontam para missing_ids[k], IDs que não existem no banco
+- dependentes (arestas reversas) em CSR, só com as quests existentes
+
+O resultado é gravado em cache binário (pickle) junto com o sha256 do JSON;
+enquanto o JSON não mudar, load_graph() apenas lê o cache.
+
+Configuração via variável de ambiente:
+    TARKOV_GRAPH_CACHE  arquivo do cache (padrão .quest_graph.cache; vazio desliga)
+"""
+import hashlib
+import json
+import os
+import pickle
+from array import array
+
+from quest_dist import rehydrate
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_FILE = os.path.join(BASE_DIR, 'quests-database.json')
+GRAPH_CACHE_FILE = os.environ.get('TARKOV_GRAPH_CACHE', os.path.join(BASE_DIR, '.quest_graph.cache'))
+GRAPH_FORMAT = 1
+
+_FIELDS = (
+    'source_hash', 'version', 'ids', 'names', 'wiki_urls', 'tiers', 'kappa', 'npc_of',
+    'npcs', 'npc_names', 'npc_offsets', 'prereq_offsets', 'prereq_targets',
+    'prereq_external', 'missing_ids', 'dependent_offsets', 'dependent_targets'
+)
+
+
+class QuestGraph:
+    """Grafo de quests indexado por inteiros (ver docstring do módulo)"""
+
+    def __init__(self, **state):
+        for field in _FIELDS:
+            setattr(self, field, state[field])
+        self.index = {quest_id: i for i, quest_id in enumerate(self.ids)}
+        self.npc_index = {npc_id: n for n, npc_id in enumerate(self.npcs)}
+
+    @classmethod
+    def compile(cls, data, source_hash=None):
+        """Compila o dict do quests-database.json"""
+        ids, names, wiki_urls, tiers = [], [], [], []
+        kappa = array('b')
+        npc_of = array('H')
+        npcs, npc_names = [], []
+        npc_offsets = array('i', [0])
+        raw_prereqs = []
+
+        for npc_id, npc_data in data.get('npcs', {}).items():
+            npc_number = len(npcs)
+            npcs.append(npc_id)
+            npc_names.append(npc_data.get('name', npc_id))
+            for quest in npc_data.get('quests', []):
+                ids.append(quest.get('id') or '')
+                names.append(quest.get('name', 'Unknown'))
+                wiki_urls.append(quest.get('wikiUrl') or '')
+                tiers.append(quest.get('tier'))
+                kappa.append(1 if quest.get('kappaRequired', False) else 0)
+                npc_of.append(npc_number)
+                raw_prereqs.append((quest.get('prerequisites', []), quest.get('prerequisitesExternal', [])))
+            npc_offsets.append(len(ids))
+
+        # Como nos índices antigos, um ID repetido aponta para a última ocorrência
+        index = {quest_id: i for i, quest_id in enumerate(ids) if quest_id}
+
+        missing_ids = []
+        missing_index = {}
+        prereq_offsets = array('i', [0])
+        prereq_targets = array('i')
+        prereq_external = array('b')
+        in_degree = [0] * len(ids)
+        for internal, external in raw_prereqs:
+            for is_external, prereq_ids in ((0, internal), (1, external)):
+                for prereq_id in prereq_ids:
+                    target = index.get(prereq_id)
+                    if target is None:
+                        if prereq_id not in missing_index:
+                            missing_index[prereq_id] = len(missing_ids)
+                            missing_ids.append(prereq_id)
+                        target = ~missing_index[prereq_id]
+                    else:
+                        in_degree[target] += 1
+                    prereq_targets.append(target)
+                    prereq_external.append(is_external)
+            prereq_offsets.append(len(prereq_targets))
+
+        # Arestas reversas (pré-requisito -> dependentes) em O(E)
+        dependent_offsets = array('i', [0])
+        for count in in_degree:
+            dependent_offsets.append(dependent_offsets[-1] + count)
+        dependent_targets = array('i', [0]) * dependent_offsets[-1]
+        fill = array('i', dependent_offsets[:-1])
+        for quest in range(len(ids)):
+            for position in range(prereq_offsets[quest], prereq_offsets[quest + 1]):
+                target = prereq_targets[position]
+                if target >= 0:
+                    dependent_targets[fill[target]] = quest
+                    fill[target] += 1
+
+        return cls(
+            source_hash=source_hash, version=data.get('version'), ids=ids, names=names,
+            wiki_urls=wiki_urls, tiers=tiers, kappa=kappa, npc_of=npc_of, npcs=npcs,
+            npc_names=npc_names, npc_offsets=npc_offsets, prereq_offsets=prereq_offsets,
+            prereq_targets=prereq_targets, prereq_external=prereq_external,
+            missing_ids=missing_ids, dependent_offsets=dependent_offsets,
+            dependent_targets=dependent_targets
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Consultas por índice -------------------------------------------------
+
+    def npc_id(self, quest):
+        return self.npcs[self.npc_of[quest]]
+
+    def npc_name(self, quest):
+        return self.npc_names[self.npc_of[quest]]
+
+    def npc_quests(self, npc_id):
+        """Índices das quests do NPC, na ordem do banco"""
+        n = self.npc_index[npc_id]
+        return range(self.npc_offsets[n], self.npc_offsets[n + 1])
+
+    def prerequisite_entries(self, quest):
+        """(alvo, externo?) na ordem original; alvo < 0 é ~índice em missing_ids"""
+        start, end = self.prereq_offsets[quest], self.prereq_offsets[quest + 1]
+        return zip(self.prereq_targets[start:end], self.prereq_external[start:end])
+
+    def prerequisites(self, quest):
+        """Índices dos pré-requisitos existentes"""
+        start, end = self.prereq_offsets[quest], self.prereq_offsets[quest + 1]
+        return [target for target in self.prereq_targets[start:end] if target >= 0]
+
+    def prerequisite_ids(self, quest, external=None):
+        """IDs dos pré-requisitos (inclusive os inexistentes), como no JSON.
+
+        external=False/True filtra prerequisites/prerequisitesExternal.
+        """
+        return [
+            self.ids[target] if target >= 0 else self.missing_ids[~target]
+            for target, is_external in self.prerequisite_entries(quest)
+            if external is None or bool(is_external) == external
+        ]
+
+    def missing_prerequisites(self, quest):
+        """IDs de pré-requisitos que não existem no banco"""
+        start, end = self.prereq_offsets[quest], self.prereq_offsets[quest + 1]
+        return [self.missing_ids[~target] for target in self.prereq_targets[start:end] if target < 0]
+
+    def has_prerequisites(self, quest):
+        return self.prereq_offsets[quest + 1] > self.prereq_offsets[quest]
+
+    def dependents(self, quest):
+        """Índices das quests que têm esta como pré-requisito"""
+        return self.dependent_targets[self.dependent_offsets[quest]:self.dependent_offsets[quest + 1]]
+
+    def edge_count(self):
+        return len(self.dependent_targets)
+
+    # Ciclos ----------------------------------------------------------------
+
+    def strongly_connected_components(self, nodes=None):
+        """Componentes fortemente conexos (Tarjan iterativo, O(V + E)).
+
+        Sem recursão, então cadeias longas não esbarram no limite de
+        recursão do Python. Retorna listas de índices, na ordem em que o
+        algoritmo as fecha (dependências antes dos dependentes). Com nodes,
+        só o subgrafo induzido por esses índices é percorrido.
+        """
+        n = len(self)
+        offsets = self.prereq_offsets
+        targets = self.prereq_targets
+        order = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack = []
+        components = []
+        counter = 0
+        if nodes is None:
+            roots = range(n)
+            outside = None
+        else:
+            roots = sorted(nodes)
+            outside = bytearray(b'\x01') * n
+            for node in roots:
+                outside[node] = 0
+
+        for root in roots:
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, offsets[root])]
+
+            while work:
+                node, position = work[-1]
+                end = offsets[node + 1]
+                descended = False
+                while position < end:
+                    target = targets[position]
+                    position += 1
+                    if target < 0 or (outside is not None and outside[target]):
+                        continue
+                    if order[target] == -1:
+                        # Desce para o pré-requisito; o nó atual continua de onde parou
+                        work[-1] = (node, position)
+                        order[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, offsets[target]))
+                        descended = True
+                        break
+                    if on_stack[target] and order[target] < low[node]:
+                        low[node] = order[target]
+                if descended:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+        return components
+
+    def cycle_groups(self, nodes=None):
+        """Grupos de quests em dependência circular (SCCs com ciclo).
+
+        Cada grupo é a lista ordenada de índices; os grupos vêm ordenados
+        pelo primeiro índice. nodes restringe a busca a um subgrafo.
+        """
+        groups = []
+        for component in self.strongly_connected_components(nodes):
+            if len(component) > 1 or component[0] in self.prerequisites(component[0]):
+                groups.append(sorted(component))
+        groups.sort()
+        return groups
+
+    def representative_cycle(self, group):
+        """Um ciclo do grupo, começando e terminando no menor índice.
+
+        Busca em largura restrita ao grupo, então o ciclo é o mais curto
+        que passa por esse nó. Segue as arestas quest -> pré-requisito.
+        """
+        members = set(group)
+        start = group[0]
+        parent = {}
+        queue = [start]
+        for node in queue:
+            for prereq in self.prerequisites(node):
+                if prereq == start:
+                    path = [start]
+                    while node != start:
+                        path.append(node)
+                        node = parent[node]
+                    return [start] + path[:0:-1] + [start]
+                if prereq in members and prereq not in parent:
+                    parent[prereq] = node
+                    queue.append(prereq)
+        return [start, start]
+
+    # Compatibilidade com os scripts antigos -------------------------------
+
+    def get(self, quest_id):
+        """Índice da quest pelo ID (None se não existir)"""
+        return self.index.get(quest_id)
+
+    def quest_dict(self, quest):
+        """A quest no formato do quests-database.json"""
+        return {
+            'id': self.ids[quest],
+            'name': self.names[quest],
+            'tier': self.tiers[quest],
+            'prerequisites': self.prerequisite_ids(quest, external=False),
+            'prerequisitesExternal': self.prerequisite_ids(quest, external=True),
+            'wikiUrl': self.wiki_urls[quest],
+            'kappaRequired': bool(self.kappa[quest])
+        }
+
+    def quest_by_id(self):
+        """{quest_id: (npc_id, quest)}, o índice que os scripts montavam à mão"""
+        return {
+            self.ids[i]: (self.npc_id(i), self.quest_dict(i))
+            for i in range(len(self)) if self.ids[i] and self.index[self.ids[i]] == i
+        }
+
+    def state(self):
+        return {field: getattr(self, field) for field in _FIELDS}
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _read_cache(cache_path, source_hash):
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get('format') != GRAPH_FORMAT:
+        return None
+    if cached['state'].get('source_hash') != source_hash:
+        return None
+    return QuestGraph(**cached['state'])
+
+
+def _write_cache(cache_path, graph):
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'format': GRAPH_FORMAT, 'state': graph.state()}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[QUEST GRAPH] Não foi possível gravar o cache: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_graph(path=DATABASE_FILE, cache_path=GRAPH_CACHE_FILE):
+    """Grafo do banco de quests, usando o cache enquanto o JSON não mudar"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    source_hash = hashlib.sha256(raw).hexdigest()
+
+    if cache_path:
+        graph = _read_cache(cache_path, source_hash)
+        if graph is not None:
+            return graph
+
+    # Aceita também a forma compacta (quests-database.min.json, quest_dist.py)
+    graph = QuestGraph.compile(rehydrate(json.loads(raw.decode('utf-8'))), source_hash=source_hash)
+    if cache_path:
+        _write_cache(cache_path, graph)
+    return graph
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Extração das informações de quest do HTML renderizado da wiki.
+
+As páginas do fandom têm centenas de KB de navegação, anúncios e scripts,
+mas só precisamos do título, da infobox e das seções Objectives e Guide.
+parse_quest_page_fast recorta esses trechos do texto e monta a árvore
+apenas deles (com SoupStrainer como rede de segurança), em vez de construir
+a árvore da página inteira como parse_quest_page_full faz.
+
+O caminho rápido ainda não foi conferido contra páginas reais gravadas (o
+corpus de fixtures/ é sintético), então parse_quest_page continua usando a
+árvore completa com html.parser, como o scraper original. O caminho rápido só
+é usado com TARKOV_PARSER_FAST=1; nele o backend do BeautifulSoup é plugável
+(lxml, em C, quando estiver instalado) e os casos que ele não recorta voltam
+para a árvore completa com html.parser.
+
+Configuração via variáveis de ambiente:
+    TARKOV_PARSER_FAST     '1' ativa o caminho rápido (padrão: desativado)
+    TARKOV_PARSER_BACKEND  backend do caminho rápido, 'lxml' ou 'html.parser'
+                           (padrão: lxml se disponível)
+"""
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+FAST_PARSER = os.environ.get('TARKOV_PARSER_FAST', '0') == '1'
+DEFAULT_BACKEND = os.environ.get('TARKOV_PARSER_BACKEND', 'lxml' if HAS_LXML else 'html.parser')
+# Árvore e backend do scraper original, referência para o caminho rápido
+BASELINE_BACKEND = 'html.parser'
+
+WIKI_BASE_URL = 'https://escapefromtarkov.fandom.com'
+
+H1_RE = re.compile(r'<h1\b[^>]*>.*?</h1>', re.IGNORECASE | re.DOTALL)
+ASIDE_TAG_RE = re.compile(r'<(/?)aside\b[^>]*>', re.IGNORECASE)
+DIV_TAG_RE = re.compile(r'<(/?)div\b', re.IGNORECASE)
+HEADING_START_RE = re.compile(r'<h[23]\b', re.IGNORECASE)
+HEADING_END_RE = re.compile(r'</h[23]\s*>', re.IGNORECASE)
+NPC_LABEL_RE = re.compile(r'[Tt]rader|[Nn]pc|[Gg]iver', re.I)
+
+
+def resolve_backend(backend=None):
+    """Backend pedido, caindo para html.parser se o lxml não estiver instalado"""
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'lxml' and not HAS_LXML:
+        return 'html.parser'
+    return backend
+
+
+def empty_quest_info():
+    return {
+        'name': '',
+        'npc': '',
+        'objectives': [],
+        'guide_images': []
+    }
+
+
+# ---------------------------------------------------------------------------
+# Extração a partir da árvore (comum às duas estratégias)
+# ---------------------------------------------------------------------------
+
+def extract_title(soup):
+    title_elem = soup.find('h1', class_='page-header__title')
+    if not title_elem:
+        title_elem = soup.find('h1', {'id': 'firstHeading'})
+    return title_elem.get_text(' ', strip=True) if title_elem else ''
+
+
+def extract_npc(infobox):
+    # Procurar NPC/Trader usando data-source
+    npc_data = infobox.find('div', {'data-source': 'trader'})
+    if npc_data:
+        npc_value = npc_data.find('div', class_='pi-data-value') or npc_data.find('a')
+        if npc_value:
+            return npc_value.get_text(' ', strip=True)
+        return ''
+
+    # Fallback: procurar por texto
+    for label in infobox.find_all(['th', 'td'], string=NPC_LABEL_RE):
+        if label.name == 'th':
+            npc_value = label.find_next_sibling('td')
+        else:
+            npc_value = label.find_next('td')
+        if npc_value:
+            return npc_value.get_text(' ', strip=True)
+    return ''
+
+
+def _section_heading(container, section_id):
+    span = container.find('span', {'id': section_id})
+    if span:
+        return span.find_parent(['h2', 'h3'])
+    return None
+
+
+def extract_objectives(container):
+    """Itens de primeiro nível da primeira lista após o heading Objectives"""
+    objectives = []
+    heading = _section_heading(container, 'Objectives')
+    if not heading:
+        return objectives
+
+    next_elem = heading.find_next_sibling()
+    while next_elem:
+        if next_elem.name == 'ul':
+            for li in next_elem.find_all('li', recursive=False):
+                obj_text = li.get_text(' ', strip=True)
+                if obj_text and obj_text not in objectives:
+                    objectives.append(obj_text)
+            break
+        elif next_elem.name in ['h2', 'h3']:
+            break
+        next_elem = next_elem.find_next_sibling()
+    return objectives
+
+
+def normalize_image_src(img):
+    """URL completa da imagem, ou None se for placeholder/ícone"""
+    # Priorizar data-src para lazy loading, depois src
+    img_src = img.get('data-src') or img.get('src')
+    if not img_src:
+        return None
+
+    # Ignorar placeholders de lazy load (data:image/gif)
+    if img_src.startswith('data:image'):
+        img_src = img.get('data-src') or img.get('data-lazy-src')
+        if not img_src or img_src.startswith('data:image'):
+            return None
+
+    # Filtrar ícones pequenos e avatares
+    img_class = img.get('class', [])
+    if any('icon' in str(c).lower() or 'avatar' in str(c).lower() for c in img_class):
+        return None
+
+    # Converter para URL completa se necessário
+    if img_src.startswith('//'):
+        img_src = 'https:' + img_src
+    elif img_src.startswith('/'):
+        img_src = WIKI_BASE_URL + img_src
+
+    # Filtrar imagens muito pequenas (provavelmente ícones)
+    img_width = img.get('width')
+    if img_width:
+        try:
+            if int(str(img_width)) < 100:
+                return None
+        except ValueError:
+            pass
+
+    if not img_src.startswith('http'):
+        return None
+    return img_src
+
+
+def full_size_image(img_src):
+    """Remove /scale-to-width-down/... para obter a imagem em tamanho completo"""
+    if '/scale-to-width-down/' in img_src:
+        img_src = img_src.split('/scale-to-width-down/')[0]
+        if '/revision/latest' in img_src:
+            img_src = img_src.split('?')[0]
+    return img_src
+
+
+def extract_guide_images(container):
+    """Imagens entre o heading Guide e o próximo heading"""
+    guide_images = []
+    heading = _section_heading(container, 'Guide')
+    if not heading:
+        return guide_images
+
+    next_elem = heading.find_next_sibling()
+    while next_elem:
+        if next_elem.name in ['h2', 'h3']:
+            break
+        for img in next_elem.find_all('img'):
+            img_src = normalize_image_src(img)
+            # A checagem de duplicata usa a URL antes de remover o scale,
+            # como no scraper original
+            if img_src and img_src not in guide_images:
+                guide_images.append(full_size_image(img_src))
+        next_elem = next_elem.find_next_sibling()
+    return guide_images
+
+
+def find_infobox(soup):
+    return soup.find('aside', class_='portable-infobox') or soup.find('table', class_='infobox')
+
+
+def find_main_content(soup):
+    return soup.find('div', class_='mw-parser-output') or soup.find('div', {'id': 'mw-content-text'})
+
+
+# ---------------------------------------------------------------------------
+# Estratégia completa: árvore da página inteira
+# ---------------------------------------------------------------------------
+
+def parse_quest_page_full(content, backend=BASELINE_BACKEND):
+    """Extrai nome, NPC, objetivos e imagens montando a árvore da página inteira"""
+    soup = BeautifulSoup(content, resolve_backend(backend))
+    quest_info = empty_quest_info()
+    quest_info['name'] = extract_title(soup)
+
+    infobox = find_infobox(soup)
+    if infobox:
+        quest_info['npc'] = extract_npc(infobox)
+
+    main_content = find_main_content(soup)
+    if main_content:
+        quest_info['objectives'] = extract_objectives(main_content)
+        quest_info['guide_images'] = extract_guide_images(main_content)
+    return quest_info
+
+
+# ---------------------------------------------------------------------------
+# Estratégia rápida: só os trechos necessários
+# ---------------------------------------------------------------------------
+
+def _decode(content):
+    if isinstance(content, bytes):
+        return content.decode('utf-8')
+    return content
+
+
+def _slice_infobox(html):
+    """Bloco <aside class="portable-infobox ...">...</aside> (com aninhamento)"""
+    depth = 0
+    start = None
+    for match in ASIDE_TAG_RE.finditer(html):
+        closing = match.group(1) == '/'
+        if start is None:
+            if not closing and 'portable-infobox' in match.group(0):
+                start = match.start()
+                depth = 1
+            continue
+        depth += -1 if closing else 1
+        if depth == 0:
+            return html[start:match.end()]
+    return None
+
+
+def _slice_section(html, section_id):
+    """Do heading da seção até o próximo <h2>/<h3>.
+
+    Retorna '' se a seção não existe e None se o recorte não é confiável
+    (heading aninhado em outro bloco, caso em que a árvore completa decide).
+    """
+    found = re.search(r'id=["\']%s["\']' % re.escape(section_id), html)
+    if not found:
+        return ''
+    marker = found.start()
+    start = max(html.rfind('<h2', 0, marker), html.rfind('<h3', 0, marker))
+    heading_end = HEADING_END_RE.search(html, marker)
+    if start < 0 or not heading_end:
+        return None
+    following = HEADING_START_RE.search(html, heading_end.end())
+    fragment = html[start:following.start() if following else len(html)]
+
+    # Se algum </div> fecha um bloco aberto antes do heading, o heading não
+    # está no mesmo nível do conteúdo e os irmãos seriam outros
+    depth = 0
+    for match in DIV_TAG_RE.finditer(fragment):
+        depth += -1 if match.group(1) else 1
+        if depth < 0:
+            return None
+    return fragment
+
+
+def _only_title_and_infobox(name, attrs):
+    classes = (attrs or {}).get('class') or ''
+    if isinstance(classes, (list, tuple)):
+        classes = ' '.join(classes)
+    if name == 'h1':
+        return True
+    if name == 'aside':
+        return 'portable-infobox' in classes
+    if name == 'table':
+        return 'infobox' in classes.split()
+    return False
+
+
+def parse_quest_page_fast(content, backend=None):
+    """Extrai as mesmas informações que parse_quest_page_full, montando a
+    árvore só do título, da infobox e das seções Objectives e Guide.
+
+    Quando algum recorte não é possível, usa a árvore completa com o backend
+    original (html.parser).
+    """
+    backend = resolve_backend(backend)
+    try:
+        html = _decode(content)
+    except UnicodeDecodeError:
+        return parse_quest_page_full(content)
+
+    if 'mw-parser-output' not in html:
+        return parse_quest_page_full(html)
+
+    objectives_html = _slice_section(html, 'Objectives')
+    guide_html = _slice_section(html, 'Guide')
+    if objectives_html is None or guide_html is None:
+        return parse_quest_page_full(html)
+
+    quest_info = empty_quest_info()
+
+    infobox_html = _slice_infobox(html)
+    if infobox_html is not None:
+        head = BeautifulSoup(''.join(H1_RE.findall(html)) + infobox_html, backend)
+    else:
+        # Sem portable-infobox: SoupStrainer materializa só h1 e tabelas infobox
+        head = BeautifulSoup(html, backend, parse_only=SoupStrainer(_only_title_and_infobox))
+
+    quest_info['name'] = extract_title(head)
+    if not quest_info['name']:
+        return parse_quest_page_full(html)
+
+    infobox = find_infobox(head)
+    if infobox:
+        quest_info['npc'] = extract_npc(infobox)
+
+    if objectives_html:
+        quest_info['objectives'] = extract_objectives(BeautifulSoup(objectives_html, backend))
+    if guide_html:
+        quest_info['guide_images'] = extract_guide_images(BeautifulSoup(guide_html, backend))
+    return quest_info
+
+
+def active_parser():
+    """Descrição da estratégia usada por parse_quest_page (para logs e benchmarks)"""
+    if FAST_PARSER:
+        return f'rápido/{resolve_backend()}'
+    return f'completo/{BASELINE_BACKEND}'
+
+
+def parse_quest_page(content, backend=None):
+    """Ponto de entrada usado pelo scraper: árvore completa com html.parser,
+    ou o caminho rápido com TARKOV_PARSER_FAST=1"""
+    if FAST_PARSER:
+        return parse_quest_page_fast(content, backend)
+    return parse_quest_page_full(content, BASELINE_BACKEND)
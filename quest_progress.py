@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Progresso do jogador como bitset sobre os índices do grafo (quest_graph.py).
+
+O app.js guarda o progresso no localStorage como tarkovQuestProgress:
+    {npcId: {completed: [questId, ...], current: questId | null}}
+e cada verificação de pré-requisito percorre essas listas com includes().
+Aqui o progresso vira dois ints (completas e em andamento), em que o bit i
+corresponde à quest de índice i do grafo, e a disponibilidade de todas as
+quests sai de uma vez:
+
+- com NumPy, as arestas de pré-requisito viram arrays e a verificação é uma
+  operação vetorizada sobre uma matriz booleana (várias linhas de progresso
+  de uma vez com availability_many)
+- sem NumPy, o mesmo cálculo em Python puro, uma passada sobre as arestas
+
+As regras de disponibilidade são as do updateQuestList do app.js: uma quest
+está disponível quando não foi completada, todos os pré-requisitos (de
+qualquer NPC) foram completados e nenhuma outra quest do seu grupo
+mutuamente exclusivo foi completada. Pré-requisitos inexistentes nunca são
+satisfeitos.
+
+Formato compacto (o mesmo de encodeProgressCompact no app.js):
+    p1.<fingerprint>.<completas>.<em andamento>
+Cada bitset vai em base64url sem padding, byte i com as quests 8i..8i+7 (bit
+menos significativo primeiro), sem os zeros finais. O fingerprint é o FNV-1a
+de 32 bits (hex) dos IDs das quests na ordem do quests-database.json unidos
+por '\\n': um progresso codificado com outra versão do banco é rejeitado.
+"""
+import base64
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from quest_simulation import MUTUALLY_EXCLUSIVE_QUESTS, NPC_UNLOCK_REQUIREMENTS, iter_bits
+
+COMPACT_PREFIX = 'p1'
+
+
+def fnv1a_32(data):
+    """Hash FNV-1a de 32 bits (o mesmo do app.js)"""
+    value = 0x811c9dc5
+    for byte in data:
+        value = ((value ^ byte) * 0x01000193) & 0xffffffff
+    return value
+
+
+def bits_to_b64(bits):
+    if not bits:
+        return ''
+    raw = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def b64_to_bits(text):
+    if not text:
+        return 0
+    raw = base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+    return int.from_bytes(raw, 'little')
+
+
+class ProgressModel:
+    """Conversões e disponibilidade do progresso sobre um QuestGraph"""
+
+    def __init__(self, graph, exclusive_groups=None, npc_unlocks=None, use_numpy=None):
+        if exclusive_groups is None:
+            exclusive_groups = MUTUALLY_EXCLUSIVE_QUESTS
+        if npc_unlocks is None:
+            npc_unlocks = NPC_UNLOCK_REQUIREMENTS
+        self.graph = graph
+        self.size = size = len(graph)
+        self.use_numpy = HAS_NUMPY if use_numpy is None else (use_numpy and HAS_NUMPY)
+        self.fingerprint = format(fnv1a_32('\n'.join(graph.ids).encode('utf-8')), '08x')
+
+        # Grupos exclusivos (só as quests que existem) e NPCs bloqueados
+        self.groups = {
+            group_id: [graph.index[quest_id] for quest_id in quest_ids if quest_id in graph.index]
+            for group_id, quest_ids in exclusive_groups.items()
+        }
+        self.npc_unlocks = {
+            npc_id: graph.get(quest_id) for npc_id, (_, quest_id) in npc_unlocks.items()
+            if npc_id in graph.npc_index
+        }
+
+        # Pré-requisitos sem repetição; o índice size representa "inexistente"
+        self.requirements = []
+        for quest in range(size):
+            start, end = graph.prereq_offsets[quest], graph.prereq_offsets[quest + 1]
+            targets = [target if target >= 0 else size for target in graph.prereq_targets[start:end]]
+            self.requirements.append(tuple(dict.fromkeys(targets)))
+
+        if self.use_numpy:
+            counts = np.fromiter((len(r) for r in self.requirements), dtype=np.int64, count=size)
+            self._owner = np.repeat(np.arange(size), counts)
+            self._targets = np.fromiter(
+                (t for r in self.requirements for t in r), dtype=np.int64, count=int(counts.sum())
+            )
+            self._members = [np.array(members, dtype=np.int64) for members in self.groups.values()]
+
+    # Conversões --------------------------------------------------------------
+
+    def from_tarkov(self, progress):
+        """(completas, em andamento, IDs desconhecidos) a partir do tarkovQuestProgress.
+
+        ValueError se completed não for uma lista de strings ou current não
+        for string/null.
+        """
+        completed = current = 0
+        unknown = []
+        for npc_id, npc_progress in (progress or {}).items():
+            if not isinstance(npc_progress, dict):
+                continue
+            completed_ids = npc_progress.get('completed') or []
+            if not isinstance(completed_ids, list) or not all(isinstance(q, str) for q in completed_ids):
+                raise ValueError(f"{npc_id}.completed deve ser uma lista de IDs (strings)")
+            if not isinstance(npc_progress.get('current'), (str, type(None))):
+                raise ValueError(f"{npc_id}.current deve ser um ID (string) ou null")
+            for quest_id in completed_ids:
+                quest = self.graph.index.get(quest_id)
+                if quest is None:
+                    unknown.append(quest_id)
+                else:
+                    completed |= 1 << quest
+            quest_id = npc_progress.get('current')
+            if quest_id:
+                quest = self.graph.index.get(quest_id)
+                if quest is None:
+                    unknown.append(quest_id)
+                else:
+                    current |= 1 << quest
+        return completed, current, unknown
+
+    def to_tarkov(self, completed, current=0):
+        """tarkovQuestProgress equivalente (listas na ordem do banco)"""
+        progress = {npc_id: {'completed': [], 'current': None} for npc_id in self.graph.npcs}
+        for quest in iter_bits(completed):
+            progress[self.graph.npc_id(quest)]['completed'].append(self.graph.ids[quest])
+        for quest in iter_bits(current):
+            progress[self.graph.npc_id(quest)]['current'] = self.graph.ids[quest]
+        return progress
+
+    def encode(self, completed, current=0):
+        """Forma compacta (ver docstring do módulo)"""
+        return '.'.join((COMPACT_PREFIX, self.fingerprint, bits_to_b64(completed), bits_to_b64(current)))
+
+    def decode(self, text):
+        """(completas, em andamento) a partir da forma compacta; ValueError se inválida"""
+        parts = (text or '').strip().split('.')
+        if len(parts) != 4 or parts[0] != COMPACT_PREFIX:
+            raise ValueError("Formato de progresso compacto inválido")
+        if parts[1] != self.fingerprint:
+            raise ValueError("Progresso codificado com outra versão do banco de quests")
+        try:
+            completed, current = b64_to_bits(parts[2]), b64_to_bits(parts[3])
+        except ValueError as e:
+            raise ValueError(f"Bitset inválido: {e}")
+        if (completed | current) >> self.size:
+            raise ValueError("Bitset com quests além do tamanho do banco")
+        return completed, current
+
+    def flags(self, bits):
+        """Lista de 0/1 por quest"""
+        text = format(bits, 'b')[::-1][:self.size]
+        return [int(c) for c in text] + [0] * (self.size - len(text))
+
+    def _vector(self, bits):
+        raw = bits.to_bytes((self.size + 7) // 8, 'little')
+        return np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder='little')[:self.size].astype(bool)
+
+    def _from_vector(self, vector):
+        return int.from_bytes(np.packbits(vector, bitorder='little').tobytes(), 'little')
+
+    # Disponibilidade -----------------------------------------------------------
+
+    def availability(self, completed):
+        """Bitsets da disponibilidade de todas as quests (ver availability_many)"""
+        return self.availability_many([completed])[0]
+
+    def availability_many(self, completed_list):
+        """Disponibilidade para vários progressos de uma vez.
+
+        Para cada bitset de completas retorna um dict de bitsets:
+            prerequisites_met  todos os pré-requisitos completos
+            available          disponível (updateQuestList: !isCompleted &&
+                               allPrerequisitesMet && !isBlockedByExclusive)
+            locked             não completa e com pré-requisitos pendentes
+            blocked            não completa e bloqueada por exclusão mútua
+        """
+        if self.use_numpy:
+            return self._availability_numpy(completed_list)
+        return [self._availability_python(completed) for completed in completed_list]
+
+    def _result(self, completed, met, blocked):
+        blocked &= ~completed
+        return {
+            'prerequisites_met': met,
+            'available': met & ~completed & ~blocked,
+            'locked': ~met & ~completed & ((1 << self.size) - 1),
+            'blocked': blocked
+        }
+
+    def _availability_python(self, completed):
+        done = self.flags(completed) + [0]  # posição size = pré-requisito inexistente
+        met = 0
+        for quest, requirements in enumerate(self.requirements):
+            if all(done[target] for target in requirements):
+                met |= 1 << quest
+        blocked = 0
+        for members in self.groups.values():
+            taken = [quest for quest in members if done[quest]]
+            for quest in members:
+                if any(other != quest for other in taken):
+                    blocked |= 1 << quest
+        return self._result(completed, met, blocked)
+
+    def _availability_numpy(self, completed_list):
+        rows = len(completed_list)
+        # Matriz (progressos x quests + 1); a coluna extra é o pré-requisito inexistente
+        done = np.zeros((rows, self.size + 1), dtype=bool)
+        for row, completed in enumerate(completed_list):
+            done[row, :self.size] = self._vector(completed)
+
+        # Pendências por quest: soma das arestas cujo alvo não está completo
+        pending_edges = ~done[:, self._targets]
+        cells = (np.arange(rows)[:, None] * self.size + self._owner[None, :])[pending_edges]
+        met = np.bincount(cells, minlength=rows * self.size).reshape(rows, self.size) == 0
+
+        blocked = np.zeros((rows, self.size), dtype=bool)
+        for members in self._members:
+            taken = done[:, members]
+            others = taken.sum(axis=1, keepdims=True) - taken
+            blocked[:, members] |= others > 0
+
+        return [
+            self._result(completed, self._from_vector(met[row]), self._from_vector(blocked[row]))
+            for row, completed in enumerate(completed_list)
+        ]
+
+    def invalid_completed(self, completed):
+        """Completas sem os pré-requisitos completos (validateCompletedQuests do app.js)"""
+        return completed & ~self.availability(completed)['prerequisites_met']
+
+    def npc_unlocked(self, completed):
+        """{npc_id: desbloqueado?} (npcUnlockRequirements do app.js)"""
+        unlocked = {npc_id: True for npc_id in self.graph.npcs}
+        for npc_id, quest in self.npc_unlocks.items():
+            unlocked[npc_id] = quest is not None and bool(completed >> quest & 1)
+        return unlocked
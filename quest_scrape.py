@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Scraping das páginas de quest da wiki (download + parse), sem estado global.
+
+Usado pelo servidor Flask (scraper.py) e pelos scripts de linha de comando
+(preprocess_quest_details.py, fixture_corpus.py, benchmark_scraper.py).
+Importar este módulo não carrega o quests-details.json nem cria caches,
+diretórios de lock ou serviços do servidor: só o pool HTTP e o parser.
+"""
+import re
+import traceback
+
+import http_pool
+import quest_parser
+
+# ID da revisão da página, exposto pela MediaWiki na configuração JS
+REVISION_ID_RE = re.compile(r'"wg(?:Cur)?RevisionId"\s*:\s*(\d+)')
+
+
+def parse_quest_page(content):
+    """Extrai nome, NPC, objetivos e imagens do guia do HTML da página da quest"""
+    return quest_parser.parse_quest_page(content)
+
+
+def extract_revision_id(content):
+    """Extrai o ID da revisão MediaWiki (wgRevisionId) do HTML da página"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='ignore')
+    match = REVISION_ID_RE.search(content)
+    return int(match.group(1)) if match else None
+
+
+def scrape_quest_info_conditional(wiki_url, validators=None):
+    """Faz scraping condicional usando os validadores da última busca.
+
+    validators é um dict com 'etag', 'last_modified' e 'revision_id'. Envia
+    If-None-Match/If-Modified-Since; se a wiki responder 304, ou se a página
+    vier com o mesmo ID de revisão, retorna {'not_modified': True} sem refazer
+    o parse. Caso contrário retorna as informações da quest. Em ambos os casos
+    o resultado inclui os validadores atualizados em 'validators'.
+    """
+    validators = validators or {}
+    try:
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        response = http_pool.get(wiki_url, headers=headers)
+        if response.status_code == 304:
+            return {'not_modified': True, 'validators': validators}
+        response.raise_for_status()
+
+        new_validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'revision_id': extract_revision_id(response.content)
+        }
+
+        # Página reenviada, mas o conteúdo na wiki é a mesma revisão
+        if validators.get('revision_id') and new_validators['revision_id'] == validators['revision_id']:
+            return {'not_modified': True, 'validators': new_validators}
+
+        quest_info = parse_quest_page(response.content)
+        quest_info['validators'] = new_validators
+        return quest_info
+
+    except Exception as e:
+        return {'error': str(e), 'traceback': traceback.format_exc()}
+
+
+def scrape_quest_info(wiki_url):
+    """Faz scraping das informações da quest na wiki"""
+    try:
+        response = http_pool.get(wiki_url)
+        response.raise_for_status()
+
+        return parse_quest_page(response.content)
+
+    except Exception as e:
+        return {'error': str(e), 'traceback': traceback.format_exc()}
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Divisão do quests-details.json em um arquivo por NPC (carregamento sob demanda).
+
+O site só precisa dos detalhes das quests que o usuário abre, mas baixava o
+quests-details.json inteiro na inicialização. Junto com o arquivo completo são
+gravados em quests-details/:
+
+- <npc_id>.json com os detalhes das quests daquele NPC, na forma compacta do
+  quest_dist.py (as URLs que não batem com nenhuma quest do banco vão para
+  other.json)
+- index.json com arquivo, quantidade de quests, tamanho e sha256 de cada shard
+
+O app.js lê só o index.json ao abrir e busca o shard de um NPC quando ele é
+selecionado ou quando uma quest dele é aberta. O sha256 entra na URL do shard
+(?v=...) e é o ETag da rota /quests-details/<arquivo> do Flask, então um shard
+que não mudou nunca é baixado de novo. Shards com o mesmo conteúdo não são
+regravados, para não mexer no mtime. Quando só algumas quests mudam (gravação do
+servidor), update_shards() regrava apenas os shards dos NPCs delas e as
+entradas correspondentes do index.json.
+
+Configuração via variável de ambiente:
+    TARKOV_DETAILS_SHARDS_DIR  diretório dos shards (padrão quests-details/)
+
+Uso:
+    python quest_shards.py   # regrava os shards a partir do quests-details.json
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import unquote
+
+from quest_cache import normalize_wiki_url
+from quest_dist import DATABASE_FILE, DETAILS_FILE, compact_details
+from quest_graph import load_graph
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32' and __name__ == '__main__':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SHARDS_DIR = os.environ.get('TARKOV_DETAILS_SHARDS_DIR', os.path.join(BASE_DIR, 'quests-details'))
+INDEX_NAME = 'index.json'
+OTHER_SHARD = 'other'
+
+
+def url_key(url):
+    """URL normalizada e sem percent-encoding (como no quest_details_index)"""
+    return normalize_wiki_url(unquote(url)) if url else None
+
+
+def npc_by_url(database_path=DATABASE_FILE):
+    """{url normalizada da wiki: npc_id} a partir do grafo do banco"""
+    graph = load_graph(database_path)
+    return {url_key(graph.wiki_urls[quest]): graph.npc_id(quest)
+            for quest in range(len(graph)) if graph.wiki_urls[quest]}
+
+
+def split_details(data, npc_of_url):
+    """dict do quests-details.json -> {npc_id: {url: detalhes}}"""
+    shards = {}
+    for url, entry in data.get('details', {}).items():
+        npc_id = npc_of_url.get(url_key(url), OTHER_SHARD)
+        shards.setdefault(npc_id, {})[url] = entry
+    return shards
+
+
+def _shard_payload(shard_meta, details):
+    payload = json.dumps(compact_details(dict(shard_meta, details=details)),
+                         ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return payload, hashlib.sha256(payload).hexdigest()
+
+
+def _meta(data):
+    meta = {key: value for key, value in data.items() if key != 'details'}
+    # Sem o last_updated: um shard só muda (e ganha outro ETag) se as quests dele mudarem
+    shard_meta = {key: value for key, value in meta.items() if key != 'last_updated'}
+    return meta, shard_meta
+
+
+def _read_index(shards_dir):
+    try:
+        with open(os.path.join(shards_dir, INDEX_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def write_shards(data, shards_dir=SHARDS_DIR, database_path=DATABASE_FILE, npc_of_url=None):
+    """Grava os shards e o index.json; retorna o índice.
+
+    npc_of_url (de npc_by_url) evita recarregar o grafo a cada chamada.
+    """
+    os.makedirs(shards_dir, exist_ok=True)
+    previous = _read_index(shards_dir).get('shards', {})
+    meta, shard_meta = _meta(data)
+    if npc_of_url is None:
+        npc_of_url = npc_by_url(database_path)
+
+    shards = {}
+    for npc_id, details in sorted(split_details(data, npc_of_url).items()):
+        payload, digest = _shard_payload(shard_meta, details)
+        file_name = f"{npc_id}.json"
+        path = os.path.join(shards_dir, file_name)
+        if previous.get(npc_id, {}).get('sha256') != digest or not os.path.exists(path):
+            _write(path, payload)
+        shards[npc_id] = {'file': file_name, 'count': len(details), 'size': len(payload), 'sha256': digest}
+
+    index = dict(meta, shards=shards)
+    _write(os.path.join(shards_dir, INDEX_NAME),
+           json.dumps(index, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    # Remove shards de NPCs que não existem mais
+    keep = {INDEX_NAME} | {entry['file'] for entry in shards.values()}
+    for entry in os.scandir(shards_dir):
+        if entry.is_file() and entry.name.endswith('.json') and entry.name not in keep:
+            os.remove(entry.path)
+    return index
+
+
+def update_shards(data, urls, npc_of_url, shards_dir=SHARDS_DIR):
+    """Regrava só os shards dos NPCs das URLs alteradas e as entradas deles no
+    index.json; sem índice anterior (ou com NPC novo), grava tudo"""
+    index = _read_index(shards_dir)
+    shards = index.get('shards')
+    npc_ids = {npc_of_url.get(url_key(url), OTHER_SHARD) for url in urls}
+    if not shards or any(npc_id not in shards for npc_id in npc_ids):
+        return write_shards(data, shards_dir, npc_of_url=npc_of_url)
+
+    meta, shard_meta = _meta(data)
+    for npc_id in sorted(npc_ids):
+        details = {url: entry for url, entry in data.get('details', {}).items()
+                   if npc_of_url.get(url_key(url), OTHER_SHARD) == npc_id}
+        payload, digest = _shard_payload(shard_meta, details)
+        entry = shards[npc_id]
+        if entry.get('sha256') != digest:
+            _write(os.path.join(shards_dir, entry['file']), payload)
+        shards[npc_id] = dict(entry, count=len(details), size=len(payload), sha256=digest)
+
+    index = dict(meta, shards=shards)
+    _write(os.path.join(shards_dir, INDEX_NAME),
+           json.dumps(index, ensure_ascii=False, indent=2).encode('utf-8'))
+    return index
+
+
+class DetailShards:
+    """index.json dos shards (recarregado quando muda) para o Flask"""
+
+    def __init__(self, shards_dir=SHARDS_DIR):
+        self.dir = shards_dir
+        self.path = os.path.join(shards_dir, INDEX_NAME)
+        self._mtime = None
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            files = {}
+            if mtime is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        index = json.load(f)
+                    files = {entry['file']: dict(entry, npc=npc_id) for npc_id, entry in index['shards'].items()}
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"[SHARDS] Índice inválido em {self.path}: {e}")
+            self._files = files
+            self._mtime = mtime
+
+    def shard(self, file_name):
+        """Entrada do índice para um arquivo de shard (ou None)"""
+        self._refresh()
+        return self._files.get(file_name)
+
+    def file_path(self, entry):
+        return os.path.join(self.dir, entry['file'])
+
+    def stats(self):
+        self._refresh()
+        return {
+            'shards': len(self._files),
+            'quests': sum(entry['count'] for entry in self._files.values())
+        }
+
+
+def main():
+    if not os.path.exists(DETAILS_FILE):
+        print(f"[AVISO] {os.path.basename(DETAILS_FILE)} não encontrado")
+        return 1
+    with open(DETAILS_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    started = time.perf_counter()
+    index = write_shards(data)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"[SHARDS] {len(index['shards'])} shards em {SHARDS_DIR} ({elapsed:.0f} ms)")
+    for npc_id, entry in index['shards'].items():
+        print(f"  {entry['file']:18} {entry['count']:4} quests  {entry['size'] / 1024:7.1f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
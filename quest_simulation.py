@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Simulação de progresso sobre o grafo compilado (quest_graph.py).
+
+O simulate_quest_availability.py avalia um único instante: quais quests estão
+disponíveis para um conjunto de quests completas. Este módulo joga a
+progressão inteira com o algoritmo de Kahn: cada quest guarda um contador de
+pré-requisitos ainda não completos e, ao completar uma quest, só os seus
+dependentes são decrementados. Tudo roda em O(V + E):
+
+- unlock_waves: ondas de desbloqueio completando tudo o que fica disponível
+- unlocks_after: o que é desbloqueado ao completar uma quest X
+- kappa_plan: o menor conjunto de quests para completar todas as kappaRequired
+  (o fecho dos pré-requisitos delas, em ordem topológica)
+
+As regras são as do app.js: pré-requisitos de qualquer NPC contam, um
+pré-requisito inexistente bloqueia a quest para sempre, completar uma quest de
+um grupo mutuamente exclusivo bloqueia as outras do grupo, e as quests de um NPC
+bloqueado (npcUnlockRequirements) só ficam disponíveis depois da quest que o
+desbloqueia.
+
+O conjunto de quests completas é um bitset: um int em que o bit i corresponde
+à quest de índice i no grafo (ver to_bitset/from_bitset).
+
+Uso:
+    python quest_simulation.py waves [--completed id1,id2]
+    python quest_simulation.py unlocks <quest_id> [--completed ...] [--all]
+    python quest_simulation.py kappa [--completed ...] [--choice grupo=quest_id]
+"""
+import argparse
+import io
+import sys
+from array import array
+
+from quest_graph import load_graph
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32' and __name__ == '__main__':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# Mesmos grupos do app.js (mutuallyExclusiveQuests)
+MUTUALLY_EXCLUSIVE_QUESTS = {
+    'postman_pat_choice': [
+        'youve_got_mail_1',      # Prapor - escolha 1
+        'possessor_1',           # Prapor - escolha 2
+        'postman_pat_part_2'     # Therapist - escolha 3
+    ]
+}
+
+# Mesmos requisitos do app.js (npcUnlockRequirements): npc -> (npc, quest)
+NPC_UNLOCK_REQUIREMENTS = {
+    'jaeger': ('mechanic', 'introduction')
+}
+
+
+def to_bitset(graph, quest_ids):
+    """Bitset com as quests informadas (IDs inexistentes são ignorados)"""
+    bits = 0
+    for quest_id in quest_ids:
+        quest = graph.index.get(quest_id)
+        if quest is not None:
+            bits |= 1 << quest
+    return bits
+
+
+def iter_bits(bits):
+    """Índices dos bits ligados, em ordem crescente"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def from_bitset(graph, bits):
+    """IDs das quests do bitset, na ordem do grafo"""
+    return [graph.ids[quest] for quest in iter_bits(bits)]
+
+
+class QuestSimulator:
+    """Motor de simulação (Kahn com contadores de grau de entrada)"""
+
+    def __init__(self, graph, exclusive_groups=None, npc_unlocks=None):
+        if exclusive_groups is None:
+            exclusive_groups = MUTUALLY_EXCLUSIVE_QUESTS
+        if npc_unlocks is None:
+            npc_unlocks = NPC_UNLOCK_REQUIREMENTS
+        self.graph = graph
+        size = len(graph)
+
+        # Pré-requisito extra para as quests de NPCs bloqueados
+        unlock_of = {}
+        for npc_id, (_, quest_id) in npc_unlocks.items():
+            unlock = graph.get(quest_id)
+            if unlock is not None and npc_id in graph.npc_index:
+                for quest in graph.npc_quests(npc_id):
+                    unlock_of[quest] = unlock
+
+        # Pré-requisitos sem repetição e a lista reversa correspondente
+        self.requirements = []
+        self.unlocked_by = [[] for _ in range(size)]
+        self.never = bytearray(size)  # 1 = pré-requisito inexistente
+        for quest in range(size):
+            requirements = list(dict.fromkeys(graph.prerequisites(quest)))
+            unlock = unlock_of.get(quest)
+            if unlock is not None and unlock != quest and unlock not in requirements:
+                requirements.append(unlock)
+            self.requirements.append(tuple(requirements))
+            for requirement in requirements:
+                self.unlocked_by[requirement].append(quest)
+            if graph.missing_prerequisites(quest):
+                self.never[quest] = 1
+
+        # Grupos mutuamente exclusivos, só com as quests que existem no banco
+        self.groups = {}
+        self.group_of = {}
+        for group_id, quest_ids in exclusive_groups.items():
+            members = [graph.index[quest_id] for quest_id in quest_ids if quest_id in graph.index]
+            self.groups[group_id] = members
+            for quest in members:
+                self.group_of[quest] = group_id
+
+    # Consultas sobre um instante -------------------------------------------
+
+    def chosen_groups(self, completed):
+        """{grupo: quest completa do grupo} (a primeira, se houver mais de uma)"""
+        chosen = {}
+        for group_id, members in self.groups.items():
+            for quest in members:
+                if completed >> quest & 1:
+                    chosen[group_id] = quest
+                    break
+        return chosen
+
+    def blocked_exclusive(self, completed):
+        """Bitset das quests bloqueadas porque outra do grupo foi completada"""
+        blocked = 0
+        for group_id, members in self.groups.items():
+            done = [quest for quest in members if completed >> quest & 1]
+            for quest in members:
+                if any(other != quest for other in done):
+                    blocked |= 1 << quest
+        return blocked
+
+    def is_available(self, quest, completed, blocked=None):
+        if completed >> quest & 1 or self.never[quest]:
+            return False
+        if blocked is None:
+            blocked = self.blocked_exclusive(completed)
+        if blocked >> quest & 1:
+            return False
+        return all(completed >> requirement & 1 for requirement in self.requirements[quest])
+
+    def available(self, completed=0):
+        """Índices das quests disponíveis com o progresso informado"""
+        blocked = self.blocked_exclusive(completed)
+        return [quest for quest in range(len(self.graph)) if self.is_available(quest, completed, blocked)]
+
+    # Progressão --------------------------------------------------------------
+
+    def _pending_counts(self, completed, members=None):
+        """Contadores de pré-requisitos não completos (só de members, se informado)"""
+        pending = array('i', bytes(4 * len(self.graph)))
+        quests = range(len(self.graph)) if members is None else members
+        for quest in quests:
+            if completed >> quest & 1:
+                continue
+            pending[quest] = sum(1 for requirement in self.requirements[quest]
+                                 if not completed >> requirement & 1)
+        return pending
+
+    def unlock_waves(self, completed=0, choices=None):
+        """Joga a progressão completando, a cada onda, tudo o que está disponível.
+
+        choices ({grupo: quest_id}) fixa a escolha dos grupos exclusivos; sem
+        ela vale a primeira quest do grupo que ficar disponível (na ordem do
+        grupo). Retorna um dict com:
+            waves        lista de ondas (índices das quests liberadas em cada uma)
+            completed    bitset final
+            blocked      índices bloqueados por exclusão mútua
+            unreachable  índices que nunca ficam disponíveis (pré-requisito
+                         inexistente, ciclo ou dependência de quest bloqueada)
+        """
+        size = len(self.graph)
+        pending = self._pending_counts(completed)
+        chosen = self.chosen_groups(completed)
+        for group_id, quest_id in (choices or {}).items():
+            if group_id in self.groups and group_id not in chosen and quest_id in self.graph.index:
+                chosen[group_id] = self.graph.index[quest_id]
+        blocked = self.blocked_exclusive(completed)
+        for group_id, choice in chosen.items():
+            for quest in self.groups[group_id]:
+                if quest != choice:
+                    blocked |= 1 << quest
+
+        frontier = [quest for quest in range(size)
+                    if not completed >> quest & 1 and not pending[quest]
+                    and not self.never[quest] and not blocked >> quest & 1]
+        waves = []
+        while frontier:
+            # Grupos ainda não decididos: vale o primeiro membro (na ordem do grupo)
+            candidates = {}
+            for quest in frontier:
+                group_id = self.group_of.get(quest)
+                if group_id is not None and group_id not in chosen:
+                    candidates.setdefault(group_id, []).append(quest)
+            for group_id, quests in candidates.items():
+                choice = min(quests, key=self.groups[group_id].index)
+                chosen[group_id] = choice
+                for quest in self.groups[group_id]:
+                    if quest != choice:
+                        blocked |= 1 << quest
+
+            wave = sorted(quest for quest in frontier if not blocked >> quest & 1)
+            waves.append(wave)
+            frontier = []
+            for quest in wave:
+                completed |= 1 << quest
+                for dependent in self.unlocked_by[quest]:
+                    pending[dependent] -= 1
+                    if (not pending[dependent] and not completed >> dependent & 1
+                            and not self.never[dependent] and not blocked >> dependent & 1):
+                        frontier.append(dependent)
+
+        blocked_list = list(iter_bits(blocked & ~completed))
+        unreachable = [quest for quest in range(size)
+                       if not completed >> quest & 1 and not blocked >> quest & 1]
+        return {'waves': waves, 'completed': completed, 'blocked': blocked_list, 'unreachable': unreachable}
+
+    def unlocks_after(self, quest, completed=0, transitive=False):
+        """Quests que ficam disponíveis ao completar quest.
+
+        Sem transitive, só os desbloqueios imediatos (percorre apenas os
+        dependentes de quest). Com transitive, todos os descendentes de quest
+        que a progressão a partir daí consegue alcançar.
+        """
+        after = completed | 1 << quest
+        if not transitive:
+            blocked = self.blocked_exclusive(after)
+            return sorted(dependent for dependent in set(self.unlocked_by[quest])
+                          if self.is_available(dependent, after, blocked))
+        reachable = self.unlock_waves(after)['completed'] & ~after
+        descendants = set()
+        stack = [quest]
+        while stack:
+            for dependent in self.unlocked_by[stack.pop()]:
+                if dependent not in descendants and reachable >> dependent & 1:
+                    descendants.add(dependent)
+                    stack.append(dependent)
+        return sorted(descendants)
+
+    def _closure(self, targets, completed):
+        """targets e todos os seus pré-requisitos não completos (DFS iterativa)"""
+        needed = set(targets)
+        stack = list(targets)
+        while stack:
+            quest = stack.pop()
+            for requirement in self.requirements[quest]:
+                if requirement not in needed and not completed >> requirement & 1:
+                    needed.add(requirement)
+                    stack.append(requirement)
+        return needed
+
+    def kappa_plan(self, completed=0, choices=None):
+        """Menor conjunto de quests a completar para cumprir todas as kappaRequired.
+
+        Como todo pré-requisito é obrigatório, o mínimo é o fecho dos
+        pré-requisitos das quests Kappa ainda não completas. Quando várias
+        quests de um grupo exclusivo são Kappa, basta uma delas: vale a já
+        completada, a de choices ou, sem escolha, a de menor fecho. Retorna um
+        dict com:
+            quests       índices em ordem topológica (ondas, menor índice primeiro)
+            count        len(quests)
+            conflicts    [(grupo, [índices])]: o fecho exige quests excludentes
+            unreachable  índices do fecho que nunca ficam disponíveis
+        """
+        graph = self.graph
+        choices = {group_id: graph.index[quest_id] for group_id, quest_id in (choices or {}).items()
+                   if group_id in self.groups and quest_id in graph.index}
+        targets = {quest for quest in range(len(graph))
+                   if graph.kappa[quest] and not completed >> quest & 1}
+        chosen = self.chosen_groups(completed)
+
+        # Uma quest Kappa por grupo exclusivo
+        for group_id, members in self.groups.items():
+            options = [quest for quest in members if quest in targets]
+            if not options:
+                continue
+            targets.difference_update(options)
+            if group_id in chosen:
+                continue
+            if group_id in choices:
+                targets.add(choices[group_id])
+            else:
+                targets.add(min(options, key=lambda quest: len(self._closure(targets | {quest}, completed))))
+
+        needed = self._closure(targets, completed)
+
+        # Grupos exclusivos: no máximo uma quest por grupo entre completas e fecho
+        conflicts = []
+        blocked = set()
+        for group_id, members in self.groups.items():
+            involved = [quest for quest in members if quest in needed or completed >> quest & 1]
+            choice = choices.get(group_id)
+            if len(involved) > 1 or (choice is not None and involved and involved != [choice]):
+                conflicts.append((group_id, involved))
+                blocked.update(quest for quest in involved if quest in needed)
+
+        # Kahn restrito ao fecho para obter a ordem
+        pending = self._pending_counts(completed, needed)
+        frontier = sorted(quest for quest in needed
+                          if not pending[quest] and not self.never[quest] and quest not in blocked)
+        order = []
+        while frontier:
+            order.extend(frontier)
+            released = []
+            for quest in frontier:
+                for dependent in self.unlocked_by[quest]:
+                    if dependent in needed:
+                        pending[dependent] -= 1
+                        if not pending[dependent] and not self.never[dependent] and dependent not in blocked:
+                            released.append(dependent)
+            frontier = sorted(released)
+
+        placed = set(order)
+        unreachable = sorted(quest for quest in needed if quest not in placed)
+        return {'quests': order, 'count': len(order), 'conflicts': conflicts, 'unreachable': unreachable}
+
+
+def parse_completed(graph, value):
+    """Bitset a partir de 'id1,id2,...' (avisa sobre IDs desconhecidos)"""
+    quest_ids = [quest_id.strip() for quest_id in (value or '').split(',') if quest_id.strip()]
+    for quest_id in quest_ids:
+        if quest_id not in graph.index:
+            print(f"[AVISO] Quest desconhecida ignorada: {quest_id}")
+    return to_bitset(graph, quest_ids)
+
+
+def describe(graph, quest):
+    return f"{graph.names[quest]} ({graph.npc_name(quest)}, ID: {graph.ids[quest]})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação de progresso das quests")
+    parser.add_argument('mode', choices=['waves', 'unlocks', 'kappa'])
+    parser.add_argument('quest_id', nargs='?', help="Quest completada (modo unlocks)")
+    parser.add_argument('--completed', default='', help="Quests já completas, separadas por vírgula")
+    parser.add_argument('--choice', action='append', default=[],
+                        help="Escolha de grupo exclusivo: grupo=quest_id (pode repetir)")
+    parser.add_argument('--all', action='store_true', help="unlocks: inclui desbloqueios indiretos")
+    args = parser.parse_args()
+
+    graph = load_graph()
+    simulator = QuestSimulator(graph)
+    completed = parse_completed(graph, args.completed)
+    choices = dict(choice.split('=', 1) for choice in args.choice if '=' in choice)
+
+    if args.mode == 'waves':
+        result = simulator.unlock_waves(completed, choices)
+        for number, wave in enumerate(result['waves'], 1):
+            print(f"\nOnda {number} ({len(wave)} quests):")
+            for quest in wave:
+                print(f"  - {describe(graph, quest)}")
+        print(f"\nCompletas ao final: {bin(result['completed']).count('1')} de {len(graph)}")
+        print(f"Bloqueadas por exclusão mútua: {len(result['blocked'])}")
+        for quest in result['blocked']:
+            print(f"  - {describe(graph, quest)}")
+        print(f"Nunca disponíveis: {len(result['unreachable'])}")
+        for quest in result['unreachable']:
+            print(f"  - {describe(graph, quest)}")
+
+    elif args.mode == 'unlocks':
+        quest = graph.get(args.quest_id or '')
+        if quest is None:
+            print(f"ERRO: Quest não encontrada: {args.quest_id}")
+            return 1
+        unlocked = simulator.unlocks_after(quest, completed, transitive=args.all)
+        print(f"Completar {describe(graph, quest)} libera {len(unlocked)} quests:")
+        for dependent in unlocked:
+            print(f"  - {describe(graph, dependent)}")
+
+    else:
+        plan = simulator.kappa_plan(completed, choices)
+        print(f"Mínimo de quests para o Kappa: {plan['count']}")
+        for group_id, quests in plan['conflicts']:
+            print(f"[AVISO] Grupo exclusivo {group_id} exige: {', '.join(graph.ids[q] for q in quests)}")
+        if plan['unreachable']:
+            print(f"[AVISO] {len(plan['unreachable'])} quests do caminho nunca ficam disponíveis:")
+            for quest in plan['unreachable']:
+                print(f"  - {describe(graph, quest)}")
+        for position, quest in enumerate(plan['quests'], 1):
+            print(f"  {position:3}. {describe(graph, quest)}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
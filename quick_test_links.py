@@ -1,20 +1,12 @@
 import json
-import requests
 import urllib.parse
+from link_health import LinkHealth
+
+checker = LinkHealth()
 
 def test_link(url):
     """Testa se um link funciona"""
-    try:
-        response = requests.get(url, timeout=5, allow_redirects=True)
-        if response.status_code == 200:
-            content = response.text.lower()
-            # Verificar se é uma página válida (não erro 404 ou busca)
-            if "page not found" not in content and "search results" not in content:
-                if "escape from tarkov" in content or "quest" in content:
-                    return True
-        return False
-    except:
-        return False
+    return checker.is_ok(url)
 
 # Carregar JSON
 with open('quests-data.json', 'r', encoding='utf-8') as f:
@@ -56,11 +48,9 @@ for npc_name, quest_name in test_quests:
                     urllib.parse.quote(url.split('/')[-1], safe=''),
                 ]
                 print("  Tentando variacoes...")
-                for var in variations:
-                    test_url = "https://escapefromtarkov.fandom.com/wiki/" + var
-                    if test_link(test_url):
-                        print(f"  ENCONTRADO: {test_url}")
-                        break
+                found = checker.first_ok(["https://escapefromtarkov.fandom.com/wiki/" + var for var in variations])
+                if found:
+                    print(f"  ENCONTRADO: {found}")
             print()
 
 print("\nTeste concluido!")
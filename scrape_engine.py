@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Motor de scraping concorrente com limite de taxa por host.
+
+Substitui o laço serial com time.sleep() dos scripts offline: as URLs são
+processadas por um pool de threads de tamanho fixo, e cada tentativa consome
+um token do balde (token bucket) do host correspondente. Assim o tempo total
+passa a ser limitado pela taxa permitida para a wiki, e não pela latência de
+cada página somada em série.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 2.0      # requisições por segundo, por host
+DEFAULT_BURST = 4       # requisições que podem sair de uma vez
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 1.0   # segundos (dobra a cada nova tentativa)
+
+
+class TokenBucket:
+    """Balde de tokens: permite `rate` requisições/s com rajadas de até `burst`"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloqueia até haver um token disponível"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """Um TokenBucket por host"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+def is_error_result(result):
+    """Resultados no formato de scrape_quest_info sinalizam erro com a chave 'error'"""
+    return isinstance(result, dict) and bool(result.get('error'))
+
+
+def run_concurrent(urls, worker, concurrency=DEFAULT_CONCURRENCY, limiter=None,
+                   retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                   is_error=is_error_result, on_result=None):
+    """Executa worker(url) para cada URL com concorrência e taxa limitadas.
+
+    Cada tentativa espera um token do host; falhas (exceção ou is_error)
+    são repetidas até `retries` vezes com backoff exponencial e jitter.
+    on_result(url, result, attempts, index, total) é chamado na thread
+    principal, na ordem em que as URLs terminam. Retorna {url: result};
+    exceções que esgotaram as tentativas viram {'error': str(e)}.
+    """
+    urls = list(urls)
+    total = len(urls)
+    limiter = limiter or HostRateLimiter()
+    results = {}
+
+    def attempt(url):
+        attempts = 0
+        while True:
+            attempts += 1
+            limiter.acquire(url)
+            try:
+                result = worker(url)
+            except Exception as e:
+                result = {'error': str(e)}
+            if not is_error(result) or attempts > retries:
+                return result, attempts
+            time.sleep(backoff * (2 ** (attempts - 1)) * (0.5 + random.random()))
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        futures = {executor.submit(attempt, url): url for url in urls}
+        for index, future in enumerate(as_completed(futures), 1):
+            url = futures[future]
+            result, attempts = future.result()
+            results[url] = result
+            if on_result:
+                on_result(url, result, attempts, index, total)
+
+    return results
+
+
+class Progress:
+    """Relatório simples de progresso (taxa e tempo restante estimado)"""
+
+    def __init__(self, total):
+        self.total = total
+        self.started = time.monotonic()
+
+    def line(self, done):
+        elapsed = time.monotonic() - self.started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = (self.total - done) / rate if rate > 0 else 0.0
+        return f"{done}/{self.total} em {elapsed:.1f}s ({rate:.2f} páginas/s, ~{remaining:.0f}s restantes)"
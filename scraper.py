@@ -1,11 +1,22 @@
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, jsonify, send_file, request, abort
+from werkzeug.security import safe_join
 from flask_cors import CORS
 import requests
-from bs4 import BeautifulSoup
+import http_pool
+from quest_scrape import extract_revision_id, scrape_quest_info, scrape_quest_info_conditional
+from quest_cache import quest_cache, normalize_wiki_url
+from quest_details_index import QuestDetailsIndex, to_response
+from single_flight import SingleFlight
+from image_cache import ImageCache, ImageRejected, allowed_url
+from quest_availability import AvailabilityService
+from build_assets import AssetManifest
+from quest_shards import DetailShards
+from static_files import FileETags, cache_control_for, IMMUTABLE
 import re
 import sys
 import io
 import json
+import mimetypes
 import os
 from datetime import datetime, timedelta
 
@@ -24,150 +35,59 @@ CORS(app, resources={
     }
 })
 
-def scrape_quest_info(wiki_url):
-    """Faz scraping das informações da quest na wiki"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(wiki_url, timeout=10, headers=headers)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Estrutura para armazenar as informações
-        quest_info = {
-            'name': '',
-            'npc': '',
-            'objectives': [],
-            'guide_images': []
-        }
-        
-        # Encontrar o título da quest
-        title_elem = soup.find('h1', class_='page-header__title')
-        if not title_elem:
-            title_elem = soup.find('h1', {'id': 'firstHeading'})
-        if title_elem:
-            quest_info['name'] = title_elem.get_text(' ', strip=True)
-        
-        # Procurar por infobox (geralmente contém NPC e outras informações)
-        infobox = soup.find('aside', class_='portable-infobox') or soup.find('table', class_='infobox')
-        if infobox:
-            # Procurar NPC/Trader usando data-source
-            npc_data = infobox.find('div', {'data-source': 'trader'})
-            if npc_data:
-                npc_value = npc_data.find('div', class_='pi-data-value') or npc_data.find('a')
-                if npc_value:
-                    quest_info['npc'] = npc_value.get_text(' ', strip=True)
-            else:
-                # Fallback: procurar por texto
-                npc_labels = infobox.find_all(['th', 'td'], string=re.compile(r'[Tt]rader|[Nn]pc|[Gg]iver', re.I))
-                for label in npc_labels:
-                    if label.name == 'th':
-                        npc_value = label.find_next_sibling('td')
-                    else:
-                        npc_value = label.find_next('td')
-                    if npc_value:
-                        quest_info['npc'] = npc_value.get_text(' ', strip=True)
-                        break
-        
-        # Procurar por seções usando headings
-        main_content = soup.find('div', class_='mw-parser-output')
-        if not main_content:
-            main_content = soup.find('div', {'id': 'mw-content-text'})
-        
-        if main_content:
-            # Descrição removida - não precisamos mais
-            
-            # Objetivos - procurar por span com id="Objectives"
-            objectives_span = main_content.find('span', {'id': 'Objectives'})
-            if objectives_span:
-                # Encontrar o heading pai
-                heading = objectives_span.find_parent(['h2', 'h3'])
-                if heading:
-                    # Procurar lista após o heading
-                    next_elem = heading.find_next_sibling()
-                    while next_elem:
-                        if next_elem.name == 'ul':
-                            for li in next_elem.find_all('li', recursive=False):
-                                obj_text = li.get_text(' ', strip=True)
-                                if obj_text and obj_text not in quest_info['objectives']:
-                                    quest_info['objectives'].append(obj_text)
-                            break
-                        elif next_elem.name in ['h2', 'h3']:
-                            break
-                        next_elem = next_elem.find_next_sibling()
-            
-            # Guide - procurar por span com id="Guide" e pegar imagens
-            guide_span = main_content.find('span', {'id': 'Guide'})
-            if guide_span:
-                heading = guide_span.find_parent(['h2', 'h3'])
-                if heading:
-                    # Procurar todas as imagens após o heading Guide até o próximo heading
-                    next_elem = heading.find_next_sibling()
-                    while next_elem:
-                        if next_elem.name in ['h2', 'h3']:
-                            break
-                        
-                        # Procurar imagens neste elemento e seus filhos
-                        images = next_elem.find_all('img')
-                        for img in images:
-                            # Priorizar data-src para lazy loading, depois src
-                            img_src = img.get('data-src') or img.get('src')
-                            
-                            if not img_src:
-                                continue
-                            
-                            # Ignorar placeholders de lazy load (data:image/gif)
-                            if img_src.startswith('data:image'):
-                                # Tentar pegar o data-src real
-                                img_src = img.get('data-src') or img.get('data-lazy-src')
-                                if not img_src or img_src.startswith('data:image'):
-                                    continue
-                            
-                            # Filtrar ícones pequenos e avatares
-                            img_class = img.get('class', [])
-                            if any('icon' in str(c).lower() or 'avatar' in str(c).lower() for c in img_class):
-                                continue
-                            
-                            # Converter para URL completa se necessário
-                            if img_src.startswith('//'):
-                                img_src = 'https:' + img_src
-                            elif img_src.startswith('/'):
-                                img_src = 'https://escapefromtarkov.fandom.com' + img_src
-                            
-                            # Filtrar imagens muito pequenas (provavelmente ícones)
-                            img_width = img.get('width')
-                            if img_width:
-                                try:
-                                    width_val = int(str(img_width))
-                                    if width_val < 100:  # Filtrar imagens menores que 100px
-                                        continue
-                                except:
-                                    pass
-                            
-                            # Adicionar se for uma URL válida e não for placeholder
-                            if img_src.startswith('http') and img_src not in quest_info['guide_images']:
-                                # Remover parâmetros de scale para obter imagem em tamanho completo
-                                # Exemplo: .../image.png/revision/latest/scale-to-width-down/450?cb=... 
-                                # Vira: .../image.png/revision/latest
-                                if '/scale-to-width-down/' in img_src:
-                                    # Pegar a parte antes de /scale-to-width-down/
-                                    img_src = img_src.split('/scale-to-width-down/')[0]
-                                    # Se tiver ?cb= no final, manter apenas até /latest
-                                    if '/revision/latest' in img_src:
-                                        img_src = img_src.split('?')[0]  # Remove query params
-                                
-                                quest_info['guide_images'].append(img_src)
-                        
-                        next_elem = next_elem.find_next_sibling()
-            
-        
-        return quest_info
-        
-    except Exception as e:
-        import traceback
-        return {'error': str(e), 'traceback': traceback.format_exc()}
+# Detalhes pré-processados (quests-details.json), carregados uma vez por processo
+details_index = QuestDetailsIndex()
+
+# Buscas simultâneas da mesma quest/imagem compartilham um único download
+quest_flight = SingleFlight('quest')
+image_flight = SingleFlight('image')
+
+# Cache em disco das imagens servidas pelo /api/image-proxy
+image_cache = ImageCache()
+
+# Disponibilidade calculada no servidor (/api/availability)
+availability_service = AvailabilityService()
+
+# Arquivos com hash e pré-comprimidos gerados pelo build_assets.py (dist/)
+static_assets = AssetManifest()
+
+# Shards por NPC do quests-details.json gerados pelo quest_shards.py
+detail_shards = DetailShards()
+
+# ETags (sha256 do conteúdo) dos arquivos servidos sem hash no nome
+file_etags = FileETags()
+
+def cache_quest_response(cache_key, quest_info):
+    """Serializa a resposta da quest e guarda no cache se não for erro"""
+    response = jsonify(quest_info)
+    if not quest_info.get('error'):
+        quest_cache.set(cache_key, response.get_data())
+    return response
+
+def fetch_quest_upstream(cache_key, corrected_url):
+    """Faz o scraping e grava no índice (scrape_quest_info devolve os erros no dict)"""
+    quest_info = scrape_quest_info(corrected_url)
+    if not quest_info.get('error'):
+        details_index.update(cache_key, quest_info)
+    return quest_info
+
+def encode_quest_result(quest_info):
+    """Serializa o resultado para outros workers (erros não são compartilhados)"""
+    if quest_info.get('error'):
+        return None
+    return json.dumps(quest_info, ensure_ascii=False).encode('utf-8')
+
+def respond_scraped_quest(cache_key, quest_info):
+    """Responde com o scraping novo; se ele falhou, usa a entrada antiga do
+    quests-details.json quando existir"""
+    if not quest_info.get('error'):
+        return cache_quest_response(cache_key, quest_info)
+    
+    indexed, _ = details_index.lookup(cache_key)
+    if indexed and indexed.get('name') and not indexed.get('error'):
+        print(f"[QUEST API] Scraping falhou, usando dados pré-processados: {quest_info.get('error')}")
+        return jsonify(to_response(indexed))
+    return jsonify(quest_info)
 
 @app.route('/api/quest/<path:wiki_url>')
 def get_quest_info(wiki_url):
@@ -207,6 +127,17 @@ def get_quest_info(wiki_url):
     # Isso mantém "the" e outros componentes da URL intactos
     corrected_url = urlunparse((parsed.scheme, parsed.netloc, path_decoded, parsed.params, parsed.query, parsed.fragment))
     
+    # Resposta já serializada em cache (evita novo download e parse da página)
+    cache_key = normalize_wiki_url(corrected_url)
+    cached = quest_cache.get(cache_key)
+    if cached is not None:
+        return app.response_class(cached, mimetype='application/json')
+    
+    # Responder a partir do quests-details.json quando a entrada está atualizada
+    indexed, is_fresh = details_index.lookup(cache_key)
+    if is_fresh:
+        return cache_quest_response(cache_key, to_response(indexed))
+    
     # Log para debug
     print(f"[QUEST API] URL recebida do Flask: {wiki_url}")
     print(f"[QUEST API] URL após unquote: {full_url}")
@@ -219,33 +150,131 @@ def get_quest_info(wiki_url):
     else:
         print(f"[QUEST API] ✗ 'the' NÃO está presente na URL - PROBLEMA!")
     
-    # Tentar fazer a requisição com a URL corrigida
+    # Fazer a requisição com a URL corrigida (uma só para requisições simultâneas)
     try:
-        quest_info = scrape_quest_info(corrected_url)
-        return jsonify(quest_info)
-    except Exception as e:
-        # Se ainda falhar, tentar com a URL original
-        try:
-            quest_info = scrape_quest_info(full_url)
-            return jsonify(quest_info)
-        except Exception as e2:
-            # Se ainda falhar, retornar erro
-            return jsonify({'error': f'Erro ao buscar quest: {str(e2)}. URL tentada: {corrected_url}'}), 500
+        quest_info = quest_flight.do(
+            cache_key,
+            lambda: fetch_quest_upstream(cache_key, corrected_url),
+            encode=encode_quest_result,
+            decode=json.loads
+        )
+        return respond_scraped_quest(cache_key, quest_info)
+    except Exception as e2:
+        # Se ainda falhar, retornar erro
+        return jsonify({'error': f'Erro ao buscar quest: {str(e2)}. URL tentada: {corrected_url}'}), 500
+
+@app.route('/api/quest-details/<path:wiki_url>')
+def get_quest_details(wiki_url):
+    """Detalhes pré-processados de uma única quest (sem scraping)"""
+    from urllib.parse import unquote
+    
+    cache_key = normalize_wiki_url(unquote(wiki_url))
+    indexed, _ = details_index.lookup(cache_key)
+    if indexed is None:
+        return jsonify({'error': 'Quest não encontrada no quests-details.json'}), 404
+    response = jsonify(to_response(indexed))
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/quests-details/<name>')
+def serve_detail_shard(name):
+    """Shard de detalhes de um NPC, com o sha256 do conteúdo como ETag"""
+    if name == 'index.json':
+        return send_static(name, detail_shards.dir)
+    entry = detail_shards.shard(name)
+    if entry is None:
+        return jsonify({'error': 'Shard não encontrado'}), 404
+    response = send_file(detail_shards.file_path(entry), mimetype='application/json',
+                         etag=entry['sha256'], conditional=True)
+    # ?v=<hash> (como o app.js pede) só vale para este conteúdo: pode ficar em cache
+    if request.args.get('v') and entry['sha256'].startswith(request.args['v']):
+        response.headers['Cache-Control'] = IMMUTABLE
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def send_static(filename, directory=None):
+    """Arquivo sem hash no nome, com ETag do conteúdo e o Cache-Control da classe
+    do arquivo; If-None-Match igual responde 304 sem ler o arquivo"""
+    path = safe_join(directory or app.root_path, filename)
+    etag = file_etags.get(path) if path else None
+    if etag is None:
+        abort(404)
+    response = send_file(path, etag=etag, conditional=True)
+    response.headers['Cache-Control'] = cache_control_for(filename)
+    return response
+
+def send_built_asset(entry, cache_control):
+    """Envia a variante pré-comprimida aceita pelo cliente (Accept-Encoding)"""
+    path, encoding = static_assets.variant(entry, request.accept_encodings)
+    mimetype = mimetypes.guess_type(entry['name'])[0] or 'application/octet-stream'
+    response = send_file(path, mimetype=mimetype, etag=entry['sha256'] + (f'-{encoding}' if encoding else ''),
+                         conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def send_page(name):
+    """Página do build (com os nomes com hash) ou a original"""
+    entry = static_assets.page(name)
+    if entry is not None:
+        return send_built_asset(entry, 'no-cache')
+    return send_static(name)
 
 @app.route('/quest-details.html')
 def quest_details_page():
     """Servir a página de detalhes da quest"""
-    return send_from_directory('.', 'quest-details.html')
+    return send_page('quest-details.html')
 
 @app.route('/')
 def index():
     """Servir a página principal"""
-    return send_from_directory('.', 'index.html')
+    return send_page('index.html')
 
 @app.route('/<path:filename>')
 def serve_static(filename):
     """Servir arquivos estáticos (CSS, JS, imagens, etc)"""
-    return send_from_directory('.', filename)
+    entry = static_assets.asset(filename)
+    if entry is not None:
+        # Nome com hash do conteúdo: nunca muda, pode ficar em cache para sempre
+        return send_built_asset(entry, IMMUTABLE)
+    if filename == 'index.html':
+        return send_page(filename)
+    return send_static(filename)
+
+def load_cached_image(img_url):
+    """Retorna a imagem do cache em disco, baixando-a da wiki se necessário.
+
+    O download roda dentro do single-flight: requisições simultâneas (inclusive
+    de outros workers, que compartilham o diretório do cache) esperam o mesmo
+    download e depois leem o blob do disco.
+    """
+    meta = image_cache.lookup(img_url)
+    if meta is None:
+        # A falha já foi contada acima; a segunda consulta só vê se outro
+        # worker baixou a imagem enquanto esperávamos
+        meta = image_flight.do(
+            img_url,
+            lambda: image_cache.lookup(img_url, count=False) or image_cache.fetch(img_url)
+        )
+    return meta
+
+def send_image(meta):
+    """Envia o blob em blocos, com ETag (hash do conteúdo), If-None-Match e Range"""
+    response = send_file(
+        meta['path'],
+        mimetype=meta.get('content_type', 'image/png'),
+        etag=meta['sha256'],
+        conditional=True,
+        max_age=86400
+    )
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Methods'] = 'GET'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    return response
 
 @app.route('/api/image-proxy')
 def image_proxy():
@@ -269,7 +298,7 @@ def image_proxy():
             # Tentar buscar na página do NPC
             npc_url = f'https://escapefromtarkov.fandom.com/wiki/{npc_name.capitalize()}'
             try:
-                npc_page = requests.get(npc_url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+                npc_page = http_pool.get(npc_url, headers={'User-Agent': 'Mozilla/5.0'})
                 if npc_page.status_code == 200:
                     from bs4 import BeautifulSoup
                     soup = BeautifulSoup(npc_page.content, 'html.parser')
@@ -281,29 +310,19 @@ def image_proxy():
             except:
                 pass
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://escapefromtarkov.fandom.com/',
-            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9'
-        }
-        
-        response = requests.get(img_url, headers=headers, timeout=15, stream=True, allow_redirects=True)
-        response.raise_for_status()
-        
-        print(f"[IMAGE PROXY] Sucesso! Status: {response.status_code}, Tipo: {response.headers.get('Content-Type')}")
-        
-        from flask import Response
-        return Response(
-            response.content,
-            mimetype=response.headers.get('Content-Type', 'image/png'),
-            headers={
-                'Cache-Control': 'public, max-age=86400',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            }
-        )
+        if not allowed_url(img_url):
+            return jsonify({'error': 'Host da imagem não permitido'}), 400
+
+        meta = load_cached_image(img_url)
+        try:
+            response = send_image(meta)
+        except FileNotFoundError:
+            # Blob removido pela limpeza do cache entre a consulta e o envio
+            response = send_image(image_flight.do(img_url, lambda: image_cache.fetch(img_url)))
+        return response
+    except ImageRejected as e:
+        print(f"[IMAGE PROXY] Imagem recusada: {str(e)}")
+        return jsonify({'error': f'Imagem recusada: {str(e)}'}), 502
     except requests.exceptions.RequestException as e:
         print(f"[IMAGE PROXY] Erro na requisição: {str(e)}")
         return jsonify({'error': f'Erro ao buscar imagem: {str(e)}'}), 500
@@ -316,11 +335,7 @@ def get_npc_portrait(npc_name):
     """Buscar portrait do NPC na wiki"""
     try:
         npc_url = f'https://escapefromtarkov.fandom.com/wiki/{npc_name}'
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        page = requests.get(npc_url, headers=headers, timeout=10)
+        page = http_pool.get(npc_url)
         if page.status_code == 200:
             from bs4 import BeautifulSoup
             soup = BeautifulSoup(page.content, 'html.parser')
@@ -357,6 +372,82 @@ def get_npc_portrait(npc_name):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/availability', methods=['GET', 'POST'])
+def get_availability():
+    """Disponibilidade das quests por NPC para o progresso enviado
+
+    POST: tarkovQuestProgress, {"progress": {...}} ou {"compact": "p1..."}
+    GET:  ?progress=p1... (forma compacta)
+    """
+    if request.method == 'POST':
+        payload = request.get_json(silent=True)
+        if payload is None:
+            payload = request.get_data(as_text=True)
+    else:
+        payload = request.args.get('progress', '')
+    
+    try:
+        body, unknown = availability_service.availability(payload)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except FileNotFoundError:
+        return jsonify({'error': 'quests-database.json não encontrado'}), 500
+    
+    if unknown:
+        # IDs que não existem no banco não entram na resposta em cache
+        result = json.loads(body)
+        result['unknown'] = unknown
+        return jsonify(result)
+    return app.response_class(body, mimetype='application/json')
+
+@app.route('/api/kappa-plan', methods=['GET', 'POST'])
+def get_kappa_plan():
+    """Caminho mínimo até o Kappa (caminho crítico, gargalos e ordem sugerida)
+
+    Aceita os mesmos formatos de /api/availability; no POST, "choices" fixa
+    as escolhas dos grupos exclusivos. ?top=N limita os gargalos por trader.
+    """
+    if request.method == 'POST':
+        payload = request.get_json(silent=True)
+        if payload is None:
+            payload = request.get_data(as_text=True)
+    else:
+        payload = request.args.get('progress', '')
+    
+    try:
+        top = min(max(int(request.args.get('top', 3)), 0), 20)
+    except ValueError:
+        return jsonify({'error': 'top deve ser um inteiro'}), 400
+    
+    try:
+        plan, unknown = availability_service.kappa_plan(payload, top)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except FileNotFoundError:
+        return jsonify({'error': 'quests-database.json não encontrado'}), 500
+    
+    if unknown:
+        plan = dict(plan, unknown=unknown)
+    return jsonify(plan)
+
+@app.route('/api/stats')
+def get_stats():
+    """Estatísticas internas do servidor (pool HTTP, caches e coalescência)"""
+    return jsonify({
+        'http_pool': http_pool.pool_stats(),
+        'quest_cache': quest_cache.stats(),
+        'details_index': details_index.stats(),
+        'image_cache': image_cache.stats(),
+        'static_assets': static_assets.stats(),
+        'detail_shards': detail_shards.stats(),
+        'file_etags': file_etags.stats(),
+        'availability': availability_service.stats(),
+        'single_flight': {
+            'quest': quest_flight.stats(),
+            'image': image_flight.stats()
+        }
+    })
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
 
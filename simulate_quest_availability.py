@@ -7,104 +7,82 @@ Isso ajuda a identificar quests que deveriam estar disponíveis mas não estão
 import json
 from collections import defaultdict
 
+from quest_graph import load_graph
+from quest_progress import ProgressModel
+from quest_simulation import to_bitset
+
 def load_database():
-    """Carrega o banco de dados de quests"""
+    """Carrega o grafo compilado do banco de dados de quests"""
     try:
-        with open('quests-database.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_graph()
     except FileNotFoundError:
         print("ERRO: Arquivo quests-database.json nao encontrado!")
         return None
 
-def build_quest_index(data):
-    """Cria um índice de todas as quests por ID"""
-    quest_by_id = {}  # {quest_id: (npc_id, quest)}
-    
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            if quest_id:
-                quest_by_id[quest_id] = (npc_id, quest)
-    
-    return quest_by_id
-
-def are_all_prerequisites_met(quest, npc_id, completed_quests, quest_by_id):
+def are_all_prerequisites_met(graph, quest, completed_quests):
     """Verifica se todos os pré-requisitos de uma quest foram completados"""
-    prerequisites = quest.get('prerequisites', [])
-    prerequisites_external = quest.get('prerequisitesExternal', [])
-    all_prereqs = prerequisites + prerequisites_external
-    
-    if not all_prereqs:
-        return True
-    
-    # Verificar cada pré-requisito
-    for prereq_id in all_prereqs:
-        if prereq_id not in quest_by_id:
+    for target, _ in graph.prerequisite_entries(quest):
+        if target < 0:
             # Pré-requisito não existe - quest bloqueada
             return False
         
-        if prereq_id not in completed_quests:
+        if graph.ids[target] not in completed_quests:
             # Pré-requisito não foi completado
             return False
     
     return True
 
-def simulate_quest_availability(data, quest_by_id, initial_completed=None):
+def simulate_quest_availability(graph, initial_completed=None):
     """Simula quais quests estão disponíveis baseado nos pré-requisitos"""
     if initial_completed is None:
         initial_completed = set()
     
     completed_quests = set(initial_completed)
+    # Pré-requisitos de todas as quests verificados de uma vez sobre o bitset
+    prerequisites_met = ProgressModel(graph).availability(to_bitset(graph, completed_quests))['prerequisites_met']
     available_quests = defaultdict(list)  # {npc_id: [quest_ids]}
     locked_quests = defaultdict(list)  # {npc_id: [quest_ids]}
     
     # Primeira passagem: encontrar quests sem pré-requisitos
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            prerequisites = quest.get('prerequisites', [])
-            prerequisites_external = quest.get('prerequisitesExternal', [])
-            
-            if not prerequisites and not prerequisites_external:
-                # Quest sem pré-requisitos - sempre disponível
-                if quest_id not in completed_quests:
-                    available_quests[npc_id].append({
-                        'id': quest_id,
-                        'name': quest.get('name', 'Unknown'),
-                        'reason': 'Sem pre-requisitos'
-                    })
-            else:
-                # Verificar se todos os pré-requisitos foram completados
-                if are_all_prerequisites_met(quest, npc_id, completed_quests, quest_by_id):
-                    if quest_id not in completed_quests:
-                        available_quests[npc_id].append({
-                            'id': quest_id,
-                            'name': quest.get('name', 'Unknown'),
-                            'reason': 'Pre-requisitos completos'
-                        })
-                else:
-                    # Encontrar quais pré-requisitos estão faltando
-                    missing = []
-                    all_prereqs = prerequisites + prerequisites_external
-                    for prereq_id in all_prereqs:
-                        if prereq_id not in completed_quests:
-                            prereq_npc, prereq_quest = quest_by_id.get(prereq_id, (None, None))
-                            if prereq_quest:
-                                missing.append({
-                                    'id': prereq_id,
-                                    'name': prereq_quest.get('name', 'Unknown'),
-                                    'npc': prereq_npc
-                                })
-                    
-                    locked_quests[npc_id].append({
-                        'id': quest_id,
-                        'name': quest.get('name', 'Unknown'),
-                        'missing_prerequisites': missing
+    for quest in range(len(graph)):
+        npc_id = graph.npc_id(quest)
+        quest_id = graph.ids[quest]
+        
+        if not graph.has_prerequisites(quest):
+            # Quest sem pré-requisitos - sempre disponível
+            if quest_id not in completed_quests:
+                available_quests[npc_id].append({
+                    'id': quest_id,
+                    'name': graph.names[quest],
+                    'reason': 'Sem pre-requisitos'
+                })
+        elif prerequisites_met >> quest & 1:
+            if quest_id not in completed_quests:
+                available_quests[npc_id].append({
+                    'id': quest_id,
+                    'name': graph.names[quest],
+                    'reason': 'Pre-requisitos completos'
+                })
+        else:
+            # Encontrar quais pré-requisitos estão faltando
+            missing = []
+            for prereq in graph.prerequisites(quest):
+                if graph.ids[prereq] not in completed_quests:
+                    missing.append({
+                        'id': graph.ids[prereq],
+                        'name': graph.names[prereq],
+                        'npc': graph.npc_id(prereq)
                     })
+            
+            locked_quests[npc_id].append({
+                'id': quest_id,
+                'name': graph.names[quest],
+                'missing_prerequisites': missing
+            })
     
     return available_quests, locked_quests
 
-def print_simulation_report(available_quests, locked_quests, data):
+def print_simulation_report(available_quests, locked_quests, graph):
     """Imprime relatório da simulação"""
     print("\n" + "=" * 80)
     print("SIMULACAO DE DISPONIBILIDADE DE QUESTS")
@@ -122,7 +100,7 @@ def print_simulation_report(available_quests, locked_quests, data):
     print("-" * 80)
     
     for npc_id in sorted(available_quests.keys()):
-        npc_name = data['npcs'][npc_id]['name']
+        npc_name = graph.npc_names[graph.npc_index[npc_id]]
         quests = available_quests[npc_id]
         
         if quests:
@@ -140,7 +118,7 @@ def print_simulation_report(available_quests, locked_quests, data):
         print("-" * 80)
         
         for npc_id in sorted(locked_quests.keys()):
-            npc_name = data['npcs'][npc_id]['name']
+            npc_name = graph.npc_names[graph.npc_index[npc_id]]
             quests = locked_quests[npc_id]
             
             if quests:
@@ -158,20 +136,17 @@ def print_simulation_report(available_quests, locked_quests, data):
 def main():
     """Função principal"""
     print("Carregando quests-database.json...")
-    data = load_database()
+    graph = load_database()
     
-    if not data:
+    if not graph:
         return 1
     
-    print("Construindo indice de quests...")
-    quest_by_id = build_quest_index(data)
-    
-    print(f"Total de quests: {len(quest_by_id)}")
+    print(f"Total de quests: {len(graph.index)}")
     
     print("\nSimulando disponibilidade de quests (progresso inicial vazio)...")
-    available_quests, locked_quests = simulate_quest_availability(data, quest_by_id)
+    available_quests, locked_quests = simulate_quest_availability(graph)
     
-    print_simulation_report(available_quests, locked_quests, data)
+    print_simulation_report(available_quests, locked_quests, graph)
     
     # Salvar relatório
     report = {
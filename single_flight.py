@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Coalescência de requisições (single-flight) para buscas idênticas na wiki.
+
+Quando várias requisições pedem a mesma chave ao mesmo tempo, apenas a
+primeira (líder) executa a busca; as demais esperam e recebem o mesmo
+resultado. Entre threads do mesmo worker isso é feito com um Event; entre
+workers do gunicorn o líder de cada processo disputa um lock de arquivo
+(fcntl) e grava o resultado num arquivo compartilhado, que os outros workers
+reaproveitam por alguns segundos em vez de repetir a busca.
+
+As chaves vêm de URLs enviadas pelos clientes (/api/image-proxy), então os
+arquivos não podem se acumular: cada chave tem seu lock e seu resultado
+(nomeados pelo sha1 da chave), e os que não foram usados no último TTL são
+apagados periodicamente. Um lock só é apagado por quem o segura, e quem
+consegue um lock confere se o arquivo ainda é o mesmo do caminho (senão abre
+de novo), então dois líderes nunca usam locks diferentes para a mesma chave.
+
+Configuração via variáveis de ambiente:
+    TARKOV_SINGLEFLIGHT_DIR  diretório dos locks/resultados (padrão: temp do sistema)
+    TARKOV_SINGLEFLIGHT_TTL  segundos que um resultado compartilhado vale (padrão 30)
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: só coalescência entre threads
+    fcntl = None
+
+SINGLEFLIGHT_DIR = os.environ.get(
+    'TARKOV_SINGLEFLIGHT_DIR',
+    os.path.join(tempfile.gettempdir(), 'roadtokappa-singleflight')
+)
+SINGLEFLIGHT_TTL = float(os.environ.get('TARKOV_SINGLEFLIGHT_TTL', 30))
+
+
+class _Call:
+    """Busca em andamento para uma chave"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Executa no máximo uma busca simultânea por chave"""
+
+    def __init__(self, name, lock_dir=SINGLEFLIGHT_DIR, share_ttl=SINGLEFLIGHT_TTL):
+        self.name = name
+        self.lock_dir = lock_dir if fcntl is not None else None
+        self.share_ttl = share_ttl
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+        self.shared_hits = 0
+        self._last_sweep = 0.0
+        if self.lock_dir:
+            try:
+                os.makedirs(self.lock_dir, exist_ok=True)
+            except OSError as e:
+                print(f"[SINGLE FLIGHT] Sem diretório de lock ({e}), usando apenas threads")
+                self.lock_dir = None
+
+    def do(self, key, fn, encode=None, decode=None):
+        """Executa fn() uma única vez para todas as chamadas simultâneas de key.
+
+        encode(result) -> bytes|None e decode(bytes) -> result permitem que
+        outros workers reaproveitem o resultado. Sem eles os workers apenas
+        se revezam no lock, e fn() deve consultar o armazenamento
+        compartilhado (ex: cache em disco) antes de buscar na wiki.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.followers += 1
+                is_leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                is_leader = True
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_leader(key, fn, encode, decode)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def _paths(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        base = os.path.join(self.lock_dir, f"{self.name}-{digest}")
+        return f"{base}.lock", f"{base}.result"
+
+    def _acquire(self, lock_path):
+        """Arquivo de lock aberto e travado (None se não puder ser aberto).
+
+        Se outro processo apagou o lock (_sweep) enquanto esperávamos, o
+        arquivo travado não é mais o do caminho: abre o novo e tenta de novo.
+        """
+        while True:
+            try:
+                lock_file = open(lock_path, 'a+b')
+            except OSError:
+                return None
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                current = os.stat(lock_path)
+                if current.st_ino == os.fstat(lock_file.fileno()).st_ino:
+                    # mtime = último uso, para o _sweep
+                    os.utime(lock_path)
+                    return lock_file
+            except OSError:
+                pass
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _sweep(self):
+        """Apaga locks e resultados sem uso no último TTL (no máximo uma vez por TTL)"""
+        now = time.time()
+        if now - self._last_sweep < self.share_ttl:
+            return
+        self._last_sweep = now
+        prefix = f"{self.name}-"
+        try:
+            entries = [entry for entry in os.scandir(self.lock_dir) if entry.name.startswith(prefix)]
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if now - entry.stat().st_mtime <= self.share_ttl:
+                    continue
+                if entry.name.endswith('.result'):
+                    os.remove(entry.path)
+                elif entry.name.endswith('.lock'):
+                    # Só apaga um lock livre, e enquanto o segura
+                    with open(entry.path, 'a+b') as lock_file:
+                        try:
+                            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        except OSError:
+                            continue
+                        os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _read_shared(self, result_path, decode):
+        try:
+            if time.time() - os.path.getmtime(result_path) > self.share_ttl:
+                os.remove(result_path)
+                return None
+            with open(result_path, 'rb') as f:
+                return decode(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_shared(self, result_path, payload):
+        tmp_path = f"{result_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, result_path)
+        except OSError as e:
+            print(f"[SINGLE FLIGHT] Erro ao compartilhar resultado: {e}")
+
+    def _run_leader(self, key, fn, encode, decode):
+        if not self.lock_dir:
+            return fn()
+        share = encode is not None and decode is not None
+
+        lock_path, result_path = self._paths(key)
+        lock_file = self._acquire(lock_path)
+        if lock_file is None:
+            return fn()
+
+        with lock_file:
+            try:
+                if share:
+                    shared = self._read_shared(result_path, decode)
+                    if shared is not None:
+                        self.shared_hits += 1
+                        return shared
+                result = fn()
+                if share:
+                    payload = encode(result)
+                    if payload is not None:
+                        self._write_shared(result_path, payload)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                self._sweep()
+
+    def stats(self):
+        """Estatísticas de coalescência"""
+        return {
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'coalesced': self.followers,
+            'shared_across_workers': self.shared_hits,
+            'cross_process': bool(self.lock_dir)
+        }
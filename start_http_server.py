@@ -1,52 +1,60 @@
 #!/usr/bin/env python3
 """
 Script para iniciar apenas o servidor HTTP estático na porta 8000
+
+O servidor (static_server.py) atende várias conexões ao mesmo tempo, com
+keep-alive, sendfile, variantes pré-comprimidas e cache dos arquivos pequenos.
+
+Uso:
+    python start_http_server.py                          # porta 8000 + navegador
+    python start_http_server.py --port 8080 --no-browser
 """
+import argparse
 import sys
-from http.server import HTTPServer, SimpleHTTPRequestHandler
 import webbrowser
 import time
 
-class CustomHTTPRequestHandler(SimpleHTTPRequestHandler):
-    """Handler customizado para servir arquivos estáticos"""
-    
-    def end_headers(self):
-        # Adicionar headers CORS
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        super().end_headers()
-    
-    def log_message(self, format, *args):
-        """Customizar mensagens de log"""
-        print(f"[HTTP Server] {format % args}")
+from static_server import StaticServer, BASE_DIR
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Servidor HTTP estático do RoadToKappa")
+    parser.add_argument('--host', default='0.0.0.0', help="Endereço (padrão 0.0.0.0)")
+    parser.add_argument('--port', type=int, default=8000, help="Porta (padrão 8000)")
+    parser.add_argument('--directory', default=BASE_DIR, help="Diretório servido (padrão: o do projeto)")
+    parser.add_argument('--no-browser', action='store_true', help="Não abre o navegador")
+    return parser.parse_args()
 
 def main():
     """Função principal"""
+    args = parse_args()
     print("=" * 60)
     print("🌐 Iniciando servidor HTTP estático")
     print("=" * 60)
     print()
-    print("📁 Servindo arquivos estáticos em http://localhost:8000")
+    print(f"📁 Servindo arquivos estáticos em http://localhost:{args.port}")
     print()
     print("Pressione Ctrl+C para parar o servidor")
     print("=" * 60)
     print()
     
+    server = None
     try:
-        server = HTTPServer(('0.0.0.0', 8000), CustomHTTPRequestHandler)
-        print("[HTTP] Servidor rodando em http://localhost:8000")
+        server = StaticServer((args.host, args.port), directory=args.directory)
+        print(f"[HTTP] Servidor rodando em http://localhost:{args.port}")
         
         # Abrir navegador automaticamente
-        time.sleep(1)
-        try:
-            webbrowser.open('http://localhost:8000')
-            print("[Browser] Abrindo navegador...")
-        except:
-            pass
+        if not args.no_browser:
+            time.sleep(1)
+            try:
+                webbrowser.open(f'http://localhost:{args.port}')
+                print("[Browser] Abrindo navegador...")
+            except:
+                pass
         
         server.serve_forever()
     except KeyboardInterrupt:
+        if server is not None:
+            server.server_close()
         print("\n" + "=" * 60)
         print("🛑 Parando servidor...")
         print("=" * 60)
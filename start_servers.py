@@ -9,22 +9,9 @@ import sys
 import os
 import time
 import threading
-from http.server import HTTPServer, SimpleHTTPRequestHandler
 import webbrowser
 
-class CustomHTTPRequestHandler(SimpleHTTPRequestHandler):
-    """Handler customizado para servir arquivos estáticos"""
-    
-    def end_headers(self):
-        # Adicionar headers CORS
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        super().end_headers()
-    
-    def log_message(self, format, *args):
-        """Customizar mensagens de log"""
-        print(f"[HTTP Server] {format % args}")
+from static_server import StaticServer
 
 def start_flask_server():
     """Iniciar servidor Flask na porta 5000"""
@@ -40,7 +27,7 @@ def start_http_server():
     """Iniciar servidor HTTP estático na porta 8000"""
     print("[HTTP] Iniciando servidor HTTP estático na porta 8000...")
     try:
-        server = HTTPServer(('0.0.0.0', 8000), CustomHTTPRequestHandler)
+        server = StaticServer(('0.0.0.0', 8000))
         print("[HTTP] Servidor HTTP rodando em http://localhost:8000")
         print("[HTTP] Pressione Ctrl+C para parar")
         server.serve_forever()
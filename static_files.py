@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+ETags fortes e políticas de Cache-Control para os arquivos estáticos sem hash.
+
+Os arquivos servidos direto da raiz (quests-database.json, quests-details.json,
+quests-data.json, app.js...) não têm o conteúdo no nome, então o navegador
+precisa revalidar a cada carregamento. O ETag padrão do Flask vem de
+mtime/tamanho do arquivo; aqui ele é o sha256 do conteúdo, calculado uma vez por
+versão do arquivo (mtime + tamanho) e guardado em memória. Depois disso, um
+If-None-Match igual custa só um stat() e um 304.
+
+Cache-Control por classe de arquivo (CACHE_POLICIES):
+- páginas, JSONs de dados, JS e CSS: no-cache (sempre revalida, 304 se igual)
+- imagens e fontes: uma semana
+- o resto: uma hora
+Os arquivos com hash do build_assets.py continuam com IMMUTABLE.
+"""
+import hashlib
+import os
+import stat
+import threading
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=3600'
+
+CACHE_POLICIES = (
+    (('.html', '.json', '.js', '.css'), 'no-cache'),
+    (('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.ico', '.woff', '.woff2', '.ttf'), 'public, max-age=604800'),
+)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def cache_control_for(filename):
+    """Cache-Control da classe do arquivo (pela extensão)"""
+    ext = os.path.splitext(filename)[1].lower()
+    for extensions, policy in CACHE_POLICIES:
+        if ext in extensions:
+            return policy
+    return DEFAULT_CACHE_CONTROL
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileETags:
+    """ETag (sha256 do conteúdo) por caminho, recalculado só quando o arquivo muda"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.computed = 0
+
+    def get(self, path):
+        """ETag do arquivo regular em path (None se não existir)"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        version = (st.st_mtime_ns, st.st_size)
+        cached = self._entries.get(path)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return cached[1]
+        try:
+            etag = content_hash(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._entries[path] = (version, etag)
+            self.computed += 1
+        return etag
+
+    def stats(self):
+        return {'files': len(self._entries), 'hits': self.hits, 'computed': self.computed}
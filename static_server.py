@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP estático usado pelo start_http_server.py e pelo start_servers.py.
+
+O HTTPServer + SimpleHTTPRequestHandler da biblioteca padrão atende uma
+requisição por vez, fecha a conexão a cada resposta e imprime cada acesso.
+StaticServer troca isso por:
+
+- uma thread por conexão (ThreadingHTTPServer) e HTTP/1.1 com keep-alive
+- arquivos grandes enviados com socket.sendfile() (cópia zero no Linux/macOS)
+- cache em memória dos arquivos pequenos, com a variante gzip calculada uma vez
+  por versão do arquivo para os tipos de texto (JSON, JS, CSS, HTML)
+- as páginas e os arquivos com hash do build_assets.py (dist/), com as
+  variantes .br/.gz escolhidas pelo Accept-Encoding, como no Flask
+- ETag do conteúdo e Cache-Control por classe de arquivo (static_files.py),
+  com 304 para If-None-Match igual
+- log de acesso em buffer, gravado por uma thread a cada intervalo
+
+Configuração via variáveis de ambiente:
+    TARKOV_STATIC_HOT_MAX_FILE   maior arquivo guardado em memória em bytes
+                                 (padrão 524288)
+    TARKOV_STATIC_HOT_MAX_BYTES  total em memória em bytes (padrão 33554432)
+    TARKOV_STATIC_KEEPALIVE      segundos que uma conexão ociosa fica aberta
+                                 (padrão 15)
+    TARKOV_ACCESS_LOG            arquivo do log de acesso (padrão: saída
+                                 padrão; 'off' desativa)
+    TARKOV_ACCESS_LOG_FLUSH      intervalo de gravação do log em segundos
+                                 (padrão 1)
+"""
+import gzip
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from build_assets import DIST_DIR, AssetManifest
+from static_files import IMMUTABLE, FileETags, cache_control_for
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HOT_MAX_FILE = int(os.environ.get('TARKOV_STATIC_HOT_MAX_FILE', 512 * 1024))
+HOT_MAX_BYTES = int(os.environ.get('TARKOV_STATIC_HOT_MAX_BYTES', 32 * 1024 * 1024))
+KEEPALIVE_TIMEOUT = float(os.environ.get('TARKOV_STATIC_KEEPALIVE', 15))
+ACCESS_LOG = os.environ.get('TARKOV_ACCESS_LOG', '')
+ACCESS_LOG_FLUSH = float(os.environ.get('TARKOV_ACCESS_LOG_FLUSH', 1))
+
+# Tipos que valem a compressão em memória (imagens já são comprimidas)
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+
+class AcceptEncoding:
+    """Accept-Encoding com o mesmo quality() do request.accept_encodings do Flask"""
+
+    def __init__(self, header):
+        self.values = {}
+        for part in (header or '').split(','):
+            name, _, params = part.partition(';')
+            name = name.strip().lower()
+            if not name:
+                continue
+            quality = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            self.values[name] = quality
+
+    def quality(self, encoding):
+        return self.values.get(encoding, self.values.get('*', 0.0))
+
+
+class HotFileCache:
+    """Conteúdo (e gzip) dos arquivos pequenos, por versão do arquivo, em LRU"""
+
+    def __init__(self, max_file=HOT_MAX_FILE, max_bytes=HOT_MAX_BYTES):
+        self.max_file = max_file
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key, version, load):
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+        self.misses += 1
+        data = load()
+        size = len(data) if data is not None else 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1]) if old[1] is not None else 0
+            self._entries[key] = (version, data)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted) if evicted is not None else 0
+        return data
+
+    def get(self, path, st):
+        """Conteúdo do arquivo (None se for grande demais para a memória)"""
+        if st.st_size > self.max_file:
+            return None
+
+        def load():
+            with open(path, 'rb') as f:
+                return f.read()
+        return self._get((path, None), (st.st_mtime_ns, st.st_size), load)
+
+    def get_gzip(self, path, st):
+        """gzip do arquivo (None se não couber na memória ou não ficar menor)"""
+        if st.st_size > self.max_file:
+            return None
+
+        def load():
+            data = self.get(path, st)
+            compressed = gzip.compress(data, compresslevel=6, mtime=0) if data is not None else None
+            return compressed if compressed is not None and len(compressed) < len(data) else None
+        return self._get((path, 'gzip'), (st.st_mtime_ns, st.st_size), load)
+
+    def stats(self):
+        return {'files': len(self._entries), 'bytes': self._bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+class AccessLog:
+    """Log de acesso em buffer: as linhas são gravadas em lote por uma thread"""
+
+    def __init__(self, path=ACCESS_LOG, interval=ACCESS_LOG_FLUSH, max_lines=1000):
+        self.enabled = path != 'off'
+        self.stream = open(path, 'a', encoding='utf-8') if self.enabled and path else sys.stdout
+        self.interval = interval
+        self.max_lines = max_lines
+        self._lines = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name='access-log', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def write(self, line):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._lines.append(line)
+            full = len(self._lines) >= self.max_lines
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            lines, self._lines = self._lines, []
+        if lines:
+            try:
+                self.stream.write('\n'.join(lines) + '\n')
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class StaticHandler(SimpleHTTPRequestHandler):
+    """Arquivos estáticos com keep-alive, sendfile, variantes e ETag"""
+
+    protocol_version = 'HTTP/1.1'
+    # Conexões ociosas (keep-alive) liberam a thread depois deste tempo
+    timeout = KEEPALIVE_TIMEOUT
+
+    def end_headers(self):
+        # Adicionar headers CORS
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        super().end_headers()
+
+    def log_request(self, code='-', size='-'):
+        if isinstance(code, HTTPStatus):
+            code = code.value
+        self.server.access_log.write(
+            f'{self.address_string()} - - [{self.log_date_time_string()}] "{self.requestline}" {code} {size}')
+
+    def log_message(self, format, *args):
+        """Erros também vão para o log em buffer"""
+        self.server.access_log.write(f"[HTTP Server] {self.address_string()} {format % args}")
+
+    def do_GET(self):
+        self.serve(head=False)
+
+    def do_HEAD(self):
+        self.serve(head=True)
+
+    def serve(self, head):
+        name = unquote(urlsplit(self.path).path).lstrip('/')
+        accept = AcceptEncoding(self.headers.get('Accept-Encoding'))
+        assets = self.server.assets
+
+        # Páginas e arquivos com hash do build (dist/)
+        entry = assets.page(name or 'index.html')
+        cache_control = 'no-cache'
+        if entry is None:
+            entry = assets.asset(name)
+            cache_control = IMMUTABLE
+        if entry is not None:
+            path, encoding = assets.variant(entry, accept)
+            etag = entry['sha256'] + (f'-{encoding}' if encoding else '')
+            self.send_static(path, etag, cache_control, self.guess_type(entry['name']), encoding, head)
+            return
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, 'index.html')
+            if not self.path.split('?', 1)[0].endswith('/') or not os.path.isfile(index):
+                # Redirecionamento da barra final e listagem do diretório
+                super().do_HEAD() if head else super().do_GET()
+                return
+            path = index
+        etag = self.server.etags.get(path)
+        if etag is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        content_type = self.guess_type(path)
+        encoding, body = None, None
+        if content_type.startswith(COMPRESSIBLE_TYPES) and accept.quality('gzip') > 0:
+            try:
+                body = self.server.hot_files.get_gzip(path, os.stat(path))
+            except OSError:
+                body = None
+            if body is not None:
+                encoding, etag = 'gzip', etag + '-gzip'
+        self.send_static(path, etag, cache_control_for(path), content_type, encoding, head, body,
+                         vary=content_type.startswith(COMPRESSIBLE_TYPES))
+
+    def etag_matches(self, etag):
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(',')]
+        return '*' in tags or f'"{etag}"' in tags or f'W/"{etag}"' in tags
+
+    def send_static(self, path, etag, cache_control, content_type, encoding=None, head=False, body=None,
+                    vary=True):
+        """Responde o arquivo (ou o body já em memória) com ETag/Cache-Control"""
+        if self.etag_matches(etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', f'"{etag}"')
+            self.send_header('Cache-Control', cache_control)
+            if vary:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        f = None
+        try:
+            if body is None:
+                try:
+                    f = open(path, 'rb')
+                    st = os.fstat(f.fileno())
+                except OSError:
+                    self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+                    return
+                body = self.server.hot_files.get(path, st)
+                if body is not None:
+                    f.close()
+                    f = None
+            size = len(body) if body is not None else st.st_size
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(size))
+            self.send_header('ETag', f'"{etag}"')
+            self.send_header('Cache-Control', cache_control)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            if vary:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            if head:
+                return
+            if body is not None:
+                self.wfile.write(body)
+            else:
+                # Cópia direta do arquivo para o socket, sem passar pelo Python
+                self.connection.sendfile(f, 0, size)
+        finally:
+            if f is not None:
+                f.close()
+
+
+class StaticServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer com os caches compartilhados pelos handlers"""
+
+    daemon_threads = True
+    # Fila de conexões pendentes (o padrão de 5 recusa clientes em rajada)
+    request_queue_size = 512
+
+    def __init__(self, address, directory=BASE_DIR, dist=DIST_DIR):
+        self.directory = directory
+        self.assets = AssetManifest(dist)
+        self.etags = FileETags()
+        self.hot_files = HotFileCache()
+        self.access_log = AccessLog()
+        self.started = time.time()
+        super().__init__(address, partial(StaticHandler, directory=directory))
+
+    def server_close(self):
+        super().server_close()
+        self.access_log.close()
+
+    def stats(self):
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'etags': self.etags.stats(),
+            'hot_files': self.hot_files.stats(),
+            'static_assets': self.assets.stats()
+        }
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """
-Script para atualizar a versão automaticamente baseado em merges.
-Detecta merges no histórico do git e incrementa a versão.
+Script para atualizar a versão automaticamente.
+
+Com o build dos arquivos estáticos (build_assets.py) a versão segue o
+manifest: sempre que o hash do build muda, a versão patch é incrementada e o
+hash fica registrado em version.json. Sem o dist/manifest.json, detecta merges
+no histórico do git e incrementa a versão.
 """
 
 import json
@@ -11,6 +15,7 @@ import sys
 from pathlib import Path
 
 VERSION_FILE = Path('version.json')
+MANIFEST_FILE = Path('dist') / 'manifest.json'
 
 def get_current_version():
     """Lê a versão atual do arquivo version.json"""
@@ -55,16 +60,37 @@ def check_recent_merges():
     except:
         return False
 
-def update_version_file(new_version):
+def read_version_data():
+    """Conteúdo atual do version.json"""
+    if VERSION_FILE.exists():
+        with open(VERSION_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'version': '0.0.1', 'author': 'Rgcavalheiro'}
+
+def update_version_file(new_version, build=None):
     """Atualiza o arquivo version.json com a nova versão"""
     data = {
         'version': new_version,
         'author': 'Rgcavalheiro'
     }
+    build = build or read_version_data().get('build')
+    if build:
+        data['build'] = build
     with open(VERSION_FILE, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
     print(f"[OK] Versao atualizada para: v{new_version}")
 
+def update_from_manifest(manifest):
+    """Incrementa a versão patch se o build (hash dos arquivos) mudou"""
+    data = read_version_data()
+    current_version = data.get('version', '0.0.1')
+    if data.get('build') == manifest['build']:
+        print(f"[INFO] Build {manifest['build']} sem mudancas. Versao atual: v{current_version}")
+        return current_version
+    new_version = format_version(*increment_patch(*parse_version(current_version)))
+    update_version_file(new_version, manifest['build'])
+    return new_version
+
 def main():
     """Função principal"""
     import sys
@@ -74,6 +100,12 @@ def main():
     if sys.platform == 'win32':
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     
+    if MANIFEST_FILE.exists():
+        # Versão segue o build dos arquivos estáticos (python build_assets.py)
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            update_from_manifest(json.load(f))
+        return
+    
     current_version = get_current_version()
     major, minor, patch = parse_version(current_version)
     
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Validador único do banco de quests (motor de regras).
+
+Substitui a bateria de scripts check_*.py / validate_quest_order.py /
+check_npc_order.py, que recarregavam o JSON e percorriam o banco inteiro cada
+um para uma verificação só. Aqui o grafo é carregado uma vez (quest_graph.py),
+os índices compartilhados (posição da quest no NPC, quests alcançáveis a partir
+do zero, grupos de ciclos, requisitos da API) são montados uma vez no contexto,
+e todas as regras registradas rodam numa única passada pelas quests.
+
+Cada regra é uma função registrada com @rule:
+
+- escopo 'quest': chamada para cada quest selecionada, recebe os pré-requisitos
+  já decodificados (índice, externo?)
+- escopo 'npc': chamada uma vez por NPC selecionado, com o range das quests
+- escopo 'global': chamada uma vez, depois da passada
+
+As regras marcadas como opcionais (ex.: comparação com a API do tarkov.dev, que
+precisa de rede) só rodam quando pedidas com --rule ou --api.
+
+Uso:
+    python validate_all.py                         # todas as regras, banco inteiro
+    python validate_all.py --npc prapor --npc skier
+    python validate_all.py --quest polikhim_hobo_1
+    python validate_all.py --rule missing_prerequisite --rule circular
+    python validate_all.py --api                   # + comparação com o tarkov.dev
+    python validate_all.py --list                  # regras disponíveis
+
+O relatório combinado vai para validation_report.json (ou --output). O código de
+saída é 1 se alguma regra de severidade 'error' encontrou problemas.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from quest_graph import BASE_DIR, load_graph
+from quest_simulation import QuestSimulator
+
+# Corrigir encoding no Windows
+if sys.platform == 'win32' and __name__ == '__main__':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+REPORT_FILE = os.path.join(BASE_DIR, 'validation_report.json')
+API_URL = 'https://api.tarkov.dev/graphql'
+
+SEVERITIES = ('error', 'warning', 'info')
+
+
+class Rule:
+    def __init__(self, name, func, scope, severity, optional, description):
+        self.name = name
+        self.func = func
+        self.scope = scope
+        self.severity = severity
+        self.optional = optional
+        self.description = description
+
+
+RULES = {}
+
+
+def rule(name, scope='quest', severity='error', optional=False):
+    """Registra uma regra; a descrição é a primeira linha da docstring"""
+    def register(func):
+        description = (func.__doc__ or '').strip().split('\n')[0]
+        RULES[name] = Rule(name, func, scope, severity, optional, description)
+        return func
+    return register
+
+
+class ValidationContext:
+    """Grafo + filtros + índices compartilhados entre as regras"""
+
+    def __init__(self, graph, npcs=None, quests=None, api=False):
+        self.graph = graph
+        self.api = api
+        self.findings = []
+        self.unknown_filters = []
+
+        npc_filter = set(npcs or [])
+        for npc_id in npc_filter - set(graph.npcs):
+            self.unknown_filters.append(npc_id)
+        selected = [quest for quest in range(len(graph))
+                    if not npc_filter or graph.npc_id(quest) in npc_filter]
+        if quests:
+            quest_filter = set(quests)
+            self.unknown_filters.extend(sorted(quest_filter - set(graph.index)))
+            selected = [quest for quest in selected if graph.ids[quest] in quest_filter]
+        self.selected = selected
+        self.selected_set = set(selected)
+        self.filtered = bool(npc_filter or quests)
+        self._reachable = None
+        self._api_requirements = None
+
+    def npc_ranges(self):
+        """(npc_id, range das quests) dos NPCs com alguma quest selecionada"""
+        graph = self.graph
+        for n, npc_id in enumerate(graph.npcs):
+            quests = range(graph.npc_offsets[n], graph.npc_offsets[n + 1])
+            if quests and any(quest in self.selected_set for quest in quests):
+                yield npc_id, quests
+
+    @property
+    def reachable(self):
+        """Bitset das quests que ficam disponíveis partindo do zero em alguma escolha
+        dos grupos exclusivos (Kahn, uma simulação por opção de cada grupo)"""
+        if self._reachable is None:
+            simulator = QuestSimulator(self.graph)
+            reachable = simulator.unlock_waves()['completed']
+            for group_id, members in simulator.groups.items():
+                for quest in members:
+                    choices = {group_id: self.graph.ids[quest]}
+                    reachable |= simulator.unlock_waves(choices=choices)['completed']
+            self._reachable = reachable
+        return self._reachable
+
+    @property
+    def api_requirements(self):
+        """{nome da task em minúsculas: set(nomes dos pré-requisitos)} do tarkov.dev"""
+        if self._api_requirements is None:
+            self._api_requirements = fetch_api_requirements()
+        return self._api_requirements
+
+    def report(self, rule_name, quest=None, **fields):
+        graph = self.graph
+        finding = {'rule': rule_name, 'severity': RULES[rule_name].severity}
+        if quest is not None:
+            finding['npc'] = graph.npc_id(quest)
+            finding['quest_id'] = graph.ids[quest]
+            finding['quest_name'] = graph.names[quest]
+        finding.update(fields)
+        self.findings.append(finding)
+
+
+def fetch_api_requirements():
+    """Todas as tasks do tarkov.dev com os pré-requisitos, numa consulta só"""
+    from http_pool import CONNECT_TIMEOUT, get_session
+
+    query = {
+        "query": """
+        {
+            tasks(lang: en) {
+                name
+                taskRequirements {
+                    task {
+                        name
+                    }
+                }
+            }
+        }
+        """
+    }
+    response = get_session().post(API_URL, json=query, timeout=(CONNECT_TIMEOUT, 30))
+    response.raise_for_status()
+    tasks = (response.json().get('data') or {}).get('tasks') or []
+    requirements = {}
+    for task in tasks:
+        names = {(req.get('task') or {}).get('name', '').lower() for req in task.get('taskRequirements') or []}
+        requirements[task.get('name', '').lower()] = names - {''}
+    return requirements
+
+
+# Regras por quest ----------------------------------------------------------
+
+def _location(is_external):
+    return 'prerequisitesExternal' if is_external else 'prerequisites'
+
+
+@rule('missing_prerequisite')
+def check_missing_prerequisite(ctx, quest, entries):
+    """Pré-requisito com ID que não existe no banco"""
+    for target, is_external in entries:
+        if target < 0:
+            ctx.report('missing_prerequisite', quest, prerequisite_id=ctx.graph.missing_ids[~target],
+                       location=_location(is_external), issue='ID nao existe no banco de dados')
+
+
+@rule('wrong_location')
+def check_wrong_location(ctx, quest, entries):
+    """Pré-requisito do mesmo NPC em prerequisitesExternal (ou de outro NPC em prerequisites)"""
+    graph = ctx.graph
+    npc_of = graph.npc_of
+    for target, is_external in entries:
+        if target < 0 or bool(is_external) == (npc_of[target] != npc_of[quest]):
+            continue
+        expected = _location(not is_external)
+        ctx.report('wrong_location', quest, prerequisite_id=graph.ids[target],
+                   prerequisite_npc=graph.npc_id(target), location=_location(is_external),
+                   issue=f'Pre-requisito de {graph.npc_id(target)} deveria estar em {expected}')
+
+
+@rule('self_prerequisite')
+def check_self_prerequisite(ctx, quest, entries):
+    """Quest listada como pré-requisito de si mesma"""
+    if any(target == quest for target, _ in entries):
+        ctx.report('self_prerequisite', quest, issue='Quest depende de si mesma')
+
+
+@rule('duplicate_prerequisite', severity='warning')
+def check_duplicate_prerequisite(ctx, quest, entries):
+    """Mesmo pré-requisito listado mais de uma vez"""
+    seen = set()
+    for target, is_external in entries:
+        if target in seen:
+            prereq_id = ctx.graph.ids[target] if target >= 0 else ctx.graph.missing_ids[~target]
+            ctx.report('duplicate_prerequisite', quest, prerequisite_id=prereq_id,
+                       location=_location(is_external), issue='Pre-requisito repetido')
+        seen.add(target)
+
+
+@rule('prerequisite_order', severity='warning')
+def check_prerequisite_order(ctx, quest, entries):
+    """Pré-requisito do mesmo NPC aparece depois da quest na lista do NPC"""
+    graph = ctx.graph
+    npc_of = graph.npc_of
+    for target, _ in entries:
+        if target > quest and npc_of[target] == npc_of[quest]:
+            start = graph.npc_offsets[npc_of[quest]]
+            ctx.report('prerequisite_order', quest, prerequisite_id=graph.ids[target],
+                       position=quest - start + 1, prerequisite_position=target - start + 1,
+                       issue='Pre-requisito listado depois da quest no NPC')
+
+
+@rule('tier_order', severity='warning')
+def check_tier_order(ctx, quest, entries):
+    """Pré-requisito do mesmo NPC com tier maior que o da quest"""
+    graph = ctx.graph
+    tiers = graph.tiers
+    tier = tiers[quest]
+    if tier is None:
+        return
+    for target, _ in entries:
+        if target >= 0 and graph.npc_of[target] == graph.npc_of[quest] \
+                and tiers[target] is not None and tiers[target] > tier:
+            ctx.report('tier_order', quest, prerequisite_id=graph.ids[target],
+                       tier=tier, prerequisite_tier=tiers[target],
+                       issue='Pre-requisito com tier maior que a quest')
+
+
+@rule('unreachable')
+def check_unreachable(ctx, quest, entries):
+    """Quest que nunca fica disponível partindo do zero"""
+    if ctx.reachable >> quest & 1:
+        return
+    graph = ctx.graph
+    blockers = []
+    for target, _ in entries:
+        if target < 0:
+            blockers.append(graph.missing_ids[~target])
+        elif not ctx.reachable >> target & 1:
+            blockers.append(graph.ids[target])
+    ctx.report('unreachable', quest, blocked_by=blockers,
+               issue='Quest nunca fica disponivel (pre-requisito inexistente, ciclo ou NPC bloqueado)')
+
+
+@rule('api_prerequisites', severity='warning', optional=True)
+def check_api_prerequisites(ctx, quest, entries):
+    """Pré-requisitos diferentes dos taskRequirements do tarkov.dev"""
+    graph = ctx.graph
+    expected = ctx.api_requirements.get(graph.names[quest].lower())
+    if expected is None:
+        return
+    current = {graph.names[target].lower() for target, _ in entries if target >= 0}
+    missing = sorted(expected - current)
+    extra = sorted(current - expected)
+    if missing or extra:
+        ctx.report('api_prerequisites', quest, missing_in_database=missing, not_in_api=extra,
+                   issue='Pre-requisitos diferentes da API do tarkov.dev')
+
+
+# Regras por NPC -------------------------------------------------------------
+
+@rule('tier_sequence', scope='npc', severity='warning')
+def check_tier_sequence(ctx, npc_id, quests):
+    """Tiers fora de ordem crescente dentro do NPC"""
+    tiers = [ctx.graph.tiers[quest] for quest in quests if ctx.graph.tiers[quest] is not None]
+    if tiers != sorted(tiers):
+        ctx.report('tier_sequence', npc=npc_id, tiers=tiers, should_be=sorted(tiers),
+                   issue='Quests do NPC nao estao em ordem por tier')
+
+
+@rule('duplicate_tier', scope='npc', severity='warning')
+def check_duplicate_tier(ctx, npc_id, quests):
+    """Mesmo tier usado por mais de uma quest do NPC"""
+    graph = ctx.graph
+    by_tier = {}
+    for quest in quests:
+        if graph.tiers[quest] is not None:
+            by_tier.setdefault(graph.tiers[quest], []).append(graph.ids[quest])
+    for tier, quest_ids in sorted(by_tier.items()):
+        if len(quest_ids) > 1:
+            ctx.report('duplicate_tier', npc=npc_id, tier=tier, quests=quest_ids,
+                       issue=f'Tier {tier} aparece {len(quest_ids)} vezes')
+
+
+# Regras globais ---------------------------------------------------------------
+
+@rule('duplicate_id', scope='global')
+def check_duplicate_id(ctx):
+    """ID de quest repetido (ou vazio) no banco"""
+    graph = ctx.graph
+    for quest in ctx.selected:
+        quest_id = graph.ids[quest]
+        if not quest_id:
+            ctx.report('duplicate_id', quest, issue='Quest sem ID')
+        elif graph.index[quest_id] != quest:
+            ctx.report('duplicate_id', quest, duplicate_of_npc=graph.npc_id(graph.index[quest_id]),
+                       issue='ID repetido (o app usa a ultima ocorrencia)')
+
+
+@rule('circular', scope='global')
+def check_circular(ctx):
+    """Dependências circulares (Tarjan, uma passada)"""
+    graph = ctx.graph
+    for group in graph.cycle_groups():
+        if ctx.filtered and not any(quest in ctx.selected_set for quest in group):
+            continue
+        cycle = graph.representative_cycle(group)
+        ctx.report('circular', quests=[graph.ids[quest] for quest in group],
+                   cycle=[graph.ids[quest] for quest in cycle],
+                   issue=f'{len(group)} quests interdependentes')
+
+
+def run_rules(graph, npcs=None, quests=None, rules=None, api=False):
+    """Roda as regras (todas as não opcionais, se rules for None) e devolve o contexto"""
+    if rules is None:
+        active = [r for r in RULES.values() if not r.optional or (api and r.name == 'api_prerequisites')]
+    else:
+        unknown = set(rules) - RULES.keys()
+        if unknown:
+            raise ValueError(f"Regras desconhecidas: {', '.join(sorted(unknown))}")
+        active = [RULES[name] for name in RULES if name in rules]
+    ctx = ValidationContext(graph, npcs, quests, api)
+    quest_rules = [r.func for r in active if r.scope == 'quest']
+    npc_rules = [r.func for r in active if r.scope == 'npc']
+    global_rules = [r.func for r in active if r.scope == 'global']
+
+    if quest_rules:
+        for quest in ctx.selected:
+            entries = list(graph.prerequisite_entries(quest))
+            for func in quest_rules:
+                func(ctx, quest, entries)
+    if npc_rules:
+        for npc_id, npc_quests in ctx.npc_ranges():
+            for func in npc_rules:
+                func(ctx, npc_id, npc_quests)
+    for func in global_rules:
+        func(ctx)
+    ctx.active = active
+    return ctx
+
+
+def build_report(ctx, elapsed):
+    graph = ctx.graph
+    summary = {}
+    for r in ctx.active:
+        summary[r.name] = {'severity': r.severity, 'scope': r.scope,
+                           'description': r.description, 'count': 0}
+    for finding in ctx.findings:
+        summary[finding['rule']]['count'] += 1
+    totals = {severity: sum(s['count'] for s in summary.values() if s['severity'] == severity)
+              for severity in SEVERITIES}
+    return {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'database_version': graph.version,
+        'filters': {'unknown': ctx.unknown_filters} if ctx.unknown_filters else {},
+        'quests_checked': len(ctx.selected),
+        'elapsed_ms': round(elapsed * 1000, 1),
+        'totals': totals,
+        'summary': summary,
+        'findings': ctx.findings
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validação completa do banco de quests numa passada")
+    parser.add_argument('--npc', action='append', help="Só as quests deste NPC (pode repetir)")
+    parser.add_argument('--quest', action='append', help="Só esta quest (pode repetir)")
+    parser.add_argument('--rule', action='append', help="Só esta regra (pode repetir)")
+    parser.add_argument('--api', action='store_true', help="Compara também com a API do tarkov.dev (rede)")
+    parser.add_argument('--output', default=REPORT_FILE, help="Arquivo do relatório (padrão validation_report.json)")
+    parser.add_argument('--list', action='store_true', help="Lista as regras e sai")
+    parser.add_argument('--verbose', action='store_true', help="Mostra todos os problemas, não só os 10 primeiros")
+    args = parser.parse_args()
+
+    if args.list:
+        for r in RULES.values():
+            extra = ' (opcional)' if r.optional else ''
+            print(f"  {r.name:24} {r.scope:6} {r.severity:7} {r.description}{extra}")
+        return 0
+
+    start = time.perf_counter()
+    graph = load_graph()
+    try:
+        ctx = run_rules(graph, args.npc, args.quest, args.rule, args.api)
+    except ValueError as e:
+        print(f"[ERRO] {e}")
+        return 2
+    except Exception as e:
+        if not args.api:
+            raise
+        print(f"[ERRO] Falha ao consultar a API do tarkov.dev: {e}")
+        return 2
+    elapsed = time.perf_counter() - start
+    report = build_report(ctx, elapsed)
+
+    print("=" * 80)
+    print("VALIDACAO DO BANCO DE QUESTS")
+    print("=" * 80)
+    print(f"  Quests verificadas: {report['quests_checked']} ({report['elapsed_ms']}ms)")
+    for name in ctx.unknown_filters:
+        print(f"[AVISO] Filtro sem correspondência no banco: {name}")
+
+    for name, entry in report['summary'].items():
+        status = '[OK]' if not entry['count'] else f"[{entry['severity'].upper()}]"
+        print(f"\n{status} {name}: {entry['count']} - {entry['description']}")
+        findings = [f for f in ctx.findings if f['rule'] == name]
+        for finding in findings if args.verbose else findings[:10]:
+            where = finding.get('quest_id') or finding.get('npc') or ''
+            if finding.get('prerequisite_id'):
+                where = f"{where} -> {finding['prerequisite_id']}"
+            print(f"    - {where}: {finding['issue']}")
+        if not args.verbose and len(findings) > 10:
+            print(f"    ... e mais {len(findings) - 10}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print("\n" + "=" * 80)
+    print(f"Erros: {report['totals']['error']}  Avisos: {report['totals']['warning']}")
+    print(f"Relatório salvo em: {args.output}")
+    return 1 if report['totals']['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,58 +1,13 @@
 import json
-import requests
-import time
-from urllib.parse import quote
+from link_health import LinkHealth, wiki_url_candidates
 
-def normalize_quest_name(name):
-    """Normaliza o nome da missão para formato de URL da wiki"""
-    # Remover caracteres especiais e normalizar
-    normalized = name.replace(" - ", "_").replace("-", "_").replace(" ", "_")
-    # Remover underscores duplos
-    normalized = normalized.replace("__", "_")
-    # Remover underscore no final se houver
-    normalized = normalized.rstrip("_")
-    return normalized
-
-def test_url(url):
-    """Testa se uma URL está acessível"""
-    try:
-        response = requests.get(url, timeout=10, allow_redirects=True)
-        # Verificar se é uma página válida da wiki (não página de erro)
-        if response.status_code == 200:
-            # Verificar se não é página de erro ou redirecionamento
-            content = response.text.lower()
-            if "escape from tarkov" in content or "quest" in content or "mission" in content:
-                # Verificar se não é página de busca ou erro
-                if "search results" not in content and "page not found" not in content:
-                    return True
-        return False
-    except:
-        return False
+# Links testados em paralelo, com limite por host e cache em disco (link_health.py)
+checker = LinkHealth()
 
 def find_correct_url(quest_name):
     """Tenta encontrar a URL correta para uma missão"""
-    base_url = "https://escapefromtarkov.fandom.com/wiki/"
-    
-    # Tentar diferentes formatos
-    formats = [
-        quest_name,  # Nome original
-        quest_name.replace(" ", "_"),  # Com underscore
-        normalize_quest_name(quest_name),  # Normalizado
-        quest_name.replace(" - ", "_").replace(" ", "_"),  # Partes com underscore
-        quest_name.replace(" - ", "_-_").replace(" ", "_"),  # Partes com underscore e hífen
-        quest_name.replace("'", "").replace(" ", "_"),  # Sem apóstrofos
-    ]
-    
-    # Remover duplicatas
-    formats = list(dict.fromkeys(formats))
-    
-    for fmt in formats:
-        url = base_url + fmt
-        if test_url(url):
-            return url
-        time.sleep(0.2)  # Pequeno delay para não sobrecarregar
-    
-    return None
+    # Todas as variações são testadas de uma vez
+    return checker.first_ok(wiki_url_candidates(quest_name))
 
 # Carregar o JSON
 print("Carregando quests-data.json...")
@@ -64,6 +19,14 @@ total_quests = 0
 fixed_quests = 0
 broken_quests = []
 
+# Testar todos os links de uma vez (API da wiki em lote + HEAD em paralelo);
+# os que já estão no cache não são testados de novo
+print("\nTestando links...")
+all_urls = [quest['wikiUrl'] for npc_data in data['npcs'].values() for quest in npc_data['quests']]
+link_results = checker.check(all_urls)
+print(f"  {checker.counts['cached']} do cache, {checker.counts['api']} confirmados pela API, "
+      f"{checker.counts['probed']} testados")
+
 print("\nValidando links da wiki...")
 print("=" * 60)
 
@@ -75,8 +38,7 @@ for npc_id, npc_data in data['npcs'].items():
         current_url = quest['wikiUrl']
         quest_name = quest['name']
         
-        # Testar link atual
-        if test_url(current_url):
+        if link_results.get(current_url, {}).get('ok'):
             print(f"  OK: {quest_name}")
         else:
             print(f"  ERRO: {quest_name}: Link quebrado")
@@ -92,7 +54,6 @@ for npc_id, npc_data in data['npcs'].items():
                 print(f"     CORRIGIDO para: {correct_url}")
             else:
                 print(f"     AVISO: Nao foi possivel encontrar link correto")
-            time.sleep(0.5)  # Delay entre requisições
 
 # Salvar JSON atualizado se houver correções
 if fixed_quests > 0:
@@ -112,7 +73,7 @@ print(f"   Links nao corrigidos: {len(broken_quests) - fixed_quests}")
 if broken_quests and fixed_quests < len(broken_quests):
     print(f"\nAVISO: Missoes com links quebrados que nao foram corrigidos:")
     for npc_name, quest_name, url in broken_quests:
-        if not test_url(url):
+        if not link_results.get(url, {}).get('ok'):
             print(f"   - {npc_name}: {quest_name}")
 
 print("\nValidacao concluida!")
@@ -8,14 +8,16 @@ Verifica:
 - Pré-requisitos externos incorretos
 """
 
+import argparse
 import json
-from collections import defaultdict, deque
+from collections import defaultdict
+
+from quest_graph import load_graph
 
 def load_database():
-    """Carrega o banco de dados de quests"""
+    """Carrega o grafo compilado do banco de dados de quests"""
     try:
-        with open('quests-database.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_graph()
     except FileNotFoundError:
         print("ERRO: Arquivo quests-database.json não encontrado!")
         return None
@@ -23,205 +25,126 @@ def load_database():
         print(f"ERRO: JSON inválido: {e}")
         return None
 
-def build_quest_index(data):
-    """Cria um índice de todas as quests por ID e NPC"""
-    quest_by_id = {}  # {quest_id: (npc_id, quest)}
-    quest_by_npc = defaultdict(dict)  # {npc_id: {quest_id: quest}}
-    
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            if quest_id:
-                quest_by_id[quest_id] = (npc_id, quest)
-                quest_by_npc[npc_id][quest_id] = quest
-    
-    return quest_by_id, quest_by_npc
+def all_quests(graph, quests=None):
+    """Índices a verificar: todos, ou só os informados (validação incremental)"""
+    return range(len(graph)) if quests is None else quests
 
-def validate_prerequisite_ids(data, quest_by_id):
+def validate_prerequisite_ids(graph, quests=None):
     """Valida se todos os IDs de pré-requisitos existem"""
     errors = []
     warnings = []
     
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            quest_name = quest.get('name', 'Unknown')
-            
-            # Verificar prerequisites (mesmo NPC)
-            prerequisites = quest.get('prerequisites', [])
-            for prereq_id in prerequisites:
-                if prereq_id not in quest_by_id:
-                    errors.append({
-                        'type': 'missing_prerequisite',
-                        'npc': npc_data.get('name', npc_id),
-                        'quest_id': quest_id,
-                        'quest_name': quest_name,
-                        'prerequisite_id': prereq_id,
-                        'prerequisite_type': 'internal'
-                    })
-                elif quest_by_id[prereq_id][0] != npc_id:
-                    # Pré-requisito está em outro NPC, mas está em prerequisites ao invés de prerequisitesExternal
-                    warnings.append({
-                        'type': 'wrong_prerequisite_type',
-                        'npc': npc_data.get('name', npc_id),
-                        'quest_id': quest_id,
-                        'quest_name': quest_name,
-                        'prerequisite_id': prereq_id,
-                        'prerequisite_npc': quest_by_id[prereq_id][0],
-                        'suggestion': 'Mover para prerequisitesExternal'
-                    })
-            
-            # Verificar prerequisitesExternal (outros NPCs)
-            prerequisites_external = quest.get('prerequisitesExternal', [])
-            for prereq_id in prerequisites_external:
-                if prereq_id not in quest_by_id:
-                    errors.append({
-                        'type': 'missing_prerequisite',
-                        'npc': npc_data.get('name', npc_id),
-                        'quest_id': quest_id,
-                        'quest_name': quest_name,
-                        'prerequisite_id': prereq_id,
-                        'prerequisite_type': 'external'
-                    })
-                elif quest_by_id[prereq_id][0] == npc_id:
-                    # Pré-requisito está no mesmo NPC, mas está em prerequisitesExternal
-                    warnings.append({
-                        'type': 'wrong_prerequisite_type',
-                        'npc': npc_data.get('name', npc_id),
-                        'quest_id': quest_id,
-                        'quest_name': quest_name,
-                        'prerequisite_id': prereq_id,
-                        'prerequisite_npc': quest_by_id[prereq_id][0],
-                        'suggestion': 'Mover para prerequisites'
-                    })
+    for quest in all_quests(graph, quests):
+        npc_of = graph.npc_of[quest]
+        
+        # prerequisites (mesmo NPC) vêm antes de prerequisitesExternal (outros NPCs)
+        for target, is_external in graph.prerequisite_entries(quest):
+            prerequisite_type = 'external' if is_external else 'internal'
+            if target < 0:
+                errors.append({
+                    'type': 'missing_prerequisite',
+                    'npc': graph.npc_name(quest),
+                    'quest_id': graph.ids[quest],
+                    'quest_name': graph.names[quest],
+                    'prerequisite_id': graph.missing_ids[~target],
+                    'prerequisite_type': prerequisite_type
+                })
+            elif bool(is_external) == (graph.npc_of[target] == npc_of):
+                # Pré-requisito de outro NPC em prerequisites, ou do mesmo NPC em prerequisitesExternal
+                warnings.append({
+                    'type': 'wrong_prerequisite_type',
+                    'npc': graph.npc_name(quest),
+                    'quest_id': graph.ids[quest],
+                    'quest_name': graph.names[quest],
+                    'prerequisite_id': graph.ids[target],
+                    'prerequisite_npc': graph.npc_id(target),
+                    'suggestion': 'Mover para prerequisites' if is_external else 'Mover para prerequisitesExternal'
+                })
     
     return errors, warnings
 
-def detect_circular_dependencies(data, quest_by_id):
-    """Detecta dependências circulares"""
+def detect_circular_dependencies(graph, groups=None):
+    """Detecta dependências circulares.
+
+    Uma única passada de Tarjan (iterativa, O(V + E)) encontra todos os
+    grupos de quests que dependem umas das outras, inclusive ciclos
+    sobrepostos. Para cada grupo retorna as quests envolvidas e um ciclo
+    representativo (o mais curto a partir da primeira quest do grupo).
+    groups permite passar grupos já conhecidos (validação incremental).
+    """
     circular = []
     
-    def has_cycle(quest_id, visited, rec_stack, path):
-        """DFS para detectar ciclos"""
-        visited.add(quest_id)
-        rec_stack.add(quest_id)
-        path.append(quest_id)
-        
-        if quest_id not in quest_by_id:
-            rec_stack.remove(quest_id)
-            path.pop()
-            return False
-        
-        _, quest = quest_by_id[quest_id]
-        all_prereqs = (quest.get('prerequisites', []) + 
-                      quest.get('prerequisitesExternal', []))
-        
-        for prereq_id in all_prereqs:
-            if prereq_id not in quest_by_id:
-                continue
-            
-            if prereq_id not in visited:
-                if has_cycle(prereq_id, visited, rec_stack, path):
-                    return True
-            elif prereq_id in rec_stack:
-                # Ciclo detectado
-                cycle_start = path.index(prereq_id)
-                cycle = path[cycle_start:] + [prereq_id]
-                circular.append(cycle)
-                return True
-        
-        rec_stack.remove(quest_id)
-        path.pop()
-        return False
-    
-    visited = set()
-    for quest_id in quest_by_id.keys():
-        if quest_id not in visited:
-            has_cycle(quest_id, visited, set(), [])
+    for group in (graph.cycle_groups() if groups is None else groups):
+        circular.append({
+            'quests': [graph.ids[q] for q in group],
+            'cycle': [graph.ids[q] for q in graph.representative_cycle(group)]
+        })
     
     return circular
 
-def find_orphan_quests(data, quest_by_id):
+def find_orphan_quests(graph, quests=None):
     """Encontra quests que não têm pré-requisitos mas não aparecem como disponíveis"""
     orphans = []
     
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            prerequisites = quest.get('prerequisites', [])
-            prerequisites_external = quest.get('prerequisitesExternal', [])
+    for quest in all_quests(graph, quests):
+        # Quest sem pré-requisitos deve estar sempre disponível
+        if not graph.has_prerequisites(quest):
+            # Verificar se tem algum pré-requisito inválido que está bloqueando
+            invalid_prereqs = graph.missing_prerequisites(quest)
             
-            # Quest sem pré-requisitos deve estar sempre disponível
-            if not prerequisites and not prerequisites_external:
-                # Verificar se tem algum pré-requisito inválido que está bloqueando
-                all_prereqs = prerequisites + prerequisites_external
-                invalid_prereqs = [p for p in all_prereqs if p not in quest_by_id]
-                
-                if invalid_prereqs:
-                    orphans.append({
-                        'npc': npc_data.get('name', npc_id),
-                        'quest_id': quest_id,
-                        'quest_name': quest.get('name', 'Unknown'),
-                        'invalid_prerequisites': invalid_prereqs
-                    })
+            if invalid_prereqs:
+                orphans.append({
+                    'npc': graph.npc_name(quest),
+                    'quest_id': graph.ids[quest],
+                    'quest_name': graph.names[quest],
+                    'invalid_prerequisites': invalid_prereqs
+                })
     
     return orphans
 
-def find_blocked_quests(data, quest_by_id):
+def find_blocked_quests(graph, quests=None):
     """Encontra quests que deveriam estar disponíveis mas estão bloqueadas por pré-requisitos inválidos"""
     blocked = []
     
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            prerequisites = quest.get('prerequisites', [])
-            prerequisites_external = quest.get('prerequisitesExternal', [])
-            all_prereqs = prerequisites + prerequisites_external
-            
-            # Verificar se algum pré-requisito não existe
-            invalid_prereqs = [p for p in all_prereqs if p not in quest_by_id]
-            
-            if invalid_prereqs:
-                blocked.append({
-                    'npc': npc_data.get('name', npc_id),
-                    'quest_id': quest_id,
-                    'quest_name': quest.get('name', 'Unknown'),
-                    'invalid_prerequisites': invalid_prereqs,
-                    'all_prerequisites': all_prereqs
-                })
+    for quest in all_quests(graph, quests):
+        # Verificar se algum pré-requisito não existe
+        invalid_prereqs = graph.missing_prerequisites(quest)
+        
+        if invalid_prereqs:
+            blocked.append({
+                'npc': graph.npc_name(quest),
+                'quest_id': graph.ids[quest],
+                'quest_name': graph.names[quest],
+                'invalid_prerequisites': invalid_prereqs,
+                'all_prerequisites': graph.prerequisite_ids(quest)
+            })
     
     return blocked
 
-def analyze_quest_availability(data, quest_by_id):
+def analyze_quest_availability(graph, quests=None):
     """Analisa quais quests estão disponíveis e quais estão bloqueadas"""
     # Simular progresso vazio (todas as quests disponíveis se não tiverem pré-requisitos)
     available = []
     blocked_by_missing = []
     
-    for npc_id, npc_data in data.get('npcs', {}).items():
-        for quest in npc_data.get('quests', []):
-            quest_id = quest.get('id')
-            prerequisites = quest.get('prerequisites', [])
-            prerequisites_external = quest.get('prerequisitesExternal', [])
-            all_prereqs = prerequisites + prerequisites_external
-            
-            # Verificar se todos os pré-requisitos existem
-            missing_prereqs = [p for p in all_prereqs if p not in quest_by_id]
-            
-            if missing_prereqs:
-                blocked_by_missing.append({
-                    'npc': npc_data.get('name', npc_id),
-                    'quest_id': quest_id,
-                    'quest_name': quest.get('name', 'Unknown'),
-                    'missing_prerequisites': missing_prereqs
-                })
-            elif not all_prereqs:
-                # Quest sem pré-requisitos - deve estar disponível
-                available.append({
-                    'npc': npc_data.get('name', npc_id),
-                    'quest_id': quest_id,
-                    'quest_name': quest.get('name', 'Unknown')
-                })
+    for quest in all_quests(graph, quests):
+        # Verificar se todos os pré-requisitos existem
+        missing_prereqs = graph.missing_prerequisites(quest)
+        
+        if missing_prereqs:
+            blocked_by_missing.append({
+                'npc': graph.npc_name(quest),
+                'quest_id': graph.ids[quest],
+                'quest_name': graph.names[quest],
+                'missing_prerequisites': missing_prereqs
+            })
+        elif not graph.has_prerequisites(quest):
+            # Quest sem pré-requisitos - deve estar disponível
+            available.append({
+                'npc': graph.npc_name(quest),
+                'quest_id': graph.ids[quest],
+                'quest_name': graph.names[quest]
+            })
     
     return available, blocked_by_missing
 
@@ -260,8 +183,10 @@ def print_report(errors, warnings, circular, orphans, blocked, available, blocke
     if circular:
         print(f"\n[CICLO] DEPENDENCIAS CIRCULARES ({len(circular)}):")
         print("-" * 80)
-        for cycle in circular:
-            print(f"  Ciclo detectado: {' -> '.join(cycle)}")
+        for group in circular:
+            print(f"  Ciclo detectado: {' -> '.join(group['cycle'])}")
+            if len(group['quests']) > len(group['cycle']) - 1:
+                print(f"  Quests no grupo ({len(group['quests'])}): {', '.join(group['quests'])}")
             print()
     else:
         print("\n[OK] Nenhuma dependencia circular encontrada!")
@@ -325,32 +250,54 @@ def print_report(errors, warnings, circular, orphans, blocked, available, blocke
 
 def main():
     """Função principal"""
-    print("Carregando quests-database.json...")
-    data = load_database()
-    
-    if not data:
-        return
+    parser = argparse.ArgumentParser(description="Valida os pré-requisitos do quests-database.json")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Verifica só as quests alteradas desde a última validação (e seus dependentes)")
+    args = parser.parse_args()
     
-    print("Construindo índice de quests...")
-    quest_by_id, quest_by_npc = build_quest_index(data)
+    # Import local: incremental_validation usa as verificações deste módulo
+    from incremental_validation import run_incremental, save_snapshot
     
-    print(f"Total de quests encontradas: {len(quest_by_id)}")
-    print(f"Total de NPCs: {len(quest_by_npc)}")
-    
-    print("\nValidando pré-requisitos...")
-    errors, warnings = validate_prerequisite_ids(data, quest_by_id)
-    
-    print("Detectando dependências circulares...")
-    circular = detect_circular_dependencies(data, quest_by_id)
+    print("Carregando quests-database.json...")
+    graph = load_database()
     
-    print("Procurando quests órfãs...")
-    orphans = find_orphan_quests(data, quest_by_id)
+    if not graph:
+        return
     
-    print("Procurando quests bloqueadas...")
-    blocked = find_blocked_quests(data, quest_by_id)
+    print(f"Total de quests encontradas: {len(graph.index)}")
+    print(f"Total de NPCs: {sum(1 for npc_id in graph.npcs if graph.npc_quests(npc_id))}")
+    
+    if args.incremental:
+        results, info, signatures = run_incremental(graph)
+        if info['mode'] == 'full':
+            print("\nSem snapshot da última validação: validação completa")
+        else:
+            print(f"\nValidação incremental: {info['changed']} quests alteradas, "
+                  f"{info['removed']} removidas, {info['rechecked']} reverificadas")
+        errors, warnings = results['errors'], results['warnings']
+        circular, orphans, blocked = results['circular'], results['orphans'], results['blocked']
+        available, blocked_by_missing = results['available'], results['blocked_by_missing']
+    else:
+        signatures = None
+        print("\nValidando pré-requisitos...")
+        errors, warnings = validate_prerequisite_ids(graph)
+        
+        print("Detectando dependências circulares...")
+        circular = detect_circular_dependencies(graph)
+        
+        print("Procurando quests órfãs...")
+        orphans = find_orphan_quests(graph)
+        
+        print("Procurando quests bloqueadas...")
+        blocked = find_blocked_quests(graph)
+        
+        print("Analisando disponibilidade de quests...")
+        available, blocked_by_missing = analyze_quest_availability(graph)
     
-    print("Analisando disponibilidade de quests...")
-    available, blocked_by_missing = analyze_quest_availability(data, quest_by_id)
+    save_snapshot(graph, {
+        'errors': errors, 'warnings': warnings, 'circular': circular, 'orphans': orphans,
+        'blocked': blocked, 'available': available, 'blocked_by_missing': blocked_by_missing
+    }, signatures=signatures)
     
     # Gerar relatório
     print_report(errors, warnings, circular, orphans, blocked, available, blocked_by_missing)
@@ -359,7 +306,8 @@ def main():
     report = {
         'errors': errors,
         'warnings': warnings,
-        'circular_dependencies': circular,
+        'circular_dependencies': [group['cycle'] for group in circular],
+        'circular_groups': circular,
         'orphan_quests': orphans,
         'blocked_quests': blocked,
         'available_quests': available,
@@ -1,12 +1,16 @@
 // Carregar e exibir versão do app
 async function loadVersion() {
     try {
-        const response = await fetch('version.json');
+        // no-cache: a versão muda a cada build (update_version.py)
+        const response = await fetch('version.json', { cache: 'no-cache' });
         const data = await response.json();
         
         const versionElement = document.getElementById('appVersion');
         if (versionElement) {
             versionElement.textContent = `v${data.version} by ${data.author}`;
+            if (data.build) {
+                versionElement.title = `build ${data.build}`;
+            }
         }
     } catch (error) {
         console.error('Erro ao carregar versão:', error);
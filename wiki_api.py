@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Busca de páginas em lote pela API da MediaWiki (api.php) da wiki do Tarkov.
+
+Em vez de baixar a página renderizada de cada quest (com anúncios e
+navegação), uma única chamada a action=query devolve o wikitext e o ID da
+revisão de até 50 títulos. O wikitext é convertido no mesmo formato de
+scrape_quest_info (nome, NPC, objetivos e imagens do guia); páginas que não
+puderem ser lidas assim devem cair no scraping de HTML.
+
+Configuração via variável de ambiente:
+    TARKOV_WIKI_API_URL  endpoint da API (padrão: api.php da wiki no fandom),
+                         útil para testar contra um servidor local
+"""
+import hashlib
+import os
+import re
+from urllib.parse import quote, unquote, urlparse
+
+import http_pool
+
+WIKI_API_URL = os.environ.get('TARKOV_WIKI_API_URL', 'https://escapefromtarkov.fandom.com/api.php')
+IMAGE_BASE_URL = 'https://static.wikia.nocookie.net/escapefromtarkov_gamepedia/images'
+BATCH_SIZE = 50  # limite de títulos por consulta da MediaWiki para usuários comuns
+
+# Campos da infobox de quest que indicam o NPC
+NPC_FIELDS = ('given by', 'givenby', 'trader', 'npc')
+
+HEADING_RE = re.compile(r'^(={2,6})\s*(.*?)\s*\1\s*$', re.MULTILINE)
+FILE_LINK_RE = re.compile(r'\[\[\s*(?:File|Image)\s*:\s*([^|\]]+)((?:\|[^\]]*)?)\]\]', re.IGNORECASE)
+GALLERY_RE = re.compile(r'<gallery[^>]*>(.*?)</gallery>', re.IGNORECASE | re.DOTALL)
+SIZE_RE = re.compile(r'^\s*(\d+)(?:x\d+)?px\s*$')
+
+
+def title_from_url(wiki_url):
+    """Converte a URL da wiki no título da página ('/wiki/A_B' -> 'A B')"""
+    path = urlparse(wiki_url).path
+    if path.startswith('/wiki/'):
+        path = path[len('/wiki/'):]
+    return unquote(path).replace('_', ' ').strip()
+
+
+def iter_batches(items, size=BATCH_SIZE):
+    """Divide a lista em lotes de até `size` itens"""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def image_url(file_name):
+    """URL completa de um arquivo da wiki (mesmo formato de scrape_quest_info).
+
+    A MediaWiki guarda os uploads em images/<md5[0]>/<md5[:2]>/<nome>.
+    """
+    name = file_name.strip().replace(' ', '_')
+    if name:
+        name = name[0].upper() + name[1:]
+    digest = hashlib.md5(name.encode('utf-8')).hexdigest()
+    encoded = quote(name, safe="!$'()*,-.:;@_~")
+    return f"{IMAGE_BASE_URL}/{digest[0]}/{digest[:2]}/{encoded}/revision/latest"
+
+
+def _resolve_titles(query, titles):
+    """Mapeia cada título pedido para o título final (normalização e redirects)"""
+    mapping = {title: title for title in titles}
+    steps = {}
+    for item in query.get('normalized', []) + query.get('redirects', []):
+        steps[item['from']] = item['to']
+    for title in titles:
+        current = title
+        seen = set()
+        while current in steps and current not in seen:
+            seen.add(current)
+            current = steps[current]
+        mapping[title] = current
+    return mapping
+
+
+def query_pages(titles, api_url=None, content=True):
+    """Consulta até BATCH_SIZE títulos numa única chamada à API.
+
+    Retorna {título pedido: {'title', 'missing', 'revision_id', 'wikitext'}}.
+    Com content=False só o ID da revisão é pedido (útil para checar links
+    ou detectar páginas alteradas).
+    """
+    titles = list(titles)
+    if len(titles) > BATCH_SIZE:
+        raise ValueError(f"No máximo {BATCH_SIZE} títulos por consulta")
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'formatversion': '2',
+        'redirects': '1',
+        'prop': 'revisions',
+        'rvprop': 'ids|content' if content else 'ids',
+        'titles': '|'.join(titles)
+    }
+    if content:
+        params['rvslots'] = 'main'
+
+    response = http_pool.get(api_url or WIKI_API_URL, params=params)
+    response.raise_for_status()
+    query = response.json().get('query', {})
+
+    pages = {}
+    for page in query.get('pages', []):
+        revision = (page.get('revisions') or [{}])[0]
+        wikitext = None
+        if content:
+            slot = revision.get('slots', {}).get('main', {})
+            wikitext = slot.get('content', revision.get('content'))
+        pages[page.get('title')] = {
+            'title': page.get('title'),
+            'missing': bool(page.get('missing') or page.get('invalid')),
+            'revision_id': revision.get('revid'),
+            'wikitext': wikitext
+        }
+
+    result = {}
+    for requested, final in _resolve_titles(query, titles).items():
+        result[requested] = pages.get(final, {
+            'title': final, 'missing': True, 'revision_id': None, 'wikitext': None
+        })
+    return result
+
+
+def fetch_pages(titles, api_url=None, content=True, limiter=None):
+    """Consulta qualquer quantidade de títulos, em lotes de BATCH_SIZE"""
+    results = {}
+    api_url = api_url or WIKI_API_URL
+    for batch in iter_batches(titles):
+        if limiter:
+            limiter.acquire(api_url)
+        results.update(query_pages(batch, api_url=api_url, content=content))
+    return results
+
+
+def check_titles_exist(titles, api_url=None, limiter=None):
+    """Retorna {título: existe?} usando consultas em lote (sem baixar conteúdo)"""
+    pages = fetch_pages(titles, api_url=api_url, content=False, limiter=limiter)
+    return {title: not page['missing'] for title, page in pages.items()}
+
+
+def _section(wikitext, name):
+    """Texto de uma seção (até o próximo heading de nível igual ou maior)"""
+    headings = list(HEADING_RE.finditer(wikitext))
+    for i, match in enumerate(headings):
+        if match.group(2).strip().lower() != name.lower():
+            continue
+        level = len(match.group(1))
+        end = len(wikitext)
+        for following in headings[i + 1:]:
+            if len(following.group(1)) <= level:
+                end = following.start()
+                break
+        return wikitext[match.end():end]
+    return None
+
+
+def _strip_templates(text):
+    """Remove {{templates}} (inclusive aninhados)"""
+    previous = None
+    while previous != text:
+        previous = text
+        text = re.sub(r'\{\{[^{}]*\}\}', '', text)
+    return text
+
+
+def clean_wikitext(text):
+    """Converte uma linha de wikitext em texto simples"""
+    text = re.sub(r'<ref[^>]*/>', '', text)
+    text = re.sub(r'<ref[^>]*>.*?</ref>', '', text, flags=re.DOTALL)
+    text = _strip_templates(text)
+    text = FILE_LINK_RE.sub('', text)
+    text = re.sub(r'\[\[[^|\]]*\|([^\]]*)\]\]', r'\1', text)
+    text = re.sub(r'\[\[([^\]]*)\]\]', r'\1', text)
+    text = re.sub(r'\[https?://[^\s\]]+\s+([^\]]*)\]', r'\1', text)
+    text = re.sub(r"'{2,}", '', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _infobox_npc(wikitext):
+    for line in wikitext.splitlines():
+        match = re.match(r'^\s*\|\s*([^=|]+?)\s*=\s*(.*)$', line)
+        if match and match.group(1).strip().lower() in NPC_FIELDS:
+            value = clean_wikitext(match.group(2))
+            if value:
+                return value
+    return ''
+
+
+def _is_small_image(options):
+    """Ignora ícones (largura < 100px), como o scraping de HTML faz"""
+    for option in options.split('|'):
+        size = SIZE_RE.match(option)
+        if size and int(size.group(1)) < 100:
+            return True
+    return False
+
+
+def _guide_images(section):
+    images = []
+
+    def add(name, options=''):
+        if _is_small_image(options):
+            return
+        url = image_url(name)
+        if url not in images:
+            images.append(url)
+
+    # Galerias e links [[File:...]] na ordem em que aparecem na seção
+    position = 0
+    for gallery in GALLERY_RE.finditer(section):
+        for match in FILE_LINK_RE.finditer(section, position, gallery.start()):
+            add(match.group(1), match.group(2))
+        for line in gallery.group(1).splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            name, _, options = line.partition('|')
+            name = re.sub(r'^(?:File|Image)\s*:', '', name, flags=re.IGNORECASE)
+            add(name, options)
+        position = gallery.end()
+    for match in FILE_LINK_RE.finditer(section, position):
+        add(match.group(1), match.group(2))
+    return images
+
+
+def parse_quest_wikitext(title, wikitext):
+    """Extrai as informações da quest do wikitext (formato de scrape_quest_info)"""
+    quest_info = {
+        'name': title,
+        'npc': _infobox_npc(wikitext),
+        'objectives': [],
+        'guide_images': []
+    }
+
+    objectives = _section(wikitext, 'Objectives')
+    if objectives:
+        for line in objectives.splitlines():
+            # Apenas itens de primeiro nível, como no scraping de HTML
+            if line.startswith('*') and not line.startswith('**'):
+                text = clean_wikitext(line.lstrip('*'))
+                if text and text not in quest_info['objectives']:
+                    quest_info['objectives'].append(text)
+
+    guide = _section(wikitext, 'Guide')
+    if guide:
+        quest_info['guide_images'] = _guide_images(guide)
+
+    return quest_info
+
+
+def fetch_quest_infos(wiki_urls, api_url=None, limiter=None):
+    """Busca várias quests pela API em lotes.
+
+    Retorna {url: quest_info} para as páginas lidas pela API (com
+    'validators' contendo o ID da revisão) e a lista de URLs que precisam
+    de scraping de HTML (página ausente ou sem objetivos no wikitext).
+    """
+    titles = {url: title_from_url(url) for url in wiki_urls}
+    results = {}
+    fallback = []
+    try:
+        pages = fetch_pages(list(dict.fromkeys(titles.values())), api_url=api_url, limiter=limiter)
+    except Exception as e:
+        print(f"[WIKI API] Falha na consulta em lote ({e}), usando scraping de HTML")
+        return results, list(wiki_urls)
+
+    for url, title in titles.items():
+        page = pages.get(title)
+        if not page or page['missing'] or not page.get('wikitext'):
+            fallback.append(url)
+            continue
+        quest_info = parse_quest_wikitext(page['title'], page['wikitext'])
+        if not quest_info['objectives']:
+            fallback.append(url)
+            continue
+        quest_info['validators'] = {'revision_id': page['revision_id']}
+        results[url] = quest_info
+    return results, fallback